@@ -0,0 +1,103 @@
+"""Return and risk statistics over aligned price series.
+
+Every function works on a 2-D array of shape ``(periods, series)`` holding
+prices oldest first, with NaN where a series has no value, and computes all
+series at once. A statistic that a gap makes undefined (a return across a
+missing price, a window that is not full) is NaN rather than an error.
+"""
+
+import numpy as np
+
+# Observations per year, used to annualize volatility
+PERIODS_PER_YEAR = {"daily": 252, "weekly": 52, "monthly": 12, "quarterly": 4, "annual": 1}
+
+
+def log_returns(prices: np.ndarray) -> np.ndarray:
+    """Log return into each period; the first row is NaN. Non-positive
+    prices, which occur at some hubs, have no log and give NaN."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        logs = np.log(np.where(prices > 0, prices, np.nan))
+    returns = np.full_like(logs, np.nan)
+    returns[1:] = np.diff(logs, axis=0)
+    return returns
+
+
+def _window_sums(values: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Count, sum and sum of squares of the non-NaN values in each trailing window."""
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    pad = np.zeros((1, values.shape[1]))
+
+    def trailing(a):
+        cumulative = np.concatenate((pad, np.cumsum(a, axis=0)))
+        out = cumulative[1:].copy()
+        out[window:] -= cumulative[1:-window]
+        return out
+
+    return trailing(valid.astype(np.float64)), trailing(filled), trailing(filled * filled)
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Mean over the trailing ``window`` periods; NaN unless all of them have a value."""
+    count, total, _ = _window_sums(values, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count == window, total / window, np.nan)
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Sample standard deviation over the trailing ``window`` periods, with the
+    same full-window rule as ``rolling_mean``."""
+    if window < 2:
+        return np.full(values.shape, np.nan)
+    count, total, squares = _window_sums(values, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = (squares - total * total / window) / (window - 1)
+        # Cancellation in the running sums can leave tiny negative variances
+        return np.where(count == window, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+
+
+def zscores(values: np.ndarray, window: int) -> np.ndarray:
+    """Distance of each value from its trailing mean, in trailing standard deviations."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = (values - rolling_mean(values, window)) / rolling_std(values, window)
+    return np.where(np.isfinite(z), z, np.nan)
+
+
+def annualized_volatility(returns: np.ndarray, periods_per_year: int) -> np.ndarray:
+    """Standard deviation of each column's returns, scaled to one year."""
+    valid = ~np.isnan(returns)
+    count = valid.sum(axis=0)
+    mean = np.where(valid, returns, 0.0).sum(axis=0) / np.maximum(count, 1)
+    squares = np.where(valid, (returns - mean) ** 2, 0.0).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 1, np.sqrt(squares / (count - 1) * periods_per_year), np.nan)
+
+
+def drawdowns(prices: np.ndarray) -> np.ndarray:
+    """Fractional fall of each price from the highest price before it (0 at a
+    new high, -0.25 when 25% below it). Gaps do not reset the running peak."""
+    peaks = np.fmax.accumulate(prices, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(peaks > 0, prices / peaks - 1.0, np.nan)
+
+
+def correlation_matrix(returns: np.ndarray) -> np.ndarray:
+    """Pearson correlation of every pair of columns over the periods where
+    both have a value. NaN for pairs with fewer than two shared periods or a
+    constant column."""
+    valid = (~np.isnan(returns)).astype(np.float64)
+    x = np.where(valid > 0, returns, 0.0)
+
+    # Pairwise sums restricted to shared periods, as matrix products:
+    # n[i, j] counts periods where both i and j have a value, s[i, j] sums
+    # column i over those periods, and so on.
+    n = valid.T @ valid
+    s = x.T @ valid
+    ss = (x * x).T @ valid
+    sxy = x.T @ x
+    with np.errstate(invalid="ignore", divide="ignore"):
+        covariance = sxy - s * s.T / n
+        variance_i = ss - s * s / n
+        corr = covariance / np.sqrt(variance_i * variance_i.T)
+    corr = np.where((n >= 2) & np.isfinite(corr), np.clip(corr, -1.0, 1.0), np.nan)
+    return corr
@@ -0,0 +1,276 @@
+"""
+Local stand-in for the two EIA v2 routes the syncs call.
+
+Serves deterministic synthetic price and production records in the shape of
+``api.eia.gov/v2``: ``response.total`` plus ``offset`` / ``length`` paging
+(at most 5000 records a page), the ``facets[series][]``, ``start`` and
+``end`` filters and ascending period order. Prices are generated daily and
+production monthly; other ``frequency`` values are served as averages
+(prices) or totals (production) over EIA's period formats: week-ending
+``YYYY-MM-DD``, ``YYYY-MM`` and ``YYYY``. A frequency a route does not
+offer gets a 400. Requests over ``rate_limit``
+per second, and a random ``error_rate`` share of the rest, get a 429 with
+``Retry-After: 0``, so the client's retry path is exercised too.
+
+Usage:
+    python -m backend.benchmarks.eia_server --scale 10 --port 8765
+    EIA_API_URL=http://127.0.0.1:8765/v2 python -m backend.scripts.sync_prices --full
+"""
+
+import argparse
+import json
+import math
+import random
+import statistics
+import threading
+import time
+from datetime import date, timedelta
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+PRICES_PATH = "/v2/natural-gas/pri/fut/data/"
+PRODUCTION_PATH = "/v2/natural-gas/prod/whv/data/"
+MAX_PAGE = 5000
+
+HISTORY_START = date(2010, 1, 4)
+HISTORY_END = date(2025, 12, 31)
+# Today's sync is 5 price series and about 50 production areas
+PRICE_SERIES_PER_SCALE = 5
+PRODUCTION_SERIES_PER_SCALE = 50
+
+
+def _walk(rng: random.Random, n: int, start: float, step: float, floor: float) -> list[float]:
+    values, value = [], start
+    for _ in range(n):
+        value = max(floor, value * math.exp(rng.gauss(0, step)))
+        values.append(round(value, 3))
+    return values
+
+
+class Dataset:
+    """Every record of one route, in ``(period, series)`` order."""
+
+    def __init__(self, records: list[dict]):
+        self.records = sorted(records, key=lambda r: (r["period"], r["series"]))
+
+    @lru_cache(maxsize=64)
+    def select(self, series: tuple[str, ...], start: str | None, end: str | None) -> list[dict]:
+        wanted = set(series)
+        return [
+            r
+            for r in self.records
+            if (not wanted or r["series"] in wanted)
+            and (start is None or r["period"] >= start)
+            and (end is None or r["period"] <= end)
+        ]
+
+
+def _week_ending(period: str) -> str:
+    day = date.fromisoformat(period)
+    return (day + timedelta(days=(4 - day.weekday()) % 7)).isoformat()  # Friday
+
+
+# Frequencies each route serves besides its native one, by how a native
+# period maps onto theirs
+PRICE_FREQUENCIES = {"weekly": _week_ending, "monthly": lambda p: p[:7], "annual": lambda p: p[:4]}
+PRODUCTION_FREQUENCIES = {"annual": lambda p: p[:4]}
+
+
+def aggregate(records: list[dict], period_of, combine) -> list[dict]:
+    """Records rolled up to the periods ``period_of`` maps theirs onto."""
+    groups: dict[tuple[str, str], list[dict]] = {}
+    for record in records:
+        groups.setdefault((record["series"], period_of(record["period"])), []).append(record)
+    return [
+        {**group[0], "period": period, "value": str(round(combine(float(r["value"]) for r in group), 3))}
+        for (_, period), group in groups.items()
+    ]
+
+
+class Route:
+    """One data route: its native records and, built on first request, their
+    roll-ups to the other frequencies it offers."""
+
+    def __init__(self, native: str, records: list[dict], frequencies: dict, combine):
+        self.native = native
+        self.frequencies = frequencies
+        self.combine = combine
+        self._datasets = {native: Dataset(records)}
+        self._lock = threading.Lock()
+
+    @property
+    def offered(self) -> list[str]:
+        return [self.native, *self.frequencies]
+
+    def dataset(self, frequency: str) -> Dataset | None:
+        if frequency not in self.offered:
+            return None
+        with self._lock:
+            if frequency not in self._datasets:
+                records = self._datasets[self.native].records
+                self._datasets[frequency] = Dataset(aggregate(records, self.frequencies[frequency], self.combine))
+            return self._datasets[frequency]
+
+
+def price_records(series_ids: list[str], seed: int) -> list[dict]:
+    days = [HISTORY_START + timedelta(days=i) for i in range((HISTORY_END - HISTORY_START).days + 1)]
+    days = [d.isoformat() for d in days if d.weekday() < 5]
+    records = []
+    for n, sid in enumerate(series_ids):
+        rng = random.Random(seed * 1_000_003 + n)
+        for period, value in zip(days, _walk(rng, len(days), 3.0, 0.03, 0.5)):
+            records.append({
+                "period": period,
+                "duoarea": "RGC",
+                "area-name": "NA",
+                "product": "EPG0",
+                "product-name": "Natural Gas",
+                "process": "PS0" if n == 0 else "PE1",
+                "process-name": "Spot Price" if n == 0 else "Future Contract 1",
+                "series": sid,
+                "series-description": f"Synthetic natural gas price {sid} (Dollars per Million Btu)",
+                "value": str(value),
+                "units": "$/MMBTU",
+            })
+    return records
+
+
+def production_records(areas: list[str], seed: int) -> list[dict]:
+    months = [f"{y}-{m:02d}" for y in range(HISTORY_START.year, HISTORY_END.year + 1) for m in range(1, 13)]
+    records = []
+    for n, area in enumerate(areas):
+        rng = random.Random(seed * 1_000_033 + n)
+        base = rng.uniform(1e3, 1e6)
+        for process, prefix, suffix in (("VGM", "N9050", "2"), ("FWA", "N9190", "3")):
+            for period, value in zip(months, _walk(rng, len(months), base, 0.02, 1.0)):
+                records.append({
+                    "period": period,
+                    "duoarea": f"S{area}",
+                    "area-name": f"Area {area}",
+                    "product": "EPG0",
+                    "product-name": "Natural Gas",
+                    "process": process,
+                    "process-name": "Marketed Production" if process == "VGM" else "Wellhead Price",
+                    "series": f"{prefix}{area}{suffix}",
+                    "series-description": f"Synthetic {process} for area {area}",
+                    "value": str(value),
+                    "units": "MMCF",
+                })
+    return records
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, scale: int = 1, seed: int = 1, rate_limit: float = 0.0, error_rate: float = 0.0):
+        super().__init__(address, _Handler)
+        # Distinct from the ids ``generate`` writes, so syncs never touch that data
+        self.price_series = [f"RBS{n:05d}" for n in range(PRICE_SERIES_PER_SCALE * scale)]
+        areas = [f"B{n:04d}" for n in range(PRODUCTION_SERIES_PER_SCALE * scale)]
+        self.production_series = [f"N9050{area}2" for area in areas]
+        self.routes = {
+            PRICES_PATH: Route("daily", price_records(self.price_series, seed), PRICE_FREQUENCIES, statistics.fmean),
+            PRODUCTION_PATH: Route("monthly", production_records(areas, seed), PRODUCTION_FREQUENCIES, math.fsum),
+        }
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.stats = {"requests": 0, "throttled": 0, "bytes": 0}
+        self._lock = threading.Lock()
+        self._window: list[float] = []
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v2"
+
+    def throttle(self) -> bool:
+        """Whether this request gets a 429."""
+        with self._lock:
+            self.stats["requests"] += 1
+            now = time.monotonic()
+            self._window = [t for t in self._window if now - t < 1.0]
+            limited = self.rate_limit > 0 and len(self._window) >= self.rate_limit
+            if not limited:
+                self._window.append(now)
+            if limited or self.rng.random() < self.error_rate:
+                self.stats["throttled"] += 1
+                return True
+            return False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StandInServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload: dict, headers: dict | None = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server._lock:
+            self.server.stats["bytes"] += len(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/stats":
+            self._send(200, self.server.stats)
+            return
+        route = self.server.routes.get(url.path)
+        if route is None:
+            self._send(404, {"error": f"no route {url.path}"})
+            return
+
+        params = parse_qsl(url.query)
+        query = dict(params)
+        if not query.get("api_key"):
+            self._send(403, {"error": {"code": "API_KEY_MISSING"}})
+            return
+        frequency = query.get("frequency", route.native)
+        dataset = route.dataset(frequency)
+        if dataset is None:
+            offered = ", ".join(route.offered)
+            self._send(400, {"error": f"Invalid frequency '{frequency}'; this route offers {offered}"})
+            return
+        if self.server.throttle():
+            self._send(429, {"error": {"code": "OVER_RATE_LIMIT"}}, {"Retry-After": "0"})
+            return
+
+        series = tuple(sorted(v for k, v in params if k == "facets[series][]"))
+        selected = dataset.select(series, query.get("start"), query.get("end"))
+        offset = int(query.get("offset", 0))
+        length = min(int(query.get("length", MAX_PAGE)), MAX_PAGE)
+        self._send(200, {
+            "response": {
+                "total": str(len(selected)),
+                "frequency": frequency,
+                "data": selected[offset : offset + length],
+            },
+            "apiVersion": "2.1.8",
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic EIA v2 responses for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--scale", type=int, default=1, help="Multiple of today's series count (default: 1)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--rate-limit", type=float, default=0, help="Requests per second before 429s (default: off)")
+    parser.add_argument("--error-rate", type=float, default=0, help="Share of requests answered 429 (default: 0)")
+    args = parser.parse_args()
+
+    server = StandInServer((args.host, args.port), args.scale, args.seed, args.rate_limit, args.error_rate)
+    print(f"Serving {len(server.price_series)} price and {len(server.production_series)} production series at {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Fill the benchmark database with synthetic prices and production.
+
+``--scale`` multiplies today's data: 5 daily / monthly price series
+(RNGWHHD, RNGC1-4 plus ``RBENCH`` series beyond the first five) and 51
+production series (the U.S. total and 50 areas) of monthly history, each
+since 1997. Prices are random walks and production a trend with
+seasonality, so downsampling and rollups see realistic shapes. Everything
+is generated inside PostgreSQL, a chunk of series per transaction; the
+catalog and rollups are rebuilt at the end, as the syncs would leave them.
+
+The tables are truncated first, so this only runs against the database in
+``BENCH_DATABASE_URL``.
+
+Usage:
+    BENCH_DATABASE_URL=postgresql://localhost/energy_bench python -m backend.benchmarks.generate --scale 10
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
+
+BENCH_DATABASE_URL = os.environ.get("BENCH_DATABASE_URL")
+if BENCH_DATABASE_URL:
+    # backend.database builds its engines from DATABASE_URL at import
+    os.environ["DATABASE_URL"] = BENCH_DATABASE_URL
+
+# Add project root to path so imports work when run as script
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+PRICE_SERIES = ["RNGWHHD", "RNGC1", "RNGC2", "RNGC3", "RNGC4"]
+PRODUCTION_AREAS = 50
+HISTORY_START = "1997-01-01"
+HISTORY_END = "2025-12-31"
+CHUNK_SERIES = 50
+
+
+def _series(conn, scale: int):
+    from sqlalchemy import text
+
+    price_ids = PRICE_SERIES + [f"RBENCH{n:05d}" for n in range(len(PRICE_SERIES) * (scale - 1))]
+    conn.execute(
+        text("""
+            INSERT INTO series (dataset, series_id, duoarea, area_name, product, process, units, source)
+            SELECT 'prices', s, 'RGC', 'NA', 'EPG0', 'PE1', '$/MMBTU', 'EIA' FROM unnest(CAST(:ids AS text[])) AS s
+        """),
+        {"ids": price_ids},
+    )
+    conn.execute(text("""
+        INSERT INTO series (dataset, series_id, duoarea, area_name, product, process, units, source)
+        VALUES ('production', 'N9050US2', 'NUS', 'U.S.', 'EPG0', 'VGM', 'MMCF', 'EIA')
+    """))
+    conn.execute(
+        text("""
+            INSERT INTO series (dataset, series_id, duoarea, area_name, product, process, units, source)
+            SELECT 'production', 'N9050' || lpad(n::text, 4, '0') || '2', 'S' || lpad(n::text, 4, '0'),
+                   'Area ' || lpad(n::text, 4, '0'), 'EPG0', 'VGM', 'MMCF', 'EIA'
+            FROM generate_series(1, :areas) AS n
+        """),
+        {"areas": PRODUCTION_AREAS * scale},
+    )
+
+
+def _price_chunk(conn, keys: list[int]):
+    from sqlalchemy import text
+
+    conn.execute(
+        text("""
+            INSERT INTO natural_gas_prices (series_key, frequency, period, price, fetched_at)
+            SELECT series_key, 'daily', d,
+                   round((3 * exp(sum(step) OVER (PARTITION BY series_key ORDER BY d)))::numeric, 4), now()
+            FROM (
+                SELECT k AS series_key, d::date AS d, (random() - 0.5) * 0.06 AS step
+                FROM unnest(CAST(:keys AS int[])) AS k
+                CROSS JOIN generate_series(CAST(:start AS date), CAST(:end AS date), interval '1 day') AS d
+                WHERE extract(isodow FROM d) < 6
+            ) AS steps
+        """),
+        {"keys": keys, "start": HISTORY_START, "end": HISTORY_END},
+    )
+    conn.execute(
+        text("""
+            INSERT INTO natural_gas_prices (series_key, frequency, period, price, fetched_at)
+            SELECT series_key, 'monthly', date_trunc('month', period)::date, round(avg(price), 4), now()
+            FROM natural_gas_prices
+            WHERE frequency = 'daily' AND series_key = ANY(CAST(:keys AS int[]))
+            GROUP BY series_key, date_trunc('month', period)
+        """),
+        {"keys": keys},
+    )
+
+
+def _production_chunk(conn, keys: list[int]):
+    from sqlalchemy import text
+
+    conn.execute(
+        text("""
+            INSERT INTO natural_gas_production (series_key, frequency, period, value, fetched_at)
+            SELECT k, 'monthly', d::date,
+                   round((base * (1 + 0.004 * i) * (1 + 0.08 * cos(extract(month FROM d) * pi() / 6))
+                          * (0.97 + random() * 0.06))::numeric, 2),
+                   now()
+            FROM (SELECT k, 1e3 + random() * 1e6 AS base FROM unnest(CAST(:keys AS int[])) AS k) AS s
+            CROSS JOIN LATERAL generate_series(CAST(:start AS date), CAST(:end AS date), interval '1 month')
+                WITH ORDINALITY AS g (d, i)
+        """),
+        {"keys": keys, "start": HISTORY_START, "end": HISTORY_END},
+    )
+
+
+def generate(scale: int, seed: int = 1):
+    from sqlalchemy import select, text
+
+    from backend.catalog import refresh_catalog
+    from backend.database import engine
+    from backend.migrations import migrate
+    from backend.models import Series
+    from backend.rollups import refresh_rollups
+
+    migrate()
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(text("""
+            TRUNCATE series, natural_gas_prices, natural_gas_production, series_catalog, series_rollups,
+                     sync_state, sync_runs, data_generations RESTART IDENTITY CASCADE
+        """))
+        _series(conn, scale)
+
+    for dataset, load in (("prices", _price_chunk), ("production", _production_chunk)):
+        with engine.connect() as conn:
+            keys = list(conn.scalars(select(Series.id).where(Series.dataset == dataset).order_by(Series.id)))
+        for i in range(0, len(keys), CHUNK_SERIES):
+            with engine.begin() as conn:
+                # Reseeding per chunk keeps the random walks repeatable
+                conn.execute(text("SELECT setseed(:s)"), {"s": ((seed * 7919 + i) % 2000) / 1000 - 1})
+                load(conn, keys[i : i + CHUNK_SERIES])
+            print(f"  {dataset}: {min(i + CHUNK_SERIES, len(keys))}/{len(keys)} series")
+        with engine.begin() as conn:
+            refresh_catalog(conn, dataset)
+            refresh_rollups(conn, dataset)
+        print(f"  {dataset}: catalog and rollups rebuilt")
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE"))
+        rows = dict(
+            conn.execute(text("""
+                SELECT relname, reltuples::bigint FROM pg_class
+                WHERE relname IN ('natural_gas_prices', 'natural_gas_production')
+            """)).all()
+        )
+    print(
+        f"Generated scale {scale}: {rows['natural_gas_prices']} price rows, "
+        f"{rows['natural_gas_production']} production rows in {time.perf_counter() - started:.0f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill the benchmark database with synthetic data")
+    parser.add_argument("--scale", type=int, default=10, help="Multiple of today's data volume (default: 10)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if not BENCH_DATABASE_URL:
+        print("ERROR: BENCH_DATABASE_URL not set; the generator truncates every table it fills")
+        sys.exit(1)
+    generate(args.scale, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Benchmark runner: API routes and the full, incremental and monthly sync paths.
+
+Routes are called in-process through the ASGI app, with the response cache
+off, so every call reaches the database. Syncs run against the stand-in EIA
+server (``eia_server``) on a free local port with the client rate limit
+lifted; their series are disjoint from the generated data and are removed
+again afterwards. Incremental runs first drop each synced series' last
+``INCREMENTAL_DAYS`` / ``INCREMENTAL_MONTHS`` and move its watermark back,
+so every iteration loads the same new rows.
+
+Each benchmark reports p50 / p95 / p99 / mean latency and rows per second.
+Results are written as JSON with the commit and data volume they were
+measured on; ``--compare`` prints the change against an earlier result and
+exits non-zero when a p50 regressed by more than ``--threshold`` percent.
+
+Usage:
+    export BENCH_DATABASE_URL=postgresql://localhost/energy_bench
+    python -m backend.benchmarks.generate --scale 10
+    python -m backend.benchmarks.run
+    python -m backend.benchmarks.run --only get_prices,list_states --iterations 200
+    python -m backend.benchmarks.run --compare backend/benchmarks/results/baseline.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from datetime import UTC, date, datetime, timedelta
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
+
+# Add project root to path so imports work when run as script
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from backend.benchmarks.eia_server import HISTORY_END, StandInServer
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+INCREMENTAL_DAYS = 30
+INCREMENTAL_MONTHS = 3
+
+# (name, path, query parameters) of the route benchmarks
+ROUTES = [
+    ("get_prices", "/api/prices", {"series_id": "RNGWHHD", "frequency": "monthly", "limit": 60}),
+    ("get_prices_daily", "/api/prices", {"series_id": "RNGWHHD", "frequency": "daily", "limit": 5000}),
+    ("get_prices_downsampled", "/api/prices", {"series_id": "RNGWHHD", "frequency": "daily", "limit": 10000, "max_points": 500}),
+    ("get_production", "/api/production", {"series_id": "N9050US2", "limit": 120}),
+    ("list_states", "/api/production/states", {}),
+]
+SYNCS = [
+    "sync_prices_full",
+    "sync_prices_incremental",
+    "sync_prices_monthly_full",
+    "sync_production_full",
+    "sync_production_incremental",
+]
+
+
+def summarize(seconds: list[float], rows: int) -> dict:
+    """Latency percentiles in milliseconds, and rows per second at the median."""
+    ms = np.array(seconds) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "iterations": len(ms),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+        "min_ms": round(float(ms.min()), 3),
+        "rows": rows,
+        "rows_per_sec": round(rows / (p50 / 1000), 1) if p50 > 0 else None,
+    }
+
+
+def _row_count(body: dict) -> int:
+    for key in ("data", "states", "points"):
+        if isinstance(body.get(key), list):
+            return len(body[key])
+    return 0
+
+
+async def bench_routes(names: list[str], iterations: int, warmup: int) -> dict:
+    import httpx
+
+    from backend.main import app
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, path, params in ROUTES:
+            if name not in names:
+                continue
+            for _ in range(warmup):
+                (await client.get(path, params=params)).raise_for_status()
+            timings = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                resp = await client.get(path, params=params)
+                timings.append(time.perf_counter() - started)
+                resp.raise_for_status()
+            results[name] = summarize(timings, _row_count(resp.json()))
+            print(f"  {name:<28} p50 {results[name]['p50_ms']:>9.2f} ms  p99 {results[name]['p99_ms']:>9.2f} ms")
+    return results
+
+
+def _series_keys(conn, dataset: str, series_ids: list[str]) -> list[int]:
+    from sqlalchemy import select
+
+    from backend.models import Series
+
+    return list(
+        conn.scalars(select(Series.id).where(Series.dataset == dataset, Series.series_id.in_(series_ids)))
+    )
+
+
+def remove_synced(server: StandInServer):
+    """Delete everything the sync benchmarks loaded."""
+    from sqlalchemy import text
+
+    from backend.database import engine
+
+    with engine.begin() as conn:
+        for dataset, table, series_ids in (
+            ("prices", "natural_gas_prices", server.price_series),
+            ("production", "natural_gas_production", server.production_series),
+        ):
+            keys = _series_keys(conn, dataset, series_ids)
+            for name in (table, "series_rollups", "series_catalog"):
+                conn.execute(text(f"DELETE FROM {name} WHERE series_key = ANY(:keys)"), {"keys": keys})
+            conn.execute(text("DELETE FROM series WHERE id = ANY(:keys)"), {"keys": keys})
+            conn.execute(
+                text("DELETE FROM sync_state WHERE dataset = :dataset AND series_id = ANY(:ids)"),
+                {"dataset": dataset, "ids": [*series_ids, "*"]},
+            )
+
+
+def rewind(dataset: str, frequency: str, table: str, series_ids: list[str], cutoff: date):
+    """Drop the synced rows after ``cutoff`` and move the watermarks back to it."""
+    from sqlalchemy import text
+
+    from backend.database import engine
+
+    with engine.begin() as conn:
+        keys = _series_keys(conn, dataset, series_ids)
+        conn.execute(
+            text(f"DELETE FROM {table} WHERE series_key = ANY(:keys) AND frequency = :frequency AND period > :cutoff"),
+            {"keys": keys, "frequency": frequency, "cutoff": cutoff},
+        )
+        conn.execute(
+            text("""
+                UPDATE sync_state SET high_water = :cutoff, resume_key = NULL, resume_offset = NULL
+                WHERE dataset = :dataset AND frequency = :frequency AND series_id = ANY(:ids)
+            """),
+            {"cutoff": cutoff, "dataset": dataset, "frequency": frequency, "ids": series_ids},
+        )
+
+
+async def bench_syncs(server: StandInServer, names: list[str], iterations: int, loader: str, concurrency: int) -> dict:
+    from backend.scripts import sync_prices, sync_production
+
+    # The stand-in has no request budget to respect; measure the pipeline, not the limiter
+    sync_prices.RATE_LIMIT = sync_production.RATE_LIMIT = 1000.0
+    month = HISTORY_END.year * 12 + HISTORY_END.month - 1 - INCREMENTAL_MONTHS
+    price_cutoff = HISTORY_END - timedelta(days=INCREMENTAL_DAYS)
+    production_cutoff = date(month // 12, month % 12 + 1, 1)
+
+    def prices(full: bool, frequency: str = "daily"):
+        return sync_prices.run_sync(
+            "bench", server.price_series, frequency, full=full, concurrency=concurrency, loader=loader
+        )
+
+    def production(full: bool):
+        return sync_production.run_sync("bench", full=full, concurrency=concurrency, loader=loader)
+
+    cases = {
+        "sync_prices_full": (lambda: remove_synced(server), lambda: prices(True)),
+        "sync_prices_incremental": (
+            lambda: rewind("prices", "daily", "natural_gas_prices", server.price_series, price_cutoff),
+            lambda: prices(False),
+        ),
+        "sync_prices_monthly_full": (lambda: remove_synced(server), lambda: prices(True, "monthly")),
+        "sync_production_full": (lambda: remove_synced(server), lambda: production(True)),
+        "sync_production_incremental": (
+            lambda: rewind(
+                "production", "monthly", "natural_gas_production", server.production_series, production_cutoff
+            ),
+            lambda: production(False),
+        ),
+    }
+
+    results = {}
+    try:
+        for name in SYNCS:
+            if name not in names:
+                continue
+            prepare, sync = cases[name]
+            if name.endswith("_incremental"):
+                # Needs the full history loaded once
+                with contextlib.redirect_stdout(io.StringIO()):
+                    await (prices(True) if "prices" in name else production(True))
+            timings, rows = [], 0
+            for _ in range(iterations):
+                await asyncio.to_thread(prepare)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    started = time.perf_counter()
+                    stats = await sync()
+                    timings.append(time.perf_counter() - started)
+                rows = stats.records
+            results[name] = summarize(timings, rows)
+            print(
+                f"  {name:<28} p50 {results[name]['p50_ms'] / 1000:>8.2f} s   "
+                f"{results[name]['rows_per_sec'] or 0:>10.0f} rows/s"
+            )
+    finally:
+        await asyncio.to_thread(remove_synced, server)
+    return results
+
+
+def environment(note: str | None) -> dict:
+    from sqlalchemy import text
+
+    from backend.database import engine
+
+    def git(*args) -> str | None:
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    with engine.connect() as conn:
+        server_version = conn.scalar(text("SHOW server_version"))
+        volume = dict(
+            conn.execute(text("""
+                SELECT relname, reltuples::bigint FROM pg_class
+                WHERE relname IN ('series', 'natural_gas_prices', 'natural_gas_production')
+            """)).all()
+        )
+    return {
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "postgres": server_version,
+        "host": platform.node(),
+        "rows": volume,
+        "note": note,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> bool:
+    """Print the change of every shared benchmark; False when a p50 regressed
+    by more than ``threshold`` percent."""
+    ok = True
+    print(f"\nAgainst {baseline['environment'].get('commit')} ({baseline['environment'].get('timestamp')}):")
+    print(f"  {'benchmark':<28} {'p50 before':>12} {'p50 after':>12} {'change':>8}  {'p99 change':>10}")
+    for name, result in current["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if before is None:
+            continue
+        change = (result["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100
+        p99_change = (result["p99_ms"] - before["p99_ms"]) / before["p99_ms"] * 100
+        flag = "  REGRESSION" if change > threshold else ""
+        ok = ok and not flag
+        print(
+            f"  {name:<28} {before['p50_ms']:>10.2f}ms {result['p50_ms']:>10.2f}ms "
+            f"{change:>+7.1f}%  {p99_change:>+9.1f}%{flag}"
+        )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the API routes and the sync paths")
+    parser.add_argument("--only", help=f"Comma-separated benchmarks (default: all of {', '.join(n for n, *_ in ROUTES)}, {', '.join(SYNCS)})")
+    parser.add_argument("--iterations", type=int, default=50, help="Calls per route benchmark (default: 50)")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed calls before each route benchmark (default: 5)")
+    parser.add_argument("--sync-iterations", type=int, default=3, help="Runs per sync benchmark (default: 3)")
+    parser.add_argument("--sync-scale", type=int, default=10, help="Stand-in EIA data, as a multiple of today's (default: 10)")
+    parser.add_argument("--loader", choices=["insert", "copy"], default="insert", help="Sync write path (default: insert)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Sync pages fetched in parallel (default: 4)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of stand-in responses that are 429s (default: 0)")
+    parser.add_argument("--note", help="Free text saved with the results, e.g. the generator scale")
+    parser.add_argument("--output", help="Result file (default: results/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="p50 regression that fails --compare, in percent (default: 10)")
+    args = parser.parse_args()
+
+    bench_url = os.environ.get("BENCH_DATABASE_URL")
+    if not bench_url:
+        print("ERROR: BENCH_DATABASE_URL not set; generate data there first with backend.benchmarks.generate")
+        sys.exit(1)
+
+    server = StandInServer(("127.0.0.1", 0), args.sync_scale, error_rate=args.error_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # Read by backend.database, backend.cache and the sync scripts at import
+    os.environ["DATABASE_URL"] = bench_url
+    os.environ["RESPONSE_CACHE_MAX_ENTRIES"] = "0"
+    os.environ["EIA_API_URL"] = server.url
+    os.environ["EIA_ARCHIVE_DIR"] = ""
+
+    names = [n.strip() for n in args.only.split(",")] if args.only else [n for n, *_ in ROUTES] + SYNCS
+
+    print("Routes:")
+    benchmarks = asyncio.run(bench_routes(names, args.iterations, args.warmup))
+    if any(n in SYNCS for n in names):
+        print(f"Syncs ({len(server.price_series)} price / {len(server.production_series)} production series, loader={args.loader}):")
+        benchmarks |= asyncio.run(bench_syncs(server, names, args.sync_iterations, args.loader, args.concurrency))
+    server.shutdown()
+
+    result = {"environment": environment(args.note), "benchmarks": benchmarks}
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{result['environment']['commit'] or 'unknown'}.json")
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Saved {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if not compare(result, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
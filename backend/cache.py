@@ -0,0 +1,199 @@
+"""In-process response cache for the read-only API routes.
+
+Entries hold serialized JSON bytes and are tagged with the data generation of
+their dataset. The sync scripts bump that generation in the same transaction
+as their upsert. The generation is re-read at most once per
+``GENERATION_POLL_INTERVAL`` seconds, so an entry is served for at most that
+long after a newer sync has committed, and cache hits rarely touch the DB.
+"""
+
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import NamedTuple
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from .http_cache import is_not_modified, make_etag, validator_headers
+from .models import DataGeneration
+
+CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+CACHE_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "3600"))
+# How long a generation read from the DB is trusted. 0 checks on every request.
+GENERATION_POLL_INTERVAL = float(os.environ.get("RESPONSE_CACHE_GENERATION_POLL", "1"))
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    media_type: str
+    etag: str
+    last_modified: datetime | None
+
+
+class ResponseCache:
+    """Bounded LRU cache with a TTL and a total size limit in bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()  # key -> (generation, expires_at, CachedResponse)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key, generation: int) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            entry_generation, expires_at, response = entry
+            if entry_generation != generation:
+                self._remove(key)
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def put(self, key, generation: int, response: CachedResponse):
+        if self.max_entries <= 0 or len(response.body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (generation, time.monotonic() + self.ttl, response)
+            self._bytes += len(response.body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key):
+        _, _, response = self._entries.pop(key)
+        self._bytes -= len(response.body)
+
+
+response_cache = ResponseCache(CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, CACHE_TTL)
+
+_generations: dict[str, tuple[int, float]] = {}
+
+
+async def current_generation(db, dataset: str) -> int:
+    """Return the data generation of ``dataset``, re-reading it from the DB
+    at most once per ``GENERATION_POLL_INTERVAL`` seconds."""
+    now = time.monotonic()
+    cached = _generations.get(dataset)
+    if cached is not None and now - cached[1] < GENERATION_POLL_INTERVAL:
+        return cached[0]
+    generation = (
+        await db.execute(select(DataGeneration.generation).where(DataGeneration.dataset == dataset))
+    ).scalar()
+    generation = generation or 0
+    _generations[dataset] = (generation, now)
+    return generation
+
+
+def bump_generation(db, dataset: str):
+    """Advance the generation of ``dataset``. Call inside the sync transaction
+    so the bump becomes visible exactly when the new rows do."""
+    stmt = insert(DataGeneration).values(dataset=dataset, generation=1, updated_at=func.now())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DataGeneration.dataset],
+        set_={
+            "generation": DataGeneration.generation + 1,
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt)
+
+
+def cached_response(dataset: str, validator, vary: str | None = None):
+    """Serve a route's JSON from ``response_cache`` with HTTP validators.
+
+    ``validator`` maps the route's parameters to a statement selecting the row
+    count and newest ``fetched_at`` of the data the route reads. On a cache
+    miss it is run first, so a matching If-None-Match / If-Modified-Since is
+    answered with 304 before any rows are loaded. ``vary`` is sent as the
+    ``Vary`` header of every response and 304, for routes whose body depends
+    on request headers (``"Accept"`` for the format-negotiated ones).
+
+    The decorated endpoint must be a coroutine taking a ``db`` async session
+    argument and return
+    either a Pydantic model or an already encoded ``Response``.
+    """
+
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, request: Request, **kwargs):
+            db = kwargs["db"]
+            params = tuple(sorted((k, v) for k, v in kwargs.items() if k != "db"))
+            key = (endpoint.__module__, endpoint.__name__, params)
+
+            generation = await current_generation(db, dataset)
+            cached = response_cache.get(key, generation)
+            if cached is None:
+                count, last_modified = (await db.execute(validator(**kwargs))).one()
+                etag = make_etag(key, count, last_modified)
+                if is_not_modified(request.headers, etag, last_modified):
+                    return Response(status_code=304, headers=validator_headers(etag, last_modified, vary))
+                result = await endpoint(*args, **kwargs)
+                if isinstance(result, Response):
+                    cached = CachedResponse(result.body, result.media_type, etag, last_modified)
+                else:
+                    body = result.model_dump_json().encode()
+                    cached = CachedResponse(body, "application/json", etag, last_modified)
+                response_cache.put(key, generation, cached)
+
+            headers = validator_headers(cached.etag, cached.last_modified, vary)
+            if is_not_modified(request.headers, cached.etag, cached.last_modified):
+                return Response(status_code=304, headers=headers)
+            return Response(content=cached.body, media_type=cached.media_type, headers=headers)
+
+        # Expose the Request to FastAPI without adding it to every route signature
+        signature = inspect.signature(endpoint)
+        wrapper.__signature__ = signature.replace(
+            parameters=[
+                *signature.parameters.values(),
+                inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+            ]
+        )
+        return wrapper
+
+    return decorator
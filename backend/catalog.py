@@ -0,0 +1,112 @@
+"""
+Series catalog: one summary row per (series, frequency).
+
+The sync scripts fold each batch's changed rows into the catalog rows of their
+series (``update_catalog``), in the same transaction as the upsert, so the
+catalog is exactly as current as the facts at a cost that follows the batch
+rather than each series' history. The syncs never delete facts; after rows
+are deleted by hand, ``refresh_catalog`` recomputes the catalog from scratch. ``/api/prices/series`` and ``/api/production/states`` read the
+catalog instead of scanning the fact tables.
+"""
+
+from sqlalchemy import Date, DateTime, Integer, String, column, func, select, tuple_, values
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
+
+from .models import NaturalGasPrice, NaturalGasProduction, SeriesCatalog
+
+FACT_TABLES = {
+    "prices": (NaturalGasPrice, NaturalGasPrice.price),
+    "production": (NaturalGasProduction, NaturalGasProduction.value),
+}
+
+SUMMARY_COLUMNS = ["first_period", "last_period", "row_count", "latest_value", "last_fetched_at"]
+
+
+def refresh_catalog(db, dataset: str, series_keys=None):
+    """Recompute the catalog rows of ``series_keys`` (all series when None).
+
+    Rows whose summary is unchanged are left alone.
+    """
+    model, value = FACT_TABLES[dataset]
+    summary = select(
+        model.series_key,
+        model.frequency,
+        func.min(model.period),
+        func.max(model.period),
+        func.count(),
+        func.array_agg(aggregate_order_by(value, model.period.desc()))[1],
+        func.max(model.fetched_at),
+        func.now(),
+    ).group_by(model.series_key, model.frequency)
+    if series_keys is not None:
+        summary = summary.where(model.series_key.in_(list(series_keys)))
+
+    stmt = insert(SeriesCatalog).from_select(
+        ["series_key", "frequency", *SUMMARY_COLUMNS, "updated_at"], summary
+    )
+    target = SeriesCatalog.__table__.c
+    stmt = stmt.on_conflict_do_update(
+        constraint="pk_series_catalog",
+        set_={c: stmt.excluded[c] for c in [*SUMMARY_COLUMNS, "updated_at"]},
+        where=tuple_(*(target[c] for c in SUMMARY_COLUMNS)).is_distinct_from(
+            tuple_(*(stmt.excluded[c] for c in SUMMARY_COLUMNS))
+        ),
+    )
+    db.execute(stmt)
+
+
+def update_catalog(db, dataset: str, changes):
+    """Fold one batch's changes into the catalog rows of its series.
+
+    ``changes`` maps ``(series_key, frequency)`` to the inserted count, first
+    and last period and newest ``fetched_at`` of the rows the batch inserted or
+    updated (``loaders.SeriesChange``). The period range widens, inserts add to
+    ``row_count`` and ``latest_value`` is re-read with one backward probe of
+    the primary key.
+    """
+    model, value = FACT_TABLES[dataset]
+    batch = values(
+        column("series_key", Integer),
+        column("frequency", String),
+        column("first_period", Date),
+        column("last_period", Date),
+        column("row_count", Integer),
+        column("last_fetched_at", DateTime(timezone=True)),
+        name="batch",
+    ).data([
+        (series_key, frequency, c.first_period, c.last_period, c.inserted, c.last_fetched_at)
+        for (series_key, frequency), c in changes.items()
+    ])
+    latest = (
+        select(value)
+        .where(model.series_key == batch.c.series_key, model.frequency == batch.c.frequency)
+        .order_by(model.period.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    stmt = insert(SeriesCatalog).from_select(
+        ["series_key", "frequency", *SUMMARY_COLUMNS, "updated_at"],
+        select(
+            batch.c.series_key,
+            batch.c.frequency,
+            batch.c.first_period,
+            batch.c.last_period,
+            batch.c.row_count,
+            latest,
+            batch.c.last_fetched_at,
+            func.now(),
+        ),
+    )
+    target = SeriesCatalog.__table__.c
+    stmt = stmt.on_conflict_do_update(
+        constraint="pk_series_catalog",
+        set_={
+            "first_period": func.least(target.first_period, stmt.excluded.first_period),
+            "last_period": func.greatest(target.last_period, stmt.excluded.last_period),
+            "row_count": target.row_count + stmt.excluded.row_count,
+            "latest_value": stmt.excluded.latest_value,
+            "last_fetched_at": func.greatest(target.last_fetched_at, stmt.excluded.last_fetched_at),
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    db.execute(stmt)
@@ -0,0 +1,151 @@
+"""Response compression middleware negotiating brotli or gzip.
+
+Brotli is used when the optional ``brotli`` package is installed and the client
+prefers it; otherwise gzip. Responses under ``minimum_size`` bytes are sent
+as-is. Streaming responses are compressed chunk by chunk.
+
+Whenever an encoding is negotiated, every 200 and 304 carries
+``Vary: Accept-Encoding`` and the encoding's ETag suffix, whether or not the
+body ended up compressed, so a 304 always repeats the validator of the 200 it
+stands for.
+"""
+
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+SKIP_CONTENT_TYPES = ("image/", "video/", "audio/", "application/gzip", "application/zip")
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Pick ``br`` or ``gzip`` from an Accept-Encoding header, honouring q-values."""
+    offered = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[token.strip().lower()] = q
+
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_q = None, 0.0
+    for encoding in candidates:
+        q = offered.get(encoding, offered.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def _mark_encoding(headers: MutableHeaders, encoding: str) -> None:
+    """Give the representation negotiated for ``encoding`` its own strong validator."""
+    headers.add_vary_header("Accept-Encoding")
+    etag = headers.get("etag")
+    if etag is not None and etag.endswith('"'):
+        headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+
+
+class _Compressor:
+    def __init__(self, encoding: str, level: int):
+        if encoding == "br":
+            self._obj = brotli.Compressor(quality=min(level, 11))
+            self._flush = self._obj.flush
+            self._finish = self._obj.finish
+            self._compress = self._obj.process
+        else:
+            self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = gzip container
+            self._flush = lambda: self._obj.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._obj.flush
+            self._compress = self._obj.compress
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compress(data) + self._flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compress(data) + self._finish()
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024, level: int = 6):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if (
+                    "content-encoding" in headers
+                    or message["status"] == 204
+                    or content_type.startswith(SKIP_CONTENT_TYPES)
+                ):
+                    passthrough = True
+                    await send(message)
+                elif message["status"] == 304:
+                    _mark_encoding(MutableHeaders(raw=message["headers"]), encoding)
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message  # held until the first body chunk
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    _mark_encoding(MutableHeaders(raw=start_message["headers"]), encoding)
+                    await send(start_message)
+                    await send(message)
+                    passthrough = True
+                    return
+
+                compressor = _Compressor(encoding, self.level)
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers["Content-Encoding"] = encoding
+                _mark_encoding(headers, encoding)
+                if more_body:
+                    del headers["Content-Length"]
+                    await send(start_message)
+                else:
+                    compressed = compressor.finish(body)
+                    headers["Content-Length"] = str(len(compressed))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+
+            if more_body:
+                await send({"type": "http.response.body", "body": compressor.chunk(body), "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": compressor.finish(body)})
+
+        await self.app(scope, receive, send_compressed)
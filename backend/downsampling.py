@@ -0,0 +1,77 @@
+"""Downsampling of long time series to a bounded number of points for charting.
+
+Both algorithms return the sorted indices of the points to keep, so callers
+can slice whatever row objects they already hold. The first and last points
+are always kept.
+"""
+
+import numpy as np
+
+ALGORITHMS = ("lttb", "minmax")
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: keep the point per bucket that forms the
+    largest triangle with the previously kept point and the next bucket's mean."""
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])
+
+    # Interior points are split into n_out - 2 buckets of near-equal size
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Mean of each bucket, plus the last point standing in for the bucket after the final one
+    counts = ends - starts
+    sum_x = np.add.reduceat(x[1 : n - 1], starts - 1)
+    sum_y = np.add.reduceat(y[1 : n - 1], starts - 1)
+    next_x = np.append((sum_x / counts)[1:], x[-1])
+    next_y = np.append((sum_y / counts)[1:], y[-1])
+
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    prev = 0
+    for b in range(n_out - 2):
+        bx = x[starts[b] : ends[b]]
+        by = y[starts[b] : ends[b]]
+        # Twice the triangle area; the constant factor does not change the argmax
+        area = np.abs(
+            (x[prev] - next_x[b]) * (by - y[prev])
+            - (x[prev] - bx) * (next_y[b] - y[prev])
+        )
+        prev = starts[b] + int(np.argmax(area))
+        keep[b + 1] = prev
+    return keep
+
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Keep the minimum and maximum of each bucket, which preserves every spike."""
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 4:
+        return np.array([0, n - 1])
+
+    n_buckets = (n_out - 2) // 2
+    bucket = np.arange(n - 2) * n_buckets // (n - 2)
+    # Sort by bucket, then value: the first entry of each bucket run is its
+    # minimum and the last is its maximum.
+    order = np.lexsort((y[1 : n - 1], bucket)) + 1
+    run_starts = np.searchsorted(bucket[order - 1], np.arange(n_buckets))
+    run_ends = np.append(run_starts[1:], n - 2) - 1
+
+    keep = np.concatenate(([0, n - 1], order[run_starts], order[run_ends]))
+    return np.unique(keep)
+
+
+def downsample_indices(x, y, max_points: int, algorithm: str = "lttb") -> np.ndarray:
+    """Indices of at most ``max_points`` points chosen by ``algorithm``."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if algorithm == "lttb":
+        return lttb_indices(x, y, max_points)
+    if algorithm == "minmax":
+        return minmax_indices(x, y, max_points)
+    raise ValueError(f"unknown downsampling algorithm: {algorithm}")
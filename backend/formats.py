@@ -0,0 +1,104 @@
+"""Compact response encodings for time-series routes.
+
+Besides the default list-of-objects JSON, series can be returned as columnar
+JSON (``{"dates": [...], "values": [...]}``), MessagePack or an Apache Arrow
+IPC stream. MessagePack and Arrow use the ``msgpack`` and ``pyarrow``
+packages; an install without them answers those formats with 406.
+"""
+
+import json
+from datetime import date
+
+from fastapi import HTTPException, Query, Request, Response
+
+FORMATS = ("json", "columnar", "msgpack", "arrow")
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "columnar": "application/json",
+    "msgpack": "application/msgpack",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# Accept header media types that select a non-default format
+ACCEPT_FORMATS = {
+    "application/msgpack": "msgpack",
+    "application/x-msgpack": "msgpack",
+    "application/vnd.apache.arrow.stream": "arrow",
+}
+
+
+def response_format(
+    request: Request,
+    format: str | None = Query(None, pattern="^(json|columnar|msgpack|arrow)$"),
+) -> str:
+    """Resolve the response format from ``?format=`` or, failing that, Accept.
+
+    Routes using this must send ``Vary: Accept`` (``cached_response(vary=...)``).
+    """
+    if format is not None:
+        return format
+    for part in request.headers.get("accept", "").split(","):
+        media_type = part.split(";")[0].strip().lower()
+        if media_type in ACCEPT_FORMATS:
+            return ACCEPT_FORMATS[media_type]
+    return "json"
+
+
+def encode_series(
+    fmt: str,
+    meta: dict,
+    periods: list[date],
+    values: list[float | None],
+    date_fmt: str,
+    extra: dict[str, list] | None = None,
+) -> Response:
+    """Encode one series in ``fmt``. ``meta`` holds scalar fields such as
+    ``series_id`` and ``units``; missing values stay null. ``extra`` adds
+    columns alongside ``values``, e.g. the OHLC fields of a resampled series."""
+    extra = extra or {}
+    if fmt == "columnar":
+        body = json.dumps(
+            {
+                **meta,
+                "count": len(periods),
+                "dates": [p.strftime(date_fmt) for p in periods],
+                "values": values,
+                **extra,
+            },
+            separators=(",", ":"),
+        ).encode()
+    elif fmt == "msgpack":
+        try:
+            import msgpack
+        except ImportError:
+            raise HTTPException(status_code=406, detail="msgpack format requires the msgpack package")
+        body = msgpack.packb(
+            {
+                **meta,
+                "count": len(periods),
+                "dates": [p.strftime(date_fmt) for p in periods],
+                "values": values,
+                **extra,
+            }
+        )
+    elif fmt == "arrow":
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise HTTPException(status_code=406, detail="arrow format requires the pyarrow package")
+        table = pa.table(
+            {
+                "date": pa.array(periods, type=pa.date32()),
+                "value": pa.array(values, type=pa.float64()),
+                **{name: pa.array(column) for name, column in extra.items()},
+            },
+            metadata={k: str(v) for k, v in meta.items() if v is not None},
+        )
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        body = sink.getvalue().to_pybytes()
+    else:
+        raise ValueError(f"unsupported series format: {fmt}")
+    return Response(content=body, media_type=MEDIA_TYPES[fmt])
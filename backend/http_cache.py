@@ -0,0 +1,60 @@
+"""HTTP validators (ETag / Last-Modified) and conditional GET handling."""
+
+import hashlib
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+# Suffixes CompressionMiddleware appends to the ETag of encoded responses
+ENCODING_SUFFIXES = ("-br", "-gzip")
+
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(key, count: int, last_modified: datetime | None) -> str:
+    """Strong ETag for the rows a request selects, identified by its cache key,
+    their count and the newest ``fetched_at`` among them."""
+    stamp = last_modified.isoformat() if last_modified else ""
+    digest = hashlib.sha1(repr((key, count, stamp)).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _strip_encoding(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix + '"'):
+            return tag[: -len(suffix) - 1] + '"'
+    return tag
+
+
+def is_not_modified(headers, etag: str, last_modified: datetime | None) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since (RFC 9110 §13.2.2)."""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        return any(_strip_encoding(tag) == etag for tag in if_none_match.split(","))
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    # HTTP dates have one-second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+
+def validator_headers(etag: str, last_modified: datetime | None, vary: str | None = None) -> dict[str, str]:
+    """Validators for a 200 or 304; ``vary`` names the request headers the
+    representation was negotiated on, which both must carry."""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if vary is not None:
+        headers["Vary"] = vary
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(UTC), usegmt=True)
+    return headers
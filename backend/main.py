@@ -1,26 +1,93 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from .database import Base, engine
+from .cache import response_cache
+from .compression import CompressionMiddleware
+from .database import async_engine, engine, get_async_db
+from .metrics import CONTENT_TYPE, MetricsMiddleware, cache_families, instrument_engine, registry, sync_run_families
+from .migrations import migrate
+from .models import SyncRun
+from .profiling import PROFILING_ENABLED, ProfilingMiddleware, capture_statements
+from .routers.analytics import router as analytics_router
+from .routers.export import router as export_router
 from .routers.prices import router as prices_router
 from .routers.production import router as production_router
-from .schemas import HealthResponse
+from .routers.profiles import router as profiles_router
+from .schemas import CacheStatsResponse, HealthResponse
+
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+registry.collectors.append(lambda: cache_families(response_cache.stats()))
+if PROFILING_ENABLED:
+    capture_statements(engine, "sync")
+    capture_statements(async_engine.sync_engine, "async")
+
+migrate()
+
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await async_engine.dispose()
 
-app = FastAPI(title="Energy Interface API")
+
+app = FastAPI(title="Energy Interface API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "X-Profile-Id", "Server-Timing"],
+)
+
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.environ.get("COMPRESSION_MIN_SIZE", "1024")),
 )
 
+# Profiles cover compression too; requests only ask for one when enabled
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Outermost, so request timings include compression
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(prices_router)
 app.include_router(production_router)
+app.include_router(export_router)
+app.include_router(analytics_router)
+if PROFILING_ENABLED:
+    app.include_router(profiles_router)
 
 
 @app.get("/api/health", response_model=HealthResponse)
 def health():
     return {"status": "ok"}
+
+
+@app.get("/api/cache", response_model=CacheStatsResponse)
+def cache_stats():
+    return response_cache.stats()
+
+
+@app.get("/api/metrics", response_class=Response)
+async def metrics(db: AsyncSession = Depends(get_async_db)):
+    """Prometheus text format: request latency, DB pool and statement timings,
+    response cache counters and the last run of each sync."""
+    finished = SyncRun.status.in_(("succeeded", "failed"))
+    last_runs = await db.scalars(
+        select(SyncRun).where(finished).distinct(SyncRun.job).order_by(SyncRun.job, SyncRun.started_at.desc())
+    )
+    last_success = await db.execute(
+        select(SyncRun.job, func.max(SyncRun.finished_at))
+        .where(SyncRun.status == "succeeded")
+        .group_by(SyncRun.job)
+    )
+    sync_runs = sync_run_families(list(last_runs), {job: ts.timestamp() for job, ts in last_success})
+    return Response(registry.render(sync_runs), media_type=CONTENT_TYPE)
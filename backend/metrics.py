@@ -0,0 +1,334 @@
+"""Process metrics in the Prometheus text exposition format.
+
+A small in-process registry (counters, gauges, histograms with labels)
+instead of a client library dependency. ``MetricsMiddleware`` times every
+request, ``instrument_engine`` hooks SQLAlchemy pool and statement events,
+and values that live elsewhere (pool occupancy, response cache counters, the
+last sync runs) are read by collectors when ``/api/metrics`` is scraped.
+"""
+
+import bisect
+import math
+import threading
+import time
+from collections.abc import Callable, Iterable
+
+from sqlalchemy import event
+
+# Request latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Statement and pool wait buckets in seconds; most statements are index probes
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def sample(name: str, labels: dict[str, str], value: float) -> str:
+    return f"{name}{_labels(labels, labels.values())} {_number(value)}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in values]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, *labels: str, value: float):
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # Per-bucket (not cumulative) counts, then the sum and the total count
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = sorted((k, ([*v[0]], v[1], v[2])) for k, v in self._values.items())
+        lines = []
+        for labels, (counts, total, count) in values:
+            cumulative = 0
+            for bound, n in zip((*self.buckets, math.inf), counts):
+                cumulative += n
+                le = _labels((*self.labelnames, "le"), (*labels, _number(bound)))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: list[_Metric] = []
+        # Collectors return complete families (HELP / TYPE lines included) at scrape time
+        self.collectors: list[Callable[[], list[str]]] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self, extra: Iterable[str] = ()) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines += metric.header() + metric.render()
+        for collect in self.collectors:
+            lines += collect()
+        lines += extra
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(
+    Counter("http_requests_total", "HTTP requests by route, method and status.", ("route", "method", "status"))
+)
+http_latency = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time from receiving a request to sending the last byte of the response.",
+        ("route", "method", "status"),
+    )
+)
+http_in_flight = registry.register(Gauge("http_requests_in_flight", "Requests being served."))
+
+db_statement_latency = registry.register(
+    Histogram(
+        "db_statement_duration_seconds",
+        "Statement execution time, by engine and statement type.",
+        ("engine", "statement"),
+        DB_BUCKETS,
+    )
+)
+db_statement_errors = registry.register(
+    Counter("db_statement_errors_total", "Statements that raised, by engine and statement type.", ("engine", "statement"))
+)
+db_pool_checkouts = registry.register(
+    Counter("db_pool_checkouts_total", "Connections checked out of the pool.", ("engine",))
+)
+db_pool_wait = registry.register(
+    Histogram(
+        "db_pool_wait_seconds",
+        "Time spent getting a pooled connection: waiting for a slot, opening a new one and the pre-ping.",
+        ("engine",),
+        DB_BUCKETS,
+    )
+)
+
+
+def _route(scope) -> str:
+    route = scope.get("route")
+    # Unmatched paths share one label so scanners cannot blow up the cardinality
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+class MetricsMiddleware:
+    """Count and time every HTTP request, until its last body chunk is sent."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_timed(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            http_in_flight.dec()
+            labels = (_route(scope), scope["method"], str(status))
+            http_requests.inc(*labels)
+            http_latency.observe(*labels, value=time.perf_counter() - started)
+
+
+def _statement_type(statement: str) -> str:
+    words = statement.lstrip().split(None, 1)
+    return words[0].upper() if words else "OTHER"
+
+
+# Instrumented engines by name; their current pools are read at scrape time
+_engines: dict[str, object] = {}
+
+
+def instrument_engine(engine, name: str):
+    """Time ``engine``'s statements and pool checkouts under ``name``.
+
+    Takes the sync engine; pass ``async_engine.sync_engine`` for asyncpg.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["metrics_started"].pop()
+        db_statement_latency.observe(name, _statement_type(statement), value=time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        stack = context.connection.info.get("metrics_started") if context.connection is not None else None
+        if stack:
+            stack.pop()
+        db_statement_errors.inc(name, _statement_type(context.statement or ""))
+
+    @event.listens_for(engine, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        db_pool_checkouts.inc(name)
+
+    @event.listens_for(engine, "engine_disposed")
+    def engine_disposed(engine):
+        _time_checkouts(engine.pool, name)  # dispose() replaces the pool
+
+    _time_checkouts(engine.pool, name)
+    _engines[name] = engine
+
+
+def _time_checkouts(pool, name: str):
+    # Pool events only fire once a connection is in hand, so time the public
+    # ``Pool.connect`` the engine calls for every checkout instead; it covers
+    # queueing for a slot, opening a connection and the pre-ping
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            db_pool_wait.observe(name, value=time.perf_counter() - started)
+
+    pool.connect = timed_connect
+
+
+def _collect_pools() -> list[str]:
+    families = [
+        ("db_pool_size", "Connections the pool keeps open.", lambda pool: pool.size()),
+        ("db_pool_checked_out", "Connections currently checked out.", lambda pool: pool.checkedout()),
+        ("db_pool_overflow", "Connections open beyond the pool size.", lambda pool: max(0, pool.overflow())),
+    ]
+    lines = []
+    for metric, help, read in families:
+        lines += [f"# HELP {metric} {help}", f"# TYPE {metric} gauge"]
+        lines += [sample(metric, {"engine": name}, read(engine.pool)) for name, engine in sorted(_engines.items())]
+    return lines
+
+
+registry.collectors.append(_collect_pools)
+
+
+def _family(metric: str, kind: str, help: str, samples: Iterable[tuple[dict[str, str], float]]) -> list[str]:
+    return [f"# HELP {metric} {help}", f"# TYPE {metric} {kind}"] + [sample(metric, l, v) for l, v in samples]
+
+
+def cache_families(stats: dict) -> list[str]:
+    """The response cache counters from ``ResponseCache.stats``."""
+    lines = []
+    for key in ("hits", "misses", "evictions", "expirations", "invalidations"):
+        lines += _family(f"response_cache_{key}_total", "counter", f"Response cache {key}.", [({}, stats[key])])
+    lines += _family("response_cache_entries", "gauge", "Responses held in the cache.", [({}, stats["entries"])])
+    lines += _family("response_cache_bytes", "gauge", "Bytes of responses held in the cache.", [({}, stats["bytes"])])
+    return lines
+
+
+def _rate(run) -> float | None:
+    duration = (run.finished_at - run.started_at).total_seconds()
+    return run.records / duration if run.records is not None and duration > 0 else None
+
+
+SYNC_RUN_GAUGES = [
+    ("sync_last_run_timestamp_seconds", "When the last finished run of the sync ended.",
+     lambda run: run.finished_at.timestamp()),
+    ("sync_last_run_success", "Whether the last finished run of the sync succeeded.",
+     lambda run: 1 if run.status == "succeeded" else 0),
+    ("sync_last_run_duration_seconds", "Duration of the last finished run.",
+     lambda run: (run.finished_at - run.started_at).total_seconds()),
+    ("sync_last_run_pages", "EIA pages fetched by the last run.", lambda run: run.pages),
+    ("sync_last_run_records", "EIA records fetched by the last run.", lambda run: run.records),
+    ("sync_last_run_bytes", "EIA response bytes downloaded by the last run.", lambda run: run.bytes),
+    ("sync_last_run_rows_per_second", "Records fetched and loaded per second by the last run.", _rate),
+]
+
+
+def sync_run_families(last_runs: list, last_success: dict[str, float]) -> list[str]:
+    """The last finished run of each sync job, and its last success.
+
+    The syncs run in other processes, so their numbers come from the
+    ``sync_runs`` rows they record rather than from this registry.
+    """
+    lines = []
+    for metric, help, read in SYNC_RUN_GAUGES:
+        values = [({"job": run.job}, read(run)) for run in last_runs]
+        lines += _family(metric, "gauge", help, [(labels, v) for labels, v in values if v is not None])
+    lines += _family(
+        "sync_last_success_timestamp_seconds",
+        "gauge",
+        "When the last successful run of the sync ended.",
+        [({"job": job}, ts) for job, ts in sorted(last_success.items())],
+    )
+    return lines
+
@@ -0,0 +1,283 @@
+"""
+Versioned schema migrations.
+
+Each step upgrades an existing database by one version and is recorded in
+``schema_migrations``. A fresh database is created straight from the models
+and stamped with every version. Tables added to the models without a
+migration step are created afterwards.
+
+Usage:
+    python -m backend.migrations          # apply pending migrations
+    python -m backend.migrations --status # list applied / pending versions
+"""
+
+import argparse
+
+from sqlalchemy import inspect, select, text
+
+from .database import Base, engine
+from .models import SchemaMigration
+
+# Serializes migrators across API workers and sync scripts
+MIGRATION_LOCK_ID = 7_316_001
+
+
+def _add_price_metadata(conn):
+    """Frequency column, EIA metadata columns and the (series, period, frequency) key."""
+    inspector = inspect(conn)
+    if not inspector.has_table("natural_gas_prices"):
+        return
+    if "frequency" in {c["name"] for c in inspector.get_columns("natural_gas_prices")}:
+        return  # applied by the old sync_prices.migrate_schema()
+
+    conn.execute(text("""
+        ALTER TABLE natural_gas_prices
+        ADD COLUMN frequency VARCHAR(10) NOT NULL DEFAULT 'monthly',
+        ADD COLUMN series_description VARCHAR(200),
+        ADD COLUMN duoarea VARCHAR(10),
+        ADD COLUMN area_name VARCHAR(100),
+        ADD COLUMN product VARCHAR(10),
+        ADD COLUMN product_name VARCHAR(100),
+        ADD COLUMN process VARCHAR(10),
+        ADD COLUMN process_name VARCHAR(100)
+    """))
+    conn.execute(text("ALTER TABLE natural_gas_prices ALTER COLUMN price DROP NOT NULL"))
+    conn.execute(text("ALTER TABLE natural_gas_prices DROP CONSTRAINT IF EXISTS uq_series_period"))
+    conn.execute(text("""
+        ALTER TABLE natural_gas_prices
+        ADD CONSTRAINT uq_series_period_freq UNIQUE (series_id, period, frequency)
+    """))
+
+
+def _normalize_series(conn):
+    """Move per-series metadata into ``series`` and narrow both fact tables to
+    (series_key, frequency, period, value, fetched_at)."""
+    conn.execute(text("""
+        CREATE TABLE series (
+            id SERIAL PRIMARY KEY,
+            dataset VARCHAR(20) NOT NULL,
+            series_id VARCHAR(30) NOT NULL,
+            series_description VARCHAR(200),
+            duoarea VARCHAR(10),
+            area_name VARCHAR(100),
+            product VARCHAR(10),
+            product_name VARCHAR(100),
+            process VARCHAR(10),
+            process_name VARCHAR(100),
+            units VARCHAR(20),
+            source VARCHAR(50),
+            CONSTRAINT uq_series_dataset_series UNIQUE (dataset, series_id)
+        )
+    """))
+
+    tables = inspect(conn).get_table_names()
+    for dataset, table, value, value_type in (
+        ("prices", "natural_gas_prices", "price", "NUMERIC(10, 4)"),
+        ("production", "natural_gas_production", "value", "NUMERIC(12, 2)"),
+    ):
+        if table not in tables:
+            continue  # never synced; created from the models afterwards
+
+        # The most recent row's metadata describes the series
+        conn.execute(text(f"""
+            INSERT INTO series (dataset, series_id, series_description, duoarea, area_name,
+                                product, product_name, process, process_name, units, source)
+            SELECT DISTINCT ON (series_id)
+                   '{dataset}', series_id, series_description, duoarea, area_name,
+                   product, product_name, process, process_name, units, source
+            FROM {table}
+            ORDER BY series_id, period DESC
+        """))
+
+        # Rewrite into a new table rather than updating in place, so the
+        # narrow rows are stored compactly without a VACUUM FULL
+        conn.execute(text(f"ALTER TABLE {table} RENAME TO {table}_legacy"))
+        conn.execute(text(f"""
+            CREATE TABLE {table} (
+                series_key INTEGER NOT NULL REFERENCES series (id),
+                period DATE NOT NULL,
+                frequency VARCHAR(10) NOT NULL,
+                {value} {value_type},
+                fetched_at TIMESTAMP WITH TIME ZONE,
+                CONSTRAINT pk_{table} PRIMARY KEY (series_key, frequency, period)
+            )
+        """))
+        conn.execute(text(f"""
+            INSERT INTO {table} (series_key, period, frequency, {value}, fetched_at)
+            SELECT s.id, t.period, t.frequency, t.{value}, t.fetched_at
+            FROM {table}_legacy t
+            JOIN series s ON s.dataset = '{dataset}' AND s.series_id = t.series_id
+            ORDER BY s.id, t.frequency, t.period
+        """))
+        conn.execute(text(f"DROP TABLE {table}_legacy"))
+
+
+def _covering_primary_keys(conn):
+    """Add the value and fetched_at columns to both fact tables' key index."""
+    tables = inspect(conn).get_table_names()
+    for table, value in (
+        ("natural_gas_prices", "price"),
+        ("natural_gas_production", "value"),
+    ):
+        if table not in tables:
+            continue
+        conn.execute(text(f"""
+            ALTER TABLE {table}
+            DROP CONSTRAINT pk_{table},
+            ADD CONSTRAINT pk_{table} PRIMARY KEY (series_key, frequency, period)
+                INCLUDE ({value}, fetched_at)
+        """))
+
+
+def _series_catalog(conn):
+    """Per (series, frequency) summary table, filled from the existing facts."""
+    conn.execute(text("""
+        CREATE TABLE series_catalog (
+            series_key INTEGER NOT NULL REFERENCES series (id),
+            frequency VARCHAR(10) NOT NULL,
+            first_period DATE NOT NULL,
+            last_period DATE NOT NULL,
+            row_count INTEGER NOT NULL,
+            latest_value NUMERIC(14, 4),
+            last_fetched_at TIMESTAMP WITH TIME ZONE,
+            updated_at TIMESTAMP WITH TIME ZONE,
+            CONSTRAINT pk_series_catalog PRIMARY KEY (series_key, frequency)
+        )
+    """))
+
+    tables = inspect(conn).get_table_names()
+    for table, value in (
+        ("natural_gas_prices", "price"),
+        ("natural_gas_production", "value"),
+    ):
+        if table not in tables:
+            continue
+        conn.execute(text(f"""
+            INSERT INTO series_catalog
+            SELECT series_key, frequency, min(period), max(period), count(*),
+                   (array_agg({value} ORDER BY period DESC))[1], max(fetched_at), now()
+            FROM {table}
+            GROUP BY series_key, frequency
+        """))
+
+
+def _series_rollups(conn):
+    """Resampling rollup table, built from the existing facts."""
+    from .rollups import refresh_rollups
+
+    conn.execute(text("""
+        CREATE TABLE series_rollups (
+            series_key INTEGER NOT NULL REFERENCES series (id),
+            frequency VARCHAR(10) NOT NULL,
+            bucket VARCHAR(10) NOT NULL,
+            period DATE NOT NULL,
+            open NUMERIC(14, 4),
+            high NUMERIC(14, 4),
+            low NUMERIC(14, 4),
+            close NUMERIC(14, 4),
+            mean NUMERIC(14, 4),
+            count INTEGER NOT NULL,
+            updated_at TIMESTAMP WITH TIME ZONE,
+            CONSTRAINT pk_series_rollups PRIMARY KEY (series_key, frequency, bucket, period)
+        )
+    """))
+
+    tables = inspect(conn).get_table_names()
+    for dataset, table in (("prices", "natural_gas_prices"), ("production", "natural_gas_production")):
+        if table in tables:
+            refresh_rollups(conn, dataset)
+
+
+def _sync_state(conn):
+    """Per-series sync progress, with high-water marks taken from the catalog
+    so the first incremental run after upgrading is not a full fetch."""
+    conn.execute(text("""
+        CREATE TABLE sync_state (
+            dataset VARCHAR(20) NOT NULL,
+            series_id VARCHAR(30) NOT NULL,
+            frequency VARCHAR(10) NOT NULL,
+            high_water DATE,
+            resume_key VARCHAR(40),
+            resume_offset INTEGER,
+            updated_at TIMESTAMP WITH TIME ZONE,
+            CONSTRAINT pk_sync_state PRIMARY KEY (dataset, series_id, frequency)
+        )
+    """))
+    if "series_catalog" in inspect(conn).get_table_names():
+        conn.execute(text("""
+            INSERT INTO sync_state (dataset, series_id, frequency, high_water, updated_at)
+            SELECT s.dataset, s.series_id, c.frequency, c.last_period, now()
+            FROM series_catalog c
+            JOIN series s ON s.id = c.series_key
+        """))
+
+
+def _sync_run_bytes(conn):
+    """Downloaded bytes per sync run. sync_runs itself is created by create_all."""
+    if "sync_runs" in inspect(conn).get_table_names():
+        conn.execute(text("ALTER TABLE sync_runs ADD COLUMN bytes BIGINT"))
+
+
+MIGRATIONS = [
+    (1, "natural_gas_prices: frequency and EIA metadata columns", _add_price_metadata),
+    (2, "series dimension table; narrow fact tables", _normalize_series),
+    (3, "covering primary keys on the fact tables", _covering_primary_keys),
+    (4, "series_catalog summary table", _series_catalog),
+    (5, "series_rollups resampling table", _series_rollups),
+    (6, "sync_state watermarks and resume checkpoints", _sync_state),
+    (7, "sync_runs: downloaded bytes", _sync_run_bytes),
+]
+
+
+def migrate(bind=engine):
+    """Bring the database schema up to date."""
+    with bind.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        SchemaMigration.__table__.create(conn, checkfirst=True)
+        applied = set(conn.scalars(select(SchemaMigration.version)))
+        tables = inspect(conn).get_table_names()
+
+        pending = [m for m in MIGRATIONS if m[0] not in applied]
+        if "natural_gas_prices" not in tables and "natural_gas_production" not in tables:
+            # Fresh database: the models already describe the latest schema
+            Base.metadata.create_all(conn)
+            for version, description, _ in pending:
+                conn.execute(SchemaMigration.__table__.insert().values(version=version, description=description))
+            return
+
+        for version, description, step in pending:
+            print(f"Applying migration {version}: {description}")
+            step(conn)
+            conn.execute(SchemaMigration.__table__.insert().values(version=version, description=description))
+
+        Base.metadata.create_all(conn)
+
+
+def pending_migrations(bind=engine) -> list[tuple[int, str]]:
+    """``(version, description)`` of the steps ``migrate`` would apply, read
+    without changing anything."""
+    with bind.connect() as conn:
+        applied = set()
+        if inspect(conn).has_table(SchemaMigration.__tablename__):
+            applied = set(conn.scalars(select(SchemaMigration.version)))
+    return [(version, description) for version, description, _ in MIGRATIONS if version not in applied]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument("--status", action="store_true", help="List applied and pending migrations")
+    args = parser.parse_args()
+
+    if args.status:
+        pending = {version for version, _ in pending_migrations()}
+        for version, description, _ in MIGRATIONS:
+            state = "pending" if version in pending else "applied"
+            print(f"{version:>4}  {state:<8} {description}")
+        return
+
+    migrate()
+    print("Schema is up to date.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,31 @@
 from datetime import date, datetime
 
-from sqlalchemy import Column, Date, DateTime, Index, Integer, Numeric, String, UniqueConstraint
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    PrimaryKeyConstraint,
+    String,
+    Text,
+    UniqueConstraint,
+)
 
 from .database import Base
 
 
-class NaturalGasPrice(Base):
-    __tablename__ = "natural_gas_prices"
+class Series(Base):
+    """One EIA series and its descriptive metadata, shared by all of its data points."""
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    series_id = Column(String(20), nullable=False)
-    period = Column(Date, nullable=False)
-    price = Column(Numeric(10, 4), nullable=True)
-    units = Column(String(20), default="$/MMBtu")
-    source = Column(String(50), default="EIA")
-    fetched_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    __tablename__ = "series"
 
-    # New columns
-    frequency = Column(String(10), nullable=False, default="daily")
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    dataset = Column(String(20), nullable=False)  # "prices" or "production"
+    series_id = Column(String(30), nullable=False)
     series_description = Column(String(200))
     duoarea = Column(String(10))
     area_name = Column(String(100))
@@ -25,31 +33,158 @@ class NaturalGasPrice(Base):
     product_name = Column(String(100))
     process = Column(String(10))
     process_name = Column(String(100))
+    units = Column(String(20))
+    source = Column(String(50), default="EIA")
 
     __table_args__ = (
-        UniqueConstraint("series_id", "period", "frequency", name="uq_series_period_freq"),
+        UniqueConstraint("dataset", "series_id", name="uq_series_dataset_series"),
+    )
+
+
+class NaturalGasPrice(Base):
+    __tablename__ = "natural_gas_prices"
+
+    series_key = Column(Integer, ForeignKey("series.id"), nullable=False)
+    period = Column(Date, nullable=False)
+    frequency = Column(String(10), nullable=False, default="daily")
+    price = Column(Numeric(10, 4), nullable=True)
+    fetched_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+    __table_args__ = (
+        # Carrying the value and fetched_at in the key index lets range,
+        # latest and freshness queries run as index-only scans
+        PrimaryKeyConstraint(
+            "series_key",
+            "frequency",
+            "period",
+            name="pk_natural_gas_prices",
+            postgresql_include=["price", "fetched_at"],
+        ),
     )
 
 
 class NaturalGasProduction(Base):
     __tablename__ = "natural_gas_production"
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    series_id = Column(String(30), nullable=False, index=True)
+    series_key = Column(Integer, ForeignKey("series.id"), nullable=False)
     period = Column(Date, nullable=False)
+    frequency = Column(String(10), nullable=False, default="monthly")
     value = Column(Numeric(12, 2), nullable=True)
-    units = Column(String(20), default="MMCF")
-    source = Column(String(50), default="EIA")
     fetched_at = Column(DateTime(timezone=True), default=datetime.utcnow)
-    frequency = Column(String(10), nullable=False, default="monthly")
-    series_description = Column(String(200))
-    duoarea = Column(String(10), index=True)
-    area_name = Column(String(100))
-    product = Column(String(10))
-    product_name = Column(String(100))
-    process = Column(String(10))
-    process_name = Column(String(100))
 
     __table_args__ = (
-        UniqueConstraint("series_id", "period", name="uq_production_series_period"),
+        # Carrying the value and fetched_at in the key index lets range,
+        # latest and freshness queries run as index-only scans
+        PrimaryKeyConstraint(
+            "series_key",
+            "frequency",
+            "period",
+            name="pk_natural_gas_production",
+            postgresql_include=["value", "fetched_at"],
+        ),
     )
+
+
+class SeriesCatalog(Base):
+    """Per (series, frequency) summary of the fact rows, maintained by the syncs."""
+
+    __tablename__ = "series_catalog"
+
+    series_key = Column(Integer, ForeignKey("series.id"), nullable=False)
+    frequency = Column(String(10), nullable=False)
+    first_period = Column(Date, nullable=False)
+    last_period = Column(Date, nullable=False)
+    row_count = Column(Integer, nullable=False)
+    latest_value = Column(Numeric(14, 4), nullable=True)
+    last_fetched_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("series_key", "frequency", name="pk_series_catalog"),
+    )
+
+
+class SeriesRollup(Base):
+    """OHLC / mean / count of a series over one week, month, quarter or year."""
+
+    __tablename__ = "series_rollups"
+
+    series_key = Column(Integer, ForeignKey("series.id"), nullable=False)
+    frequency = Column(String(10), nullable=False)  # source frequency
+    bucket = Column(String(10), nullable=False)  # week, month, quarter, year
+    period = Column(Date, nullable=False)  # first day of the bucket
+    open = Column(Numeric(14, 4))
+    high = Column(Numeric(14, 4))
+    low = Column(Numeric(14, 4))
+    close = Column(Numeric(14, 4))
+    mean = Column(Numeric(14, 4))
+    count = Column(Integer, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("series_key", "frequency", "bucket", "period", name="pk_series_rollups"),
+    )
+
+
+class DataGeneration(Base):
+    """Counter bumped by each sync commit; cached API responses are tagged with it."""
+
+    __tablename__ = "data_generations"
+
+    dataset = Column(String(20), primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class SyncState(Base):
+    """Sync progress of one series: its high-water mark and the resume point
+    of the query that last loaded it. ``series_id`` "*" stands for a query
+    over every series of the dataset."""
+
+    __tablename__ = "sync_state"
+
+    dataset = Column(String(20), nullable=False)
+    series_id = Column(String(30), nullable=False)
+    frequency = Column(String(10), nullable=False)
+    high_water = Column(Date)  # newest period loaded
+    resume_key = Column(String(40))  # fingerprint of the interrupted query
+    resume_offset = Column(Integer)  # next page offset of that query
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("dataset", "series_id", "frequency", name="pk_sync_state"),
+    )
+
+
+class SyncRun(Base):
+    """One run of a sync job, from the scheduler or a sync script."""
+
+    __tablename__ = "sync_runs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job = Column(String(50), nullable=False)
+    trigger = Column(String(20), nullable=False)  # "scheduler" or "cli"
+    status = Column(String(20), nullable=False)  # running, succeeded, failed, skipped
+    started_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime(timezone=True))
+    pages = Column(Integer)
+    records = Column(Integer)
+    bytes = Column(BigInteger)  # EIA response bytes downloaded
+    inserted = Column(Integer)
+    updated = Column(Integer)
+    unchanged = Column(Integer)
+    error = Column(Text)
+
+    __table_args__ = (
+        Index("ix_sync_runs_job_started", "job", "started_at"),
+    )
+
+
+class SchemaMigration(Base):
+    """Versions applied by ``backend.migrations``."""
+
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    description = Column(String(200), nullable=False)
+    applied_at = Column(DateTime(timezone=True), default=datetime.utcnow)
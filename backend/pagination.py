@@ -0,0 +1,59 @@
+"""
+Date windows and keyset pagination for the single-series routes.
+
+Without ``start`` or ``cursor`` a route returns its newest ``limit`` rows (up
+to ``end``), as it always has. With either, it walks forward in period order
+from ``start``: each page is one index range scan that seeks past the last
+period of the previous page, so deep pages cost the same as the first.
+``next_cursor`` is set while more rows remain.
+"""
+
+import base64
+import json
+from datetime import date
+
+from fastapi import HTTPException
+from sqlalchemy import desc
+
+
+def encode_cursor(period: date) -> str:
+    payload = json.dumps({"after": period.isoformat()}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> date:
+    """The period a cursor resumes after; 400 if it is not one of ours."""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return date.fromisoformat(json.loads(payload)["after"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+
+def windowed(stmt, period, start: date | None, end: date | None, cursor: str | None, limit: int):
+    """Restrict ``stmt`` to the requested window and order it for paging.
+
+    Returns ``(stmt, forward)``. Forward pages fetch one extra row so
+    ``page`` can tell whether another page follows.
+    """
+    if end is not None:
+        stmt = stmt.where(period <= end)
+    if start is None and cursor is None:
+        return stmt.order_by(desc(period)).limit(limit), False
+
+    if start is not None:
+        stmt = stmt.where(period >= start)
+    if cursor is not None:
+        stmt = stmt.where(period > decode_cursor(cursor))
+    return stmt.order_by(period).limit(limit + 1), True
+
+
+def page(rows: list, forward: bool, limit: int, period_of=lambda row: row.period) -> tuple[list, str | None]:
+    """Oldest-first rows of one page and the cursor of the next, if any."""
+    if not forward:
+        rows.reverse()
+        return rows, None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(period_of(rows[-1]))
+    return rows, None
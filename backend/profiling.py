@@ -0,0 +1,217 @@
+"""Opt-in request profiling: cProfile plus the SQL each request issues.
+
+Off unless ``PROFILING_ENABLED`` is set. Then a request carrying an
+``X-Profile: 1`` header or a ``profile=1`` query parameter runs under
+cProfile, and every statement it sends to the database is recorded with its
+parameters, start offset and duration. The result is kept in a small
+in-memory store under the id returned in the ``X-Profile-Id`` header and
+served at ``/api/profiles/{id}``; with ``PROFILE_DIR`` set, the raw cProfile
+stats are also written there as ``<id>.prof`` for snakeviz or ``pstats``.
+
+cProfile hooks the event loop thread, so profiled requests run one at a time,
+and other requests served meanwhile are counted in the profile too. A
+response served from the response cache is profiled as the cache hit it is.
+"""
+
+import asyncio
+import cProfile
+import os
+import pstats
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from urllib.parse import parse_qsl
+
+from sqlalchemy import event
+from starlette.datastructures import Headers, MutableHeaders
+
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILE_MAX_ENTRIES = int(os.environ.get("PROFILE_MAX_ENTRIES", "50"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "")
+
+# Functions kept per profile, by cumulative time
+TOP_FUNCTIONS = 40
+# Longest parameter repr kept per statement
+MAX_PARAMETERS_CHARS = 500
+
+# Start time and statements of the profiled request being served, if any
+_capture: ContextVar[tuple[float, list[dict]] | None] = ContextVar("profile_capture", default=None)
+
+
+@dataclass
+class RequestProfile:
+    id: str
+    method: str
+    path: str
+    query: str
+    started_at: datetime
+    status: int = 500
+    duration_ms: float = 0.0
+    statements: list[dict] = field(default_factory=list)
+    functions: list[dict] = field(default_factory=list)
+
+    @property
+    def db_ms(self) -> float:
+        return sum(s["duration_ms"] for s in self.statements)
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "query": self.query,
+            "started_at": self.started_at,
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 3),
+            "db_ms": round(self.db_ms, 3),
+            "statement_count": len(self.statements),
+        }
+
+    def report(self) -> dict:
+        return {**self.summary(), "statements": self.statements, "functions": self.functions}
+
+
+class ProfileStore:
+    """The last ``max_entries`` request profiles, newest last."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._profiles: OrderedDict[str, RequestProfile] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.max_entries:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> RequestProfile | None:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> list[RequestProfile]:
+        with self._lock:
+            return list(reversed(self._profiles.values()))
+
+
+profile_store = ProfileStore(PROFILE_MAX_ENTRIES)
+
+
+def capture_statements(engine, name: str):
+    """Record ``engine``'s statements into the profile of the request issuing them.
+
+    Takes the sync engine; pass ``async_engine.sync_engine`` for asyncpg.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _capture.get() is not None:
+            conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        capture = _capture.get()
+        stack = conn.info.get("profile_started")
+        if capture is None or not stack:
+            return
+        request_started, statements = capture
+        started = stack.pop()
+        statements.append({
+            "engine": name,
+            "statement": statement,
+            "parameters": repr(parameters)[:MAX_PARAMETERS_CHARS],
+            "executemany": executemany,
+            "started_at_ms": round((started - request_started) * 1000, 3),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+        })
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        stack = context.connection.info.get("profile_started") if context.connection is not None else None
+        if stack:
+            stack.pop()
+
+
+def function_stats(profiler: cProfile.Profile, limit: int = TOP_FUNCTIONS) -> list[dict]:
+    """The ``limit`` functions with the most cumulative time, slowest first."""
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            "function": pstats.func_std_string(func),
+            "calls": calls,
+            "primitive_calls": primitive,
+            "total_ms": round(total * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        }
+        for func, (primitive, calls, total, cumulative, _) in rows
+    ]
+
+
+def wants_profile(scope) -> bool:
+    if Headers(scope=scope).get("x-profile", "").lower() in ("1", "true", "yes"):
+        return True
+    query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+    return query.get("profile", "").lower() in ("1", "true", "yes")
+
+
+class ProfilingMiddleware:
+    """Profile requests that ask for it, one at a time, into ``store``."""
+
+    def __init__(self, app, store: ProfileStore = profile_store, directory: str = PROFILE_DIR):
+        self.app = app
+        self.store = store
+        self.directory = directory
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        async with self._lock:
+            await self._profile(scope, receive, send)
+
+    async def _profile(self, scope, receive, send):
+        profile = RequestProfile(
+            id=secrets.token_hex(8),
+            method=scope["method"],
+            path=scope["path"],
+            query=scope.get("query_string", b"").decode("latin-1"),
+            started_at=datetime.now(UTC),
+        )
+        statements: list[dict] = []
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        token = _capture.set((started, statements))
+
+        async def send_profiled(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                headers = MutableHeaders(raw=message["headers"])
+                headers["X-Profile-Id"] = profile.id
+                # Timings up to the response headers; streamed bodies take longer
+                db_ms = sum(s["duration_ms"] for s in statements)
+                headers["Server-Timing"] = (
+                    f'db;dur={db_ms:.1f};desc="{len(statements)} statements", '
+                    f"app;dur={(time.perf_counter() - started) * 1000:.1f}"
+                )
+            await send(message)
+
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_profiled)
+        finally:
+            profiler.disable()
+            _capture.reset(token)
+            profile.duration_ms = (time.perf_counter() - started) * 1000
+            profile.statements = statements
+            profile.functions = function_stats(profiler)
+            self.store.put(profile)
+            if self.directory:
+                os.makedirs(self.directory, exist_ok=True)
+                profiler.dump_stats(os.path.join(self.directory, f"{profile.id}.prof"))
@@ -0,0 +1,192 @@
+"""
+Pre-computed resampling rollups.
+
+``series_rollups`` holds open / high / low / close / mean / count for every
+week, month, quarter and year bucket of each series, computed from the fact
+rows at sync time. A sync refreshes only the buckets its batch touched, so a
+multi-year view reads a few hundred rollup rows instead of aggregating the
+daily rows on each request.
+"""
+
+from datetime import date, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import Date, String, and_, cast, column, func, select, tuple_, values
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
+
+from .catalog import FACT_TABLES
+from .downsampling import downsample_indices
+from .formats import encode_series
+from .models import SeriesRollup
+from .pagination import page, windowed
+from .schemas import ResampledResponse, RollupPoint
+
+# Buckets built for each source frequency; weeks need daily data
+ROLLUP_BUCKETS = {
+    "daily": ("week", "month", "quarter", "year"),
+    "monthly": ("month", "quarter", "year"),
+}
+
+SUMMARY_COLUMNS = ["open", "high", "low", "close", "mean", "count"]
+
+BUCKET_DATE_FORMATS = {"week": "%Y-%m-%d", "month": "%Y-%m", "quarter": "%Y-%m", "year": "%Y"}
+
+
+def _bounds(start: date, end: date) -> tuple[date, date]:
+    """A period range covering every bucket of every size that touches [start, end]."""
+    lower = min(date(start.year, 1, 1), start - timedelta(days=start.weekday()))
+    upper = max(date(end.year + 1, 1, 1), end + timedelta(days=7 - end.weekday()))
+    return lower, upper
+
+
+def refresh_rollups(db, dataset: str, series_keys=None, start: date | None = None, end: date | None = None):
+    """Recompute the rollup buckets that contain periods in [start, end].
+
+    Limited to ``series_keys`` when given; without bounds every bucket is
+    rebuilt. Buckets whose summary is unchanged are left alone.
+    """
+    model, value = FACT_TABLES[dataset]
+    buckets = values(column("frequency", String), column("bucket", String), name="buckets").data(
+        [(frequency, bucket) for frequency, names in ROLLUP_BUCKETS.items() for bucket in names]
+    )
+    bucket_start = cast(func.date_trunc(buckets.c.bucket, model.period), Date)
+
+    filters = [model.frequency == buckets.c.frequency]
+    if series_keys is not None:
+        filters.append(model.series_key.in_(list(series_keys)))
+    if start is not None and end is not None:
+        lower, upper = _bounds(start, end)
+        filters += [
+            # A plain period range keeps the fact scan on the primary key
+            model.period >= lower,
+            model.period < upper,
+            # Rebuild only whole buckets that hold a touched period
+            bucket_start >= cast(func.date_trunc(buckets.c.bucket, start), Date),
+            bucket_start <= cast(func.date_trunc(buckets.c.bucket, end), Date),
+        ]
+
+    # Nulls sort last, so [1] is the first / last non-null value of the bucket
+    summary = (
+        select(
+            model.series_key,
+            model.frequency,
+            buckets.c.bucket,
+            bucket_start,
+            func.array_agg(aggregate_order_by(value, value.is_(None), model.period))[1],
+            func.max(value),
+            func.min(value),
+            func.array_agg(aggregate_order_by(value, value.is_(None), model.period.desc()))[1],
+            func.avg(value),
+            func.count(value),
+            func.now(),
+        )
+        .select_from(model)
+        .join(buckets, and_(*filters))
+        .group_by(model.series_key, model.frequency, buckets.c.bucket, bucket_start)
+    )
+
+    stmt = insert(SeriesRollup).from_select(
+        ["series_key", "frequency", "bucket", "period", *SUMMARY_COLUMNS, "updated_at"], summary
+    )
+    target = SeriesRollup.__table__.c
+    stmt = stmt.on_conflict_do_update(
+        constraint="pk_series_rollups",
+        set_={c: stmt.excluded[c] for c in [*SUMMARY_COLUMNS, "updated_at"]},
+        where=tuple_(*(target[c] for c in SUMMARY_COLUMNS)).is_distinct_from(
+            tuple_(*(stmt.excluded[c] for c in SUMMARY_COLUMNS))
+        ),
+    )
+    db.execute(stmt)
+
+
+def rollup_query(
+    series_key,
+    frequency: str,
+    bucket: str,
+    limit: int,
+    start: date | None = None,
+    end: date | None = None,
+    cursor: str | None = None,
+):
+    """One page of a series' buckets; ``series_key`` may be a subquery.
+
+    Returns ``(stmt, forward)`` as ``pagination.windowed`` does.
+    """
+    stmt = select(SeriesRollup.period, *(SeriesRollup.__table__.c[c] for c in SUMMARY_COLUMNS)).where(
+        SeriesRollup.series_key == series_key,
+        SeriesRollup.frequency == frequency,
+        SeriesRollup.bucket == bucket,
+    )
+    return windowed(stmt, SeriesRollup.period, start, end, cursor, limit)
+
+
+def _float(value) -> float | None:
+    return float(value) if value is not None else None
+
+
+async def resampled_series(
+    db,
+    fmt: str,
+    meta: dict,
+    series_key,
+    frequency: str,
+    bucket: str,
+    limit: int,
+    start: date | None,
+    end: date | None,
+    cursor: str | None,
+    max_points: int | None,
+    downsample: str,
+):
+    """Serve the ``bucket`` rollups of a series, oldest first, in ``fmt``.
+
+    ``meta`` holds the response's scalar fields (``series_id``, ``units``, ...).
+    ``start`` / ``end`` / ``cursor`` window and page the buckets as for raw
+    points; ``max_points`` downsamples on the bucket means.
+    """
+    if bucket not in ROLLUP_BUCKETS.get(frequency, ()):
+        raise HTTPException(
+            status_code=400, detail=f"resample={bucket} is not available for {frequency} data"
+        )
+
+    stmt, forward = rollup_query(series_key, frequency, bucket, limit, start, end, cursor)
+    result = await db.execute(stmt)
+    rows, next_cursor = page(result.mappings().all(), forward, limit, lambda row: row["period"])
+    meta = {**meta, "next_cursor": next_cursor}
+
+    if max_points is not None and len(rows) > max_points:
+        keep = downsample_indices(
+            [row["period"].toordinal() for row in rows],
+            [float(row["mean"]) if row["mean"] is not None else 0 for row in rows],
+            max_points,
+            downsample,
+        )
+        rows = [rows[i] for i in keep]
+
+    date_fmt = BUCKET_DATE_FORMATS[bucket]
+    if fmt != "json":
+        return encode_series(
+            fmt,
+            {**meta, "resample": bucket},
+            [row["period"] for row in rows],
+            [_float(row["mean"]) for row in rows],
+            date_fmt,
+            extra={
+                **{c: [_float(row[c]) for row in rows] for c in ("open", "high", "low", "close")},
+                "counts": [row["count"] for row in rows],
+            },
+        )
+
+    return ResampledResponse(
+        **meta,
+        resample=bucket,
+        count=len(rows),
+        data=[
+            RollupPoint(
+                date=row["period"].strftime(date_fmt),
+                **{c: _float(row[c]) for c in ("open", "high", "low", "close", "mean")},
+                count=row["count"],
+            )
+            for row in rows
+        ],
+    )
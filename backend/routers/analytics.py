@@ -0,0 +1,111 @@
+from datetime import date
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import analytics
+from ..cache import cached_response
+from ..database import get_async_db
+from ..schemas import PriceAnalyticsResponse, SeriesAnalytics
+from .prices import _batch_freshness, _batch_query, _parse_series_ids
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+
+def _parse_windows(windows: str) -> list[int]:
+    try:
+        parsed = sorted({int(w) for w in windows.split(",") if w.strip()})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="windows must be comma-separated integers")
+    if not parsed or parsed[0] < 2:
+        raise HTTPException(status_code=400, detail="windows must be at least 2 periods")
+    return parsed
+
+
+def _column(values: np.ndarray) -> list[float | None]:
+    return np.where(np.isnan(values), None, np.round(values, 6)).tolist()
+
+
+def _scalar(value) -> float | None:
+    return None if np.isnan(value) else round(float(value), 6)
+
+
+@router.get("/prices", response_model=PriceAnalyticsResponse)
+@cached_response("prices", _batch_freshness)
+async def get_price_analytics(
+    series_id: str = Query("RNGWHHD,RNGC1,RNGC2,RNGC3,RNGC4"),
+    frequency: str = Query("daily"),
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    limit: int = Query(1000, ge=2, le=10000),
+    windows: str = Query("20,60", description="Comma-separated rolling windows, in periods"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Log returns, rolling means / standard deviations / z-scores of price,
+    annualized volatility, drawdowns and the return correlation matrix.
+
+    The series are read in one query (the newest ``limit`` points of each, as
+    ``/api/prices/batch``) and aligned on a shared date axis; every statistic
+    is then computed over the whole matrix at once. Responses are cached until
+    the next prices sync.
+    """
+    series_ids = _parse_series_ids(series_id)
+    if not series_ids:
+        raise HTTPException(status_code=400, detail="series_id must name at least one series")
+    window_sizes = _parse_windows(windows)
+
+    result = await db.execute(_batch_query(series_ids, frequency, start, end, limit))
+    rows = result.all()
+
+    units = {sid: "$/MMBtu" for sid in series_ids}
+    prices = np.full((0, len(series_ids)), np.nan)
+    periods = np.array([], dtype=np.int64)
+    if rows:
+        sids, row_periods, values, row_units = zip(*rows)
+        for sid, unit in zip(sids, row_units):
+            units[sid] = unit or units[sid]
+        column_of = {sid: i for i, sid in enumerate(series_ids)}
+        periods, row_index = np.unique([p.toordinal() for p in row_periods], return_inverse=True)
+        prices = np.full((len(periods), len(series_ids)), np.nan)
+        prices[row_index, [column_of[sid] for sid in sids]] = np.array(
+            [np.nan if v is None else float(v) for v in values]
+        )
+
+    periods_per_year = analytics.PERIODS_PER_YEAR.get(frequency, 1)
+    returns = analytics.log_returns(prices)
+    volatility = analytics.annualized_volatility(returns, periods_per_year)
+    drawdown = analytics.drawdowns(prices)
+    # fmin skips NaN; a column with no prices stays NaN
+    max_drawdown = np.fmin.reduce(drawdown, axis=0, initial=np.nan)
+    rolling = {
+        w: (
+            analytics.rolling_mean(prices, w),
+            analytics.rolling_std(prices, w),
+            analytics.zscores(prices, w),
+        )
+        for w in window_sizes
+    }
+
+    date_fmt = "%Y-%m-%d" if frequency == "daily" else "%Y-%m"
+    return PriceAnalyticsResponse(
+        frequency=frequency,
+        windows=window_sizes,
+        periods_per_year=periods_per_year,
+        count=len(periods),
+        dates=[date.fromordinal(int(p)).strftime(date_fmt) for p in periods],
+        series={
+            sid: SeriesAnalytics(
+                units=units[sid],
+                volatility=_scalar(volatility[i]),
+                max_drawdown=_scalar(max_drawdown[i]),
+                returns=_column(returns[:, i]),
+                drawdown=_column(drawdown[:, i]),
+                rolling_mean={str(w): _column(mean[:, i]) for w, (mean, _, _) in rolling.items()},
+                rolling_std={str(w): _column(std[:, i]) for w, (_, std, _) in rolling.items()},
+                zscore={str(w): _column(z[:, i]) for w, (_, _, z) in rolling.items()},
+            )
+            for i, sid in enumerate(series_ids)
+        },
+        correlation=[_column(row) for row in analytics.correlation_matrix(returns)],
+    )
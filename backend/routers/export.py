@@ -0,0 +1,123 @@
+"""
+Bulk export of the fact tables as NDJSON or CSV.
+
+Series are exported one after another, each as an index-ordered range scan
+read through a server-side cursor ``EXPORT_BATCH_SIZE`` rows at a time. Each
+batch is written to the response as it arrives, so memory stays flat however
+many rows are exported. Exports are not cached.
+"""
+
+import csv
+import io
+import json
+import os
+from collections.abc import AsyncIterator
+from datetime import date
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, text
+
+from ..database import DB_STATEMENT_TIMEOUT_MS, AsyncSessionLocal
+from ..models import NaturalGasPrice, NaturalGasProduction, Series
+
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", "5000"))
+# Exports can outlast the API's statement timeout; 0 lifts it for them
+EXPORT_STATEMENT_TIMEOUT_MS = int(os.environ.get("EXPORT_STATEMENT_TIMEOUT_MS", "0"))
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+
+def _series_query(dataset: str, series_id: str | None):
+    stmt = select(Series.id, Series.series_id).where(Series.dataset == dataset).order_by(Series.series_id)
+    series_ids = [s.strip() for s in (series_id or "").split(",") if s.strip()]
+    if series_ids:
+        stmt = stmt.where(Series.series_id.in_(series_ids))
+    return stmt
+
+
+def _export_query(model, value, series_key: int, frequency: str | None, start: date | None, end: date | None):
+    """One series' rows in primary key order: an index range scan with no sort,
+    so the first rows reach the client before the last are read."""
+    stmt = (
+        select(model.frequency, model.period, value)
+        .where(model.series_key == series_key)
+        .order_by(model.frequency, model.period)
+    )
+    if frequency is not None:
+        stmt = stmt.where(model.frequency == frequency)
+    if start is not None:
+        stmt = stmt.where(model.period >= start)
+    if end is not None:
+        stmt = stmt.where(model.period <= end)
+    return stmt
+
+
+def _encode(code: str, rows, columns: list[str], fmt: str) -> str:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerows((code, freq, period.isoformat(), v) for freq, period, v in rows)
+        return buffer.getvalue()
+    return "".join(
+        json.dumps(
+            dict(zip(columns, (code, freq, period.isoformat(), float(v) if v is not None else None))),
+            separators=(",", ":"),
+        )
+        + "\n"
+        for freq, period, v in rows
+    )
+
+
+async def _stream(dataset: str, model, value, columns: list[str], fmt: str, series_id: str | None,
+                  frequency: str | None, start: date | None, end: date | None) -> AsyncIterator[str]:
+    if fmt == "csv":
+        yield ",".join(columns) + "\n"
+    # A session of its own: the stream outlives the request's dependencies
+    async with AsyncSessionLocal() as db:
+        if DB_STATEMENT_TIMEOUT_MS:
+            await db.execute(text(f"SET LOCAL statement_timeout = {EXPORT_STATEMENT_TIMEOUT_MS}"))
+        series = (await db.execute(_series_query(dataset, series_id))).all()
+        for series_key, code in series:
+            stmt = _export_query(model, value, series_key, frequency, start, end)
+            result = await db.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            async for rows in result.partitions():
+                yield _encode(code, rows, columns, fmt)
+
+
+def _export(dataset: str, model, value, value_name: str, fmt: str, **filters) -> StreamingResponse:
+    columns = ["series_id", "frequency", "date", value_name]
+    return StreamingResponse(
+        _stream(dataset, model, value, columns, fmt, **filters),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{fmt}"'},
+    )
+
+
+@router.get("/prices")
+async def export_prices(
+    series_id: str | None = Query(None, description="Comma-separated series; all when omitted"),
+    frequency: str | None = Query(None),
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+):
+    return _export(
+        "prices", NaturalGasPrice, NaturalGasPrice.price, "price", format,
+        series_id=series_id, frequency=frequency, start=start, end=end,
+    )
+
+
+@router.get("/production")
+async def export_production(
+    series_id: str | None = Query(None, description="Comma-separated series; all when omitted"),
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+):
+    return _export(
+        "production", NaturalGasProduction, NaturalGasProduction.value, "value", format,
+        series_id=series_id, frequency=None, start=start, end=end,
+    )
@@ -1,39 +1,285 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
+from datetime import date
 
-from ..database import get_db
-from ..models import NaturalGasPrice
-from ..schemas import LatestPriceResponse, PricesResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import desc, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..cache import cached_response
+from ..database import get_async_db
+from ..downsampling import downsample_indices
+from ..formats import encode_series, response_format
+from ..models import NaturalGasPrice, Series, SeriesCatalog
+from ..pagination import page, windowed
+from ..rollups import resampled_series
+from ..schemas import (
+    CatalogEntry,
+    LatestPriceResponse,
+    CurvePoint,
+    PriceCurveHistoryResponse,
+    PriceCurveResponse,
+    PriceMatrixResponse,
+    PricesResponse,
+    ResampledResponse,
+    SeriesCatalogResponse,
+)
 
 router = APIRouter(prefix="/api/prices", tags=["prices"])
 
+# Spot followed by the futures contracts in tenor order
+CURVE_SERIES = "RNGWHHD,RNGC1,RNGC2,RNGC3,RNGC4"
 
-@router.get("", response_model=PricesResponse)
-def get_prices(
-    series_id: str = Query("RNGWHHD"),
-    frequency: str = Query("monthly"),
-    limit: int = Query(60, ge=1, le=10000),
-    db: Session = Depends(get_db),
+
+def _parse_series_ids(series_id: str) -> list[str]:
+    return list(dict.fromkeys(s.strip() for s in series_id.split(",") if s.strip()))
+
+
+def _series_key(series_id: str):
+    """The fact tables' key for a price series code, as a scalar subquery."""
+    return (
+        select(Series.id)
+        .where(Series.dataset == "prices", Series.series_id == series_id)
+        .scalar_subquery()
+    )
+
+
+def _series_filter(series_id: str, frequency: str):
+    return (
+        NaturalGasPrice.series_key == _series_key(series_id),
+        NaturalGasPrice.frequency == frequency,
+    )
+
+
+def _series_freshness(
+    series_id: str,
+    frequency: str,
+    limit: int = 1,
+    start: date | None = None,
+    end: date | None = None,
+    cursor: str | None = None,
+    resample: str | None = None,
+    **_,
 ):
-    rows = (
-        db.query(NaturalGasPrice)
-        .filter(
-            NaturalGasPrice.series_id == series_id,
+    """Validator of the rows one page reads: the window ``_range_query``
+    selects, or with ``resample`` the series' catalog row, since the rollup
+    buckets it reads summarise the whole series."""
+    if resample is not None:
+        return select(func.sum(SeriesCatalog.row_count), func.max(SeriesCatalog.last_fetched_at)).where(
+            SeriesCatalog.series_key == _series_key(series_id),
+            SeriesCatalog.frequency == frequency,
+        )
+    stmt = select(NaturalGasPrice.fetched_at).where(*_series_filter(series_id, frequency))
+    window = windowed(stmt, NaturalGasPrice.period, start, end, cursor, limit)[0].subquery()
+    return select(func.count(), func.max(window.c.fetched_at))
+
+
+def _batch_freshness(series_id: str, frequency: str, start: date | None, end: date | None, **_):
+    stmt = (
+        select(func.count(), func.max(NaturalGasPrice.fetched_at))
+        .join(Series, Series.id == NaturalGasPrice.series_key)
+        .where(
+            Series.dataset == "prices",
+            Series.series_id.in_(_parse_series_ids(series_id)),
             NaturalGasPrice.frequency == frequency,
         )
+    )
+    if start is not None:
+        stmt = stmt.where(NaturalGasPrice.period >= start)
+    if end is not None:
+        stmt = stmt.where(NaturalGasPrice.period <= end)
+    return stmt
+
+
+def _curve_freshness(series_id: str, frequency: str, as_of: date | None, **_):
+    return _batch_freshness(series_id, frequency, None, as_of)
+
+
+def _catalog_query(frequency: str | None):
+    stmt = (
+        select(Series, SeriesCatalog)
+        .join(SeriesCatalog, SeriesCatalog.series_key == Series.id)
+        .where(Series.dataset == "prices")
+        .order_by(Series.series_id, SeriesCatalog.frequency)
+    )
+    if frequency is not None:
+        stmt = stmt.where(SeriesCatalog.frequency == frequency)
+    return stmt
+
+
+def _catalog_freshness(frequency: str | None, **_):
+    stmt = (
+        select(func.sum(SeriesCatalog.row_count), func.max(SeriesCatalog.last_fetched_at))
+        .join(Series, Series.id == SeriesCatalog.series_key)
+        .where(Series.dataset == "prices")
+    )
+    if frequency is not None:
+        stmt = stmt.where(SeriesCatalog.frequency == frequency)
+    return stmt
+
+
+def _range_query(
+    series_id: str,
+    frequency: str,
+    limit: int,
+    start: date | None = None,
+    end: date | None = None,
+    cursor: str | None = None,
+):
+    """One page of a series; see ``pagination.windowed``.
+
+    Only the two columns the response needs, both carried in the primary key
+    index, so either direction is an index-only range scan.
+    """
+    stmt = select(NaturalGasPrice.period, NaturalGasPrice.price).where(*_series_filter(series_id, frequency))
+    return windowed(stmt, NaturalGasPrice.period, start, end, cursor, limit)
+
+
+def _batch_query(series_ids: list[str], frequency: str, start: date | None, end: date | None, limit: int):
+    """Newest ``limit`` points of each series, oldest first, with their units."""
+    filters = [
+        NaturalGasPrice.series_key == Series.id,
+        NaturalGasPrice.frequency == frequency,
+    ]
+    if start is not None:
+        filters.append(NaturalGasPrice.period >= start)
+    if end is not None:
+        filters.append(NaturalGasPrice.period <= end)
+
+    # One LATERAL backward index scan per series stops after ``limit`` rows,
+    # instead of ranking every row of every series with a window function
+    points = (
+        select(NaturalGasPrice.period, NaturalGasPrice.price)
+        .where(*filters)
         .order_by(desc(NaturalGasPrice.period))
         .limit(limit)
-        .all()
+        .lateral("points")
+    )
+    return (
+        select(Series.series_id, points.c.period, points.c.price, Series.units)
+        .join(points, true())
+        .where(Series.dataset == "prices", Series.series_id.in_(series_ids))
+        .order_by(points.c.period)
     )
-    rows.reverse()  # oldest first
+
+
+def _align(rows, series_ids: list[str], fill: str) -> tuple[list[date], dict[str, list], dict[str, str]]:
+    """Pivot ``(series_id, period, price, units)`` rows, oldest first, onto one
+    date axis: the periods, a column of values per series, and their units.
+    ``fill`` is applied as described on ``get_prices_batch``."""
+    periods: list[date] = []
+    values: dict[date, dict[str, float]] = {}
+    units: dict[str, str] = {}
+    for sid, period, price, unit in rows:
+        if period not in values:
+            periods.append(period)
+            values[period] = {}
+        if price is not None:
+            values[period][sid] = float(price)
+        units.setdefault(sid, unit)
+
+    if fill == "drop":
+        periods = [p for p in periods if len(values[p]) == len(series_ids)]
+
+    series: dict[str, list[float | None]] = {}
+    for sid in series_ids:
+        column = [values[p].get(sid) for p in periods]
+        if fill == "ffill":
+            last = None
+            for i, v in enumerate(column):
+                if v is None:
+                    column[i] = last
+                else:
+                    last = v
+        elif fill == "zero":
+            column = [0 if v is None else v for v in column]
+        series[sid] = column
+    return periods, series, {sid: units.get(sid, "$/MMBtu") for sid in series_ids}
+
+
+def _spread(a: float | None, b: float | None) -> float | None:
+    return round(a - b, 4) if a is not None and b is not None else None
+
+
+def _structure(front: float | None, back: float | None) -> str | None:
+    """``contango`` when the back contract trades above the front one."""
+    if front is None or back is None:
+        return None
+    if back > front:
+        return "contango"
+    if back < front:
+        return "backwardation"
+    return "flat"
+
+
+@router.get("", response_model=PricesResponse | ResampledResponse)
+@cached_response("prices", _series_freshness, vary="Accept")
+async def get_prices(
+    series_id: str = Query("RNGWHHD"),
+    frequency: str = Query("monthly"),
+    limit: int = Query(60, ge=1, le=10000),
+    max_points: int | None = Query(None, ge=4, le=10000),
+    downsample: str = Query("lttb", pattern="^(lttb|minmax)$"),
+    resample: str | None = Query(None, pattern="^(week|month|quarter|year)$"),
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    cursor: str | None = Query(None),
+    fmt: str = Depends(response_format),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Points of one series, oldest first.
+
+    By default the newest ``limit`` points up to ``end``. With ``start`` or
+    ``cursor``, ``limit`` points forward from there, and ``next_cursor``
+    fetches the following page.
+
+    With ``resample`` the response holds pre-computed week / month / quarter /
+    year buckets (open, high, low, close, mean, count) and ``limit`` counts
+    buckets.
+    """
+    if resample is not None:
+        result = await db.execute(
+            select(Series.units).where(Series.dataset == "prices", Series.series_id == series_id)
+        )
+        meta = {"series_id": series_id, "units": result.scalar() or "$/MMBtu"}
+        return await resampled_series(
+            db, fmt, meta, _series_key(series_id), frequency, resample,
+            limit, start, end, cursor, max_points, downsample,
+        )
+
+    stmt, forward = _range_query(series_id, frequency, limit, start, end, cursor)
+    result = await db.execute(stmt)
+    rows, next_cursor = page(result.all(), forward, limit)
+
+    if max_points is not None and len(rows) > max_points:
+        keep = downsample_indices(
+            [row.period.toordinal() for row in rows],
+            [float(row.price) if row.price is not None else 0 for row in rows],
+            max_points,
+            downsample,
+        )
+        rows = [rows[i] for i in keep]
 
     date_fmt = "%Y-%m-%d" if frequency == "daily" else "%Y-%m"
+    units = "$/MMBtu"
+    if rows:
+        result = await db.execute(
+            select(Series.units).where(Series.dataset == "prices", Series.series_id == series_id)
+        )
+        units = result.scalar()
+
+    if fmt != "json":
+        return encode_series(
+            fmt,
+            {"series_id": series_id, "units": units, "next_cursor": next_cursor},
+            [row.period for row in rows],
+            [float(row.price) if row.price is not None else None for row in rows],
+            date_fmt,
+        )
 
     return PricesResponse(
         series_id=series_id,
-        units=rows[0].units if rows else "$/MMBtu",
+        units=units,
         count=len(rows),
+        next_cursor=next_cursor,
         data=[
             {
                 "date": row.period.strftime(date_fmt),
@@ -44,21 +290,174 @@ def get_prices(
     )
 
 
-@router.get("/latest", response_model=LatestPriceResponse)
-def get_latest_price(
-    series_id: str = Query("RNGWHHD"),
+@router.get("/batch", response_model=PriceMatrixResponse)
+@cached_response("prices", _batch_freshness)
+async def get_prices_batch(
+    series_id: str = Query("RNGWHHD,RNGC1,RNGC2,RNGC3,RNGC4"),
     frequency: str = Query("monthly"),
-    db: Session = Depends(get_db),
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    limit: int = Query(60, ge=1, le=10000),
+    fill: str = Query("none", pattern="^(none|ffill|zero|drop)$"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    row = (
-        db.query(NaturalGasPrice)
-        .filter(
-            NaturalGasPrice.series_id == series_id,
-            NaturalGasPrice.frequency == frequency,
+    """Return several series on one shared date axis from a single query.
+
+    ``limit`` applies per series, like ``get_prices``. ``fill`` controls dates
+    where a series has no value: ``none`` leaves null, ``ffill`` carries the
+    previous value forward, ``zero`` writes 0 and ``drop`` keeps only dates
+    where every series has a value.
+    """
+    series_ids = _parse_series_ids(series_id)
+    if not series_ids:
+        raise HTTPException(status_code=400, detail="series_id must name at least one series")
+
+    result = await db.execute(_batch_query(series_ids, frequency, start, end, limit))
+    periods, series, units = _align(result.all(), series_ids, fill)
+
+    date_fmt = "%Y-%m-%d" if frequency == "daily" else "%Y-%m"
+
+    return PriceMatrixResponse(
+        frequency=frequency,
+        fill=fill,
+        count=len(periods),
+        units=units,
+        dates=[p.strftime(date_fmt) for p in periods],
+        series=series,
+    )
+
+
+@router.get("/curve", response_model=PriceCurveResponse)
+@cached_response("prices", _curve_freshness)
+async def get_curve(
+    series_id: str = Query(CURVE_SERIES, description="Spot, then contracts in tenor order"),
+    frequency: str = Query("daily"),
+    as_of: date | None = Query(None, description="Latest curve on or before this date; newest when omitted"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """The term structure as of a date: each series' latest price on or before
+    ``as_of``, from one query, with spreads to spot and to the previous tenor.
+
+    ``structure`` compares the last contract with the first: ``contango``
+    when the curve slopes up, ``backwardation`` when it slopes down.
+    """
+    series_ids = _parse_series_ids(series_id)
+    if not series_ids:
+        raise HTTPException(status_code=400, detail="series_id must name at least one series")
+
+    # The batch query with limit 1 is one backward index probe per series
+    result = await db.execute(_batch_query(series_ids, frequency, None, as_of, 1))
+    latest = {sid: (period, price, unit) for sid, period, price, unit in result.all()}
+    prices = {sid: None for sid in series_ids}
+    for sid, (_, price, _) in latest.items():
+        prices[sid] = float(price) if price is not None else None
+
+    date_fmt = "%Y-%m-%d" if frequency == "daily" else "%Y-%m"
+    spot = prices[series_ids[0]]
+    points = []
+    for tenor, sid in enumerate(series_ids):
+        period = latest[sid][0] if sid in latest else None
+        points.append(
+            CurvePoint(
+                series_id=sid,
+                tenor=tenor,
+                date=period.strftime(date_fmt) if period is not None else None,
+                price=prices[sid],
+                spread_to_spot=_spread(prices[sid], spot) if tenor else None,
+                spread_to_previous=_spread(prices[sid], prices[series_ids[tenor - 1]]) if tenor else None,
+            )
         )
-        .order_by(desc(NaturalGasPrice.period))
-        .first()
+
+    front, back = (prices[series_ids[1]], prices[series_ids[-1]]) if len(series_ids) > 2 else (None, None)
+    dates = [latest[sid][0] for sid in series_ids if sid in latest]
+    return PriceCurveResponse(
+        frequency=frequency,
+        as_of=as_of.isoformat() if as_of is not None else None,
+        date=max(dates).strftime(date_fmt) if dates else None,
+        units=next((latest[sid][2] for sid in series_ids if sid in latest), "$/MMBtu"),
+        structure=_structure(front, back),
+        front_back_spread=_spread(back, front),
+        points=points,
     )
+
+
+@router.get("/curve/history", response_model=PriceCurveHistoryResponse)
+@cached_response("prices", _batch_freshness)
+async def get_curve_history(
+    series_id: str = Query(CURVE_SERIES, description="Spot, then contracts in tenor order"),
+    frequency: str = Query("daily"),
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    limit: int = Query(260, ge=1, le=10000),
+    fill: str = Query("ffill", pattern="^(none|ffill|drop)$"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """The curve on every date in a window, as a dense ``dates x tenors`` matrix.
+
+    ``curves[i][j]`` is the price of ``series_ids[j]`` on ``dates[i]``.
+    ``limit`` and ``fill`` work as on ``/api/prices/batch``; ``fill`` defaults
+    to ``ffill`` so a contract missing on one date keeps its last price.
+    ``front_back_spreads[i]`` is the last contract minus the first on that date.
+    """
+    series_ids = _parse_series_ids(series_id)
+    if not series_ids:
+        raise HTTPException(status_code=400, detail="series_id must name at least one series")
+
+    result = await db.execute(_batch_query(series_ids, frequency, start, end, limit))
+    periods, series, units = _align(result.all(), series_ids, fill)
+    curves = [list(row) for row in zip(*(series[sid] for sid in series_ids))]
+
+    date_fmt = "%Y-%m-%d" if frequency == "daily" else "%Y-%m"
+    return PriceCurveHistoryResponse(
+        frequency=frequency,
+        fill=fill,
+        count=len(periods),
+        units=units[series_ids[0]],
+        series_ids=series_ids,
+        dates=[p.strftime(date_fmt) for p in periods],
+        curves=curves,
+        front_back_spreads=[
+            _spread(curve[-1], curve[1]) if len(curve) > 2 else None for curve in curves
+        ],
+    )
+
+
+@router.get("/series", response_model=SeriesCatalogResponse)
+@cached_response("prices", _catalog_freshness)
+async def list_series(
+    frequency: str | None = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Every synced price series with its period range, row count and latest value."""
+    result = await db.execute(_catalog_query(frequency))
+    entries = []
+    for series, summary in result.all():
+        date_fmt = "%Y-%m-%d" if summary.frequency == "daily" else "%Y-%m"
+        entries.append(
+            CatalogEntry(
+                series_id=series.series_id,
+                description=series.series_description,
+                frequency=summary.frequency,
+                units=series.units,
+                first_period=summary.first_period.strftime(date_fmt),
+                last_period=summary.last_period.strftime(date_fmt),
+                count=summary.row_count,
+                latest_value=float(summary.latest_value) if summary.latest_value is not None else None,
+            )
+        )
+    return SeriesCatalogResponse(series=entries)
+
+
+@router.get("/latest", response_model=LatestPriceResponse)
+@cached_response("prices", _series_freshness)
+async def get_latest_price(
+    series_id: str = Query("RNGWHHD"),
+    frequency: str = Query("monthly"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt, _ = _range_query(series_id, frequency, 1)
+    result = await db.execute(stmt)
+    row = result.first()
     if row is None:
         return LatestPriceResponse(date="", price=0)
 
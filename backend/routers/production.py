@@ -1,60 +1,317 @@
+from datetime import date
+
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
+from sqlalchemy import Date, Integer, cast, extract, func, literal_column, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
-from ..models import NaturalGasProduction
+from ..cache import cached_response
+from ..database import get_async_db
+from ..downsampling import downsample_indices
+from ..formats import encode_series, response_format
+from ..models import NaturalGasProduction, Series, SeriesCatalog
+from ..pagination import page, windowed
+from ..rollups import resampled_series
 from ..schemas import (
     LatestProductionResponse,
     ProductionPoint,
+    ProductionRankingsResponse,
     ProductionResponse,
+    ResampledResponse,
     StateInfo,
+    StateRanking,
     StatesListResponse,
 )
 
 router = APIRouter(prefix="/api/production", tags=["production"])
 
+# The US total, against which each state's share is computed
+US_TOTAL_SERIES = "N9050US2"
 
-@router.get("/states", response_model=StatesListResponse)
-def list_states(db: Session = Depends(get_db)):
-    rows = (
-        db.query(
-            NaturalGasProduction.series_id,
-            NaturalGasProduction.duoarea,
-            NaturalGasProduction.area_name,
+
+def _series_key(series_id: str):
+    """The fact table's key for a production series code, as a scalar subquery."""
+    return (
+        select(Series.id)
+        .where(Series.dataset == "production", Series.series_id == series_id)
+        .scalar_subquery()
+    )
+
+
+def _series_filter(series_id: str):
+    # Production is monthly only; naming the frequency lets the primary key
+    # (series_key, frequency, period) serve the period ordering directly
+    return (
+        NaturalGasProduction.series_key == _series_key(series_id),
+        NaturalGasProduction.frequency == "monthly",
+    )
+
+
+def _catalog_freshness(**_):
+    return (
+        select(func.sum(SeriesCatalog.row_count), func.max(SeriesCatalog.last_fetched_at))
+        .join(Series, Series.id == SeriesCatalog.series_key)
+        .where(Series.dataset == "production")
+    )
+
+
+def _series_freshness(
+    series_id: str,
+    limit: int = 1,
+    start: date | None = None,
+    end: date | None = None,
+    cursor: str | None = None,
+    resample: str | None = None,
+    **_,
+):
+    """Validator of the rows one page reads; see ``prices._series_freshness``."""
+    if resample is not None:
+        return select(func.sum(SeriesCatalog.row_count), func.max(SeriesCatalog.last_fetched_at)).where(
+            SeriesCatalog.series_key == _series_key(series_id),
+            SeriesCatalog.frequency == "monthly",
+        )
+    stmt = select(NaturalGasProduction.fetched_at).where(*_series_filter(series_id))
+    window = windowed(stmt, NaturalGasProduction.period, start, end, cursor, limit)[0].subquery()
+    return select(func.count(), func.max(window.c.fetched_at))
+
+
+def _states_query():
+    return (
+        select(
+            Series.series_id,
+            Series.duoarea,
+            Series.area_name,
+            Series.units,
+            SeriesCatalog.first_period,
+            SeriesCatalog.last_period,
+            SeriesCatalog.row_count,
+            SeriesCatalog.latest_value,
+        )
+        .join(SeriesCatalog, SeriesCatalog.series_key == Series.id)
+        .where(Series.dataset == "production", SeriesCatalog.frequency == "monthly")
+        .order_by(Series.area_name)
+    )
+
+
+def _rankings_query(period: date | None):
+    """Every production series' value in ``period`` (the newest synced month
+    when None) with its month-over-month and year-over-year change, trailing
+    12-month sum, share of the US total and rank, in one statement.
+
+    Each series contributes only its last 13 months, read by a LATERAL range
+    scan of its primary key. The comparisons are window frames over a month
+    number rather than ``lag``, so a missing month yields null instead of
+    pairing the wrong months.
+    """
+    as_of = (
+        period
+        if period is not None
+        else select(func.max(SeriesCatalog.last_period))
+        .join(Series, Series.id == SeriesCatalog.series_key)
+        .where(Series.dataset == "production")
+        .scalar_subquery()
+    )
+    month = cast(
+        extract("year", NaturalGasProduction.period) * 12 + extract("month", NaturalGasProduction.period),
+        Integer,
+    )
+    months = (
+        select(NaturalGasProduction.period, NaturalGasProduction.value, month.label("month"))
+        .where(
+            NaturalGasProduction.series_key == Series.id,
+            NaturalGasProduction.frequency == "monthly",
+            NaturalGasProduction.period > cast(as_of - literal_column("interval '13 months'"), Date),
+            NaturalGasProduction.period <= as_of,
+        )
+        .lateral("months")
+    )
+
+    def months_back(first: int, last: int):
+        return dict(partition_by=Series.id, order_by=months.c.month, range_=(-first, -last))
+
+    history = (
+        select(
+            Series.series_id,
+            Series.duoarea,
+            Series.area_name,
+            Series.units,
+            months.c.period,
+            months.c.value,
+            func.max(months.c.value).over(**months_back(1, 1)).label("previous_month"),
+            func.max(months.c.value).over(**months_back(12, 12)).label("previous_year"),
+            func.sum(months.c.value).over(**months_back(11, 0)).label("trailing_12"),
+            func.count(months.c.value).over(**months_back(11, 0)).label("trailing_months"),
+        )
+        .join(months, true())
+        .where(Series.dataset == "production")
+        .subquery("history")
+    )
+
+    us_total = func.max(history.c.value).filter(history.c.series_id == US_TOTAL_SERIES).over()
+    is_state = history.c.series_id != US_TOTAL_SERIES
+    return (
+        select(
+            history,
+            (history.c.value / func.nullif(us_total, 0)).label("share"),
+            func.rank()
+            .over(partition_by=is_state, order_by=history.c.value.desc().nulls_last())
+            .label("rank"),
         )
-        .distinct()
-        .order_by(NaturalGasProduction.area_name)
-        .all()
+        .where(history.c.period == as_of)
+        .order_by(is_state, history.c.value.desc().nulls_last(), history.c.series_id)
     )
+
+
+def _range_query(
+    series_id: str,
+    limit: int,
+    start: date | None = None,
+    end: date | None = None,
+    cursor: str | None = None,
+):
+    """One page of a series as an index-only range scan; see ``pagination.windowed``."""
+    stmt = select(NaturalGasProduction.period, NaturalGasProduction.value).where(
+        *_series_filter(series_id)
+    )
+    return windowed(stmt, NaturalGasProduction.period, start, end, cursor, limit)
+
+
+@router.get("/states", response_model=StatesListResponse)
+@cached_response("production", _catalog_freshness)
+async def list_states(db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(_states_query())
+    rows = result.all()
     return StatesListResponse(
         states=[
-            StateInfo(series_id=r[0], duoarea=r[1], area_name=r[2])
+            StateInfo(
+                series_id=r.series_id,
+                duoarea=r.duoarea,
+                area_name=r.area_name,
+                units=r.units,
+                first_period=r.first_period.strftime("%Y-%m"),
+                last_period=r.last_period.strftime("%Y-%m"),
+                count=r.row_count,
+                latest_value=float(r.latest_value) if r.latest_value is not None else None,
+            )
             for r in rows
         ]
     )
 
 
-@router.get("", response_model=ProductionResponse)
-def get_production(
+def _change(value, previous) -> float | None:
+    if value is None or previous is None or previous == 0:
+        return None
+    return round(float((value - previous) / previous), 6)
+
+
+@router.get("/rankings", response_model=ProductionRankingsResponse)
+@cached_response("production", _catalog_freshness)
+async def get_rankings(
+    period: date | None = Query(None, description="Month to rank; the newest synced month when omitted"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """States ranked by production in one month, with their share of the US
+    total, month-over-month and year-over-year change and trailing 12-month
+    sum. Changes are fractions (0.05 is +5%); a change or sum is null when a
+    month it needs is missing."""
+    if period is not None:
+        period = period.replace(day=1)
+    result = await db.execute(_rankings_query(period))
+    rows = result.all()
+
+    total = None
+    states = []
+    for r in rows:
+        entry = StateRanking(
+            series_id=r.series_id,
+            duoarea=r.duoarea,
+            area_name=r.area_name,
+            units=r.units,
+            rank=r.rank,
+            value=float(r.value) if r.value is not None else None,
+            share=round(float(r.share), 6) if r.share is not None else None,
+            mom_change=_change(r.value, r.previous_month),
+            yoy_change=_change(r.value, r.previous_year),
+            trailing_12=float(r.trailing_12) if r.trailing_months == 12 else None,
+        )
+        if r.series_id == US_TOTAL_SERIES:
+            total = entry
+        else:
+            states.append(entry)
+
+    as_of = rows[0].period if rows else period
+    return ProductionRankingsResponse(
+        period=as_of.strftime("%Y-%m") if as_of is not None else None,
+        total=total,
+        states=states,
+    )
+
+
+@router.get("", response_model=ProductionResponse | ResampledResponse)
+@cached_response("production", _series_freshness, vary="Accept")
+async def get_production(
     series_id: str = Query("N9050US2"),
     limit: int = Query(120, ge=1, le=10000),
-    db: Session = Depends(get_db),
+    max_points: int | None = Query(None, ge=4, le=10000),
+    downsample: str = Query("lttb", pattern="^(lttb|minmax)$"),
+    resample: str | None = Query(None, pattern="^(month|quarter|year)$"),
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    cursor: str | None = Query(None),
+    fmt: str = Depends(response_format),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    rows = (
-        db.query(NaturalGasProduction)
-        .filter(NaturalGasProduction.series_id == series_id)
-        .order_by(desc(NaturalGasProduction.period))
-        .limit(limit)
-        .all()
-    )
-    rows.reverse()
+    """Monthly values of one series, oldest first; windowing, paging and
+    ``resample`` work as for ``/api/prices``."""
+    if resample is not None:
+        result = await db.execute(
+            select(Series.area_name, Series.units).where(
+                Series.dataset == "production", Series.series_id == series_id
+            )
+        )
+        area_name, units = result.first() or ("", "MMCF")
+        meta = {"series_id": series_id, "area_name": area_name, "units": units}
+        return await resampled_series(
+            db, fmt, meta, _series_key(series_id), "monthly", resample,
+            limit, start, end, cursor, max_points, downsample,
+        )
+
+    stmt, forward = _range_query(series_id, limit, start, end, cursor)
+    result = await db.execute(stmt)
+    rows, next_cursor = page(result.all(), forward, limit)
+
+    if max_points is not None and len(rows) > max_points:
+        keep = downsample_indices(
+            [row.period.toordinal() for row in rows],
+            [float(row.value) if row.value is not None else 0 for row in rows],
+            max_points,
+            downsample,
+        )
+        rows = [rows[i] for i in keep]
+
+    area_name, units = "", "MMCF"
+    if rows:
+        result = await db.execute(
+            select(Series.area_name, Series.units).where(
+                Series.dataset == "production", Series.series_id == series_id
+            )
+        )
+        area_name, units = result.one()
+
+    if fmt != "json":
+        return encode_series(
+            fmt,
+            {"series_id": series_id, "area_name": area_name, "units": units, "next_cursor": next_cursor},
+            [row.period for row in rows],
+            [float(row.value) if row.value is not None else None for row in rows],
+            "%Y-%m",
+        )
 
     return ProductionResponse(
         series_id=series_id,
-        area_name=rows[0].area_name if rows else "",
-        units=rows[0].units if rows else "MMCF",
+        area_name=area_name,
+        units=units,
         count=len(rows),
+        next_cursor=next_cursor,
         data=[
             ProductionPoint(
                 date=row.period.strftime("%Y-%m"),
@@ -66,16 +323,14 @@ def get_production(
 
 
 @router.get("/latest", response_model=LatestProductionResponse)
-def get_latest_production(
+@cached_response("production", _series_freshness)
+async def get_latest_production(
     series_id: str = Query("N9050US2"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    row = (
-        db.query(NaturalGasProduction)
-        .filter(NaturalGasProduction.series_id == series_id)
-        .order_by(desc(NaturalGasProduction.period))
-        .first()
-    )
+    stmt, _ = _range_query(series_id, 1)
+    result = await db.execute(stmt)
+    row = result.first()
     if row is None:
         return LatestProductionResponse(date="", value=0)
 
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, HTTPException
+
+from ..profiling import profile_store
+from ..schemas import ProfilesListResponse, RequestProfileResponse
+
+# Only mounted when PROFILING_ENABLED is set
+router = APIRouter(prefix="/api/profiles", tags=["profiling"])
+
+
+@router.get("", response_model=ProfilesListResponse)
+def list_profiles():
+    """Profiled requests still held in memory, newest first."""
+    return {"profiles": [profile.summary() for profile in profile_store.list()]}
+
+
+@router.get("/{profile_id}", response_model=RequestProfileResponse)
+def get_profile(profile_id: str):
+    """One request's SQL statements in order and its slowest functions by cumulative time."""
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"No profile {profile_id}; only the last ones are kept")
+    return profile.report()
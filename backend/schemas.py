@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
@@ -11,6 +13,102 @@ class PricesResponse(BaseModel):
     units: str
     count: int
     data: list[PricePoint]
+    next_cursor: str | None = None
+
+
+class RollupPoint(BaseModel):
+    date: str
+    open: float | None
+    high: float | None
+    low: float | None
+    close: float | None
+    mean: float | None
+    count: int
+
+
+class ResampledResponse(BaseModel):
+    series_id: str
+    area_name: str | None = None
+    units: str
+    resample: str
+    count: int
+    data: list[RollupPoint]
+    next_cursor: str | None = None
+
+
+class PriceMatrixResponse(BaseModel):
+    frequency: str
+    fill: str
+    count: int
+    units: dict[str, str]
+    dates: list[str]
+    series: dict[str, list[float | None]]
+
+
+class CurvePoint(BaseModel):
+    series_id: str
+    tenor: int  # 0 for spot, then 1, 2, ... for the contracts
+    date: str | None
+    price: float | None
+    spread_to_spot: float | None
+    spread_to_previous: float | None
+
+
+class PriceCurveResponse(BaseModel):
+    frequency: str
+    as_of: str | None
+    date: str | None
+    units: str
+    structure: str | None
+    front_back_spread: float | None
+    points: list[CurvePoint]
+
+
+class PriceCurveHistoryResponse(BaseModel):
+    frequency: str
+    fill: str
+    count: int
+    units: str
+    series_ids: list[str]
+    dates: list[str]
+    curves: list[list[float | None]]
+    front_back_spreads: list[float | None]
+
+
+class SeriesAnalytics(BaseModel):
+    units: str
+    volatility: float | None
+    max_drawdown: float | None
+    returns: list[float | None]
+    drawdown: list[float | None]
+    rolling_mean: dict[str, list[float | None]]
+    rolling_std: dict[str, list[float | None]]
+    zscore: dict[str, list[float | None]]
+
+
+class PriceAnalyticsResponse(BaseModel):
+    frequency: str
+    windows: list[int]
+    periods_per_year: int
+    count: int
+    dates: list[str]
+    series: dict[str, SeriesAnalytics]
+    correlation: list[list[float | None]]
+
+
+class CatalogEntry(BaseModel):
+    series_id: str
+    description: str | None
+    frequency: str
+    units: str | None
+    first_period: str
+    last_period: str
+    count: int
+    latest_value: float | None
+
+
+class SeriesCatalogResponse(BaseModel):
+    series: list[CatalogEntry]
 
 
 class LatestPriceResponse(BaseModel):
@@ -22,6 +120,18 @@ class HealthResponse(BaseModel):
     status: str
 
 
+class CacheStatsResponse(BaseModel):
+    entries: int
+    bytes: int
+    max_entries: int
+    max_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+
+
 class ProductionPoint(BaseModel):
     date: str
     value: float
@@ -33,18 +143,81 @@ class ProductionResponse(BaseModel):
     units: str
     count: int
     data: list[ProductionPoint]
+    next_cursor: str | None = None
 
 
 class StateInfo(BaseModel):
     series_id: str
     duoarea: str
     area_name: str
+    units: str | None = None
+    first_period: str | None = None
+    last_period: str | None = None
+    count: int = 0
+    latest_value: float | None = None
 
 
 class StatesListResponse(BaseModel):
     states: list[StateInfo]
 
 
+class StateRanking(BaseModel):
+    series_id: str
+    duoarea: str | None
+    area_name: str | None
+    units: str | None
+    rank: int
+    value: float | None
+    share: float | None
+    mom_change: float | None
+    yoy_change: float | None
+    trailing_12: float | None
+
+
+class ProductionRankingsResponse(BaseModel):
+    period: str | None
+    total: StateRanking | None
+    states: list[StateRanking]
+
+
 class LatestProductionResponse(BaseModel):
     date: str
     value: float
+
+
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    query: str
+    started_at: datetime
+    status: int
+    duration_ms: float
+    db_ms: float
+    statement_count: int
+
+
+class ProfilesListResponse(BaseModel):
+    profiles: list[ProfileSummary]
+
+
+class ProfiledStatement(BaseModel):
+    engine: str
+    statement: str
+    parameters: str
+    executemany: bool
+    started_at_ms: float
+    duration_ms: float
+
+
+class ProfiledFunction(BaseModel):
+    function: str
+    calls: int
+    primitive_calls: int
+    total_ms: float
+    cumulative_ms: float
+
+
+class RequestProfileResponse(ProfileSummary):
+    statements: list[ProfiledStatement]
+    functions: list[ProfiledFunction]
@@ -0,0 +1,199 @@
+"""
+On-disk archive of raw EIA pages, for rebuilding the tables offline.
+
+Every page a sync fetches is stored gzip-compressed under the SHA-256 of its
+records, so a page that comes back unchanged from a later run is stored once::
+
+    <root>/objects/ab/ab12....json.gz      # one page of records
+    <root>/queries/<query_key>.json        # url, params, offset -> object hash
+
+A query's manifest is keyed like its resume point in ``sync_state`` (the
+request parameters without the API key) and maps each page offset to the
+object last fetched for it; a rerun of the same query replaces its pages.
+
+A replay reads the manifests back in the order they were last written, so
+newer responses overwrite older ones, with pages decompressed and parsed in
+worker threads ahead of the loader. No API key or network is needed.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from backend.scripts.eia_client import query_key
+
+DEFAULT_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "eia_archive")
+# Where fetched pages are archived; an empty value disables archiving
+ARCHIVE_DIR = os.environ.get("EIA_ARCHIVE_DIR", DEFAULT_DIR)
+COMPRESS_LEVEL = 6
+
+
+@dataclass
+class Manifest:
+    key: str
+    url: str
+    params: dict[str, list[str]]
+    pages: dict[int, str]
+    updated_at: str
+
+    def param(self, name: str) -> str | None:
+        values = self.params.get(name)
+        return values[0] if values else None
+
+
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class PageArchive:
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.json.gz")
+
+    def _manifest_path(self, key: str) -> str:
+        return os.path.join(self.root, "queries", f"{key}.json")
+
+    def put(self, records: list[dict]) -> str:
+        """Store one page of records and return its hash."""
+        body = json.dumps(records, separators=(",", ":"), sort_keys=True).encode()
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            # mtime=0 keeps the compressed bytes a function of the records alone
+            _write_atomic(path, gzip.compress(body, COMPRESS_LEVEL, mtime=0))
+        return digest
+
+    def get(self, digest: str) -> list[dict]:
+        with open(self._object_path(digest), "rb") as f:
+            return json.loads(gzip.decompress(f.read()))
+
+    def load_manifest(self, key: str) -> Manifest | None:
+        try:
+            with open(self._manifest_path(key)) as f:
+                raw = json.load(f)
+        except FileNotFoundError:
+            return None
+        return Manifest(
+            key=key,
+            url=raw["url"],
+            params=raw["params"],
+            pages={int(offset): digest for offset, digest in raw["pages"].items()},
+            updated_at=raw["updated_at"],
+        )
+
+    def _save_manifest(self, manifest: Manifest):
+        raw = {
+            "url": manifest.url,
+            "params": manifest.params,
+            "pages": {str(offset): manifest.pages[offset] for offset in sorted(manifest.pages)},
+            "updated_at": manifest.updated_at,
+        }
+        _write_atomic(self._manifest_path(manifest.key), json.dumps(raw, indent=1).encode())
+
+    def manifests(self, url: str) -> list[Manifest]:
+        """Every archived query against ``url``, oldest first."""
+        directory = os.path.join(self.root, "queries")
+        if not os.path.isdir(directory):
+            return []
+        found = []
+        for name in os.listdir(directory):
+            if name.endswith(".json"):
+                manifest = self.load_manifest(name[: -len(".json")])
+                if manifest is not None and manifest.url == url:
+                    found.append(manifest)
+        return sorted(found, key=lambda m: m.updated_at)
+
+    async def record(
+        self,
+        pages: AsyncIterator[tuple[int, list[dict]]],
+        url: str,
+        params: list[tuple[str, str]],
+    ) -> AsyncIterator[tuple[int, list[dict]]]:
+        """Pass ``pages`` through, archiving each one before it is yielded."""
+        key = query_key(url, params)
+        manifest = self.load_manifest(key)
+        if manifest is None:
+            grouped: dict[str, list[str]] = {}
+            for name, value in params:
+                if name != "api_key":
+                    grouped.setdefault(name, []).append(value)
+            manifest = Manifest(key, url, grouped, {}, "")
+
+        first = True
+        async for offset, records in pages:
+            if first and offset == 0:
+                # A run from the start replaces the query's pages; a resumed one adds to them
+                manifest.pages = {}
+            first = False
+            if records:
+                manifest.pages[offset] = await asyncio.to_thread(self.put, records)
+                manifest.updated_at = datetime.now(UTC).isoformat()
+                await asyncio.to_thread(self._save_manifest, manifest)
+            yield offset, records
+
+    async def replay(
+        self, pages: dict[int, str], concurrency: int
+    ) -> AsyncIterator[tuple[int, list[dict]]]:
+        """Yield ``(offset, records)`` for archived ``pages`` (offset -> hash)
+        in offset order, reading up to ``concurrency`` pages ahead."""
+        concurrency = max(1, concurrency)
+        offsets = iter(sorted(pages))
+        pending: deque[tuple[int, asyncio.Task]] = deque()
+
+        def read(offset: int) -> asyncio.Task:
+            return asyncio.create_task(asyncio.to_thread(self.get, pages[offset]))
+
+        try:
+            for offset in offsets:
+                pending.append((offset, read(offset)))
+                if len(pending) == concurrency:
+                    break
+            while pending:
+                offset, task = pending.popleft()
+                records = await task
+                next_offset = next(offsets, None)
+                if next_offset is not None:
+                    pending.append((next_offset, read(next_offset)))
+                yield offset, records
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+
+def replay_plan(manifests: list[Manifest]) -> list[tuple[Manifest, dict[int, str]]]:
+    """The pages of each manifest to load, oldest manifest first.
+
+    A page that several queries returned unchanged is loaded once, at its
+    newest position, so it still overwrites anything older.
+    """
+    newest = {}
+    for i, manifest in enumerate(manifests):
+        for offset, digest in manifest.pages.items():
+            newest[digest] = (i, offset)
+    plan = []
+    for i, manifest in enumerate(manifests):
+        pages = {offset: digest for offset, digest in manifest.pages.items() if newest[digest] == (i, offset)}
+        if pages:
+            plan.append((manifest, pages))
+    return plan
+
+
+def default_archive() -> PageArchive | None:
+    return PageArchive(ARCHIVE_DIR) if ARCHIVE_DIR else None
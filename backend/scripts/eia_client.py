@@ -0,0 +1,193 @@
+"""
+Concurrent, rate-limited page fetching for the EIA v2 API.
+
+The first page is fetched alone to learn ``total``; the remaining offsets are
+then fetched concurrently over one pooled ``httpx.AsyncClient``. Every request
+takes a token from a shared token bucket, and 429 / 5xx / transport errors are
+retried with jittered exponential backoff (honouring ``Retry-After``).
+
+Pages are yielded in offset order as soon as they are available, with at most
+``concurrency`` pages in flight, so memory stays bounded by the window rather
+than the size of the dataset.
+"""
+
+import asyncio
+import hashlib
+import os
+import random
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+
+import httpx
+
+# Root of the EIA v2 API; point it at a stand-in server for benchmarks
+EIA_API_URL = os.environ.get("EIA_API_URL", "https://api.eia.gov/v2").rstrip("/")
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE_LIMIT = 2.0  # requests per second
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+REQUEST_TIMEOUT = 30
+
+
+class TokenBucket:
+    """Allow ``rate`` acquisitions per second with bursts of up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class TransferMeter:
+    """Requests made and response bytes received, retries included, and the
+    seconds spent waiting for a token, for responses and decoding their JSON."""
+
+    requests: int = 0
+    bytes: int = 0
+    limiter_seconds: float = 0.0
+    fetch_seconds: float = 0.0
+    parse_seconds: float = 0.0
+
+
+def make_client(concurrency: int = DEFAULT_CONCURRENCY) -> httpx.AsyncClient:
+    """A keep-alive client sized for ``concurrency`` in-flight requests."""
+    return httpx.AsyncClient(
+        timeout=REQUEST_TIMEOUT,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+    )
+
+
+def query_key(url: str, params: list[tuple[str, str]]) -> str:
+    """Fingerprint of a paged query, without the API key."""
+    canonical = "&".join(f"{k}={v}" for k, v in sorted(params) if k != "api_key")
+    return hashlib.sha1(f"{url}?{canonical}".encode()).hexdigest()
+
+
+def _backoff(attempt: int, response: httpx.Response | None = None) -> float:
+    if response is not None:
+        retry_after = response.headers.get("retry-after", "")
+        if retry_after.isdigit():
+            return float(retry_after)
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt))
+
+
+async def fetch_page(
+    client: httpx.AsyncClient,
+    url: str,
+    params: list[tuple[str, str]],
+    limiter: TokenBucket,
+    max_retries: int = MAX_RETRIES,
+    meter: TransferMeter | None = None,
+) -> dict:
+    """Fetch one page and return the ``response`` object of the EIA payload."""
+    for attempt in range(max_retries + 1):
+        waited = time.perf_counter()
+        await limiter.acquire()
+        started = time.perf_counter()
+        try:
+            resp = await client.get(url, params=params)
+        except httpx.TransportError as exc:
+            if attempt == max_retries:
+                raise
+            delay = _backoff(attempt)
+            reason = type(exc).__name__
+        else:
+            if meter is not None:
+                meter.requests += 1
+                meter.bytes += len(resp.content)
+                meter.limiter_seconds += started - waited
+                meter.fetch_seconds += time.perf_counter() - started
+            if resp.status_code != 429 and resp.status_code < 500:
+                resp.raise_for_status()
+                started = time.perf_counter()
+                payload = resp.json()["response"]
+                if meter is not None:
+                    meter.parse_seconds += time.perf_counter() - started
+                return payload
+            if attempt == max_retries:
+                resp.raise_for_status()
+            delay = _backoff(attempt, resp)
+            reason = f"HTTP {resp.status_code}"
+        print(f"  {reason}, retrying in {delay:.1f}s (attempt {attempt + 1}/{max_retries})")
+        await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+async def iter_pages(
+    url: str,
+    params: list[tuple[str, str]],
+    page_size: int,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate_limit: float = DEFAULT_RATE_LIMIT,
+    client: httpx.AsyncClient | None = None,
+    limiter: TokenBucket | None = None,
+    start_offset: int = 0,
+    meter: TransferMeter | None = None,
+) -> AsyncIterator[tuple[int, list[dict]]]:
+    """Yield ``(offset, records)`` for every page of a query, in offset order.
+
+    ``params`` are the query parameters without ``offset`` / ``length``.
+    ``start_offset`` skips the pages before it, to resume an interrupted run.
+    Pass ``client`` to share a connection pool across calls, and ``limiter``
+    to share one request budget (``rate_limit`` is then ignored). ``meter``
+    counts the requests and bytes transferred.
+    """
+    concurrency = max(1, concurrency)
+    if limiter is None:
+        limiter = TokenBucket(rate_limit, capacity=concurrency)
+    own_client = client is None
+    if own_client:
+        client = make_client(concurrency)
+
+    def fetch(offset: int) -> asyncio.Task:
+        page_params = [*params, ("offset", str(offset)), ("length", str(page_size))]
+        return asyncio.create_task(fetch_page(client, url, page_params, limiter, meter=meter))
+
+    pending: deque[tuple[int, asyncio.Task]] = deque()
+    try:
+        print(f"  Fetching offset={start_offset} ...")
+        first = await fetch(start_offset)
+        total = int(first.get("total", 0))
+        data = first.get("data", [])
+        print(f"  Got {len(data)} records (total available: {total})")
+        if not data:
+            return
+
+        offsets = iter(range(start_offset + page_size, total, page_size))
+        for offset in offsets:
+            pending.append((offset, fetch(offset)))
+            if len(pending) == concurrency:
+                break
+        yield start_offset, data
+
+        while pending:
+            offset, task = pending.popleft()
+            data = (await task).get("data", [])
+            next_offset = next(offsets, None)
+            if next_offset is not None:
+                pending.append((next_offset, fetch(next_offset)))
+            print(f"  Got {len(data)} records at offset={offset}")
+            yield offset, data
+    finally:
+        for _, task in pending:
+            task.cancel()
+        if own_client:
+            await client.aclose()
@@ -0,0 +1,282 @@
+"""
+Write paths for the sync scripts.
+
+``insert_upsert`` sends batched multi-row ``INSERT ... VALUES ... ON CONFLICT``
+statements. ``copy_upsert`` streams rows with PostgreSQL ``COPY`` into a
+temporary staging table and merges them into the target with one set-based
+``INSERT ... SELECT ... ON CONFLICT`` in the same transaction.
+
+Both are change-aware: a conflicting row is only rewritten when one of its
+value or metadata columns differs, and ``fetched_at`` moves only with such a
+change. ``diff_rows`` computes the same counts without writing.
+
+Rows arrive from ``build_rows`` with the series code and its metadata inline;
+``attach_series_keys`` records the metadata once in ``series`` and narrows
+each row to the fact table's columns. The upserts also summarise the rows they
+changed per series, which ``refresh_summaries`` folds into the catalog and
+rollups.
+"""
+
+import io
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+from sqlalchemy import and_, cast, column, func, literal_column, select, table, text, tuple_, values
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.catalog import update_catalog
+from backend.models import Series
+from backend.rollups import refresh_rollups
+
+LOADERS = ("insert", "copy")
+
+# Refreshed alongside a real change, but never a reason to rewrite a row alone
+TOUCH_COLUMNS = ("fetched_at",)
+
+SERIES_COLUMNS = [
+    "series_description",
+    "duoarea",
+    "area_name",
+    "product",
+    "product_name",
+    "process",
+    "process_name",
+    "units",
+    "source",
+]
+
+
+@dataclass
+class SeriesChange:
+    """The rows of one (series_key, frequency) that an upsert inserted or updated."""
+
+    inserted: int
+    first_period: date
+    last_period: date
+    last_fetched_at: datetime
+
+    def __add__(self, other: "SeriesChange") -> "SeriesChange":
+        return SeriesChange(
+            self.inserted + other.inserted,
+            min(self.first_period, other.first_period),
+            max(self.last_period, other.last_period),
+            max(self.last_fetched_at, other.last_fetched_at),
+        )
+
+
+@dataclass
+class UpsertCounts:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    # Keyed by (series_key, frequency); empty for diff_rows
+    series: dict[tuple[int, str], SeriesChange] = field(default_factory=dict, repr=False, compare=False)
+
+    def __add__(self, other: "UpsertCounts") -> "UpsertCounts":
+        series = dict(self.series)
+        for key, change in other.series.items():
+            series[key] = series[key] + change if key in series else change
+        return UpsertCounts(
+            self.inserted + other.inserted,
+            self.updated + other.updated,
+            self.unchanged + other.unchanged,
+            series,
+        )
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+    @property
+    def changed(self) -> int:
+        return self.inserted + self.updated
+
+
+def attach_series_keys(db, dataset: str, rows: list[dict], fact_columns: list[str], dry_run: bool = False):
+    """Upsert the series described by ``rows`` and map each row to its fact columns.
+
+    Returns ``(fact_rows, series_changed)``. With ``dry_run`` nothing is
+    written; rows of series not yet in the table get key -1, so they count
+    as inserts.
+    """
+    metadata = {row["series_id"]: {c: row[c] for c in SERIES_COLUMNS} for row in rows}
+    series_changed = 0
+
+    if not dry_run:
+        stmt = insert(Series).values(
+            [{"dataset": dataset, "series_id": sid, **meta} for sid, meta in metadata.items()]
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_series_dataset_series",
+            set_={c: stmt.excluded[c] for c in SERIES_COLUMNS},
+            where=tuple_(*(Series.__table__.c[c] for c in SERIES_COLUMNS)).is_distinct_from(
+                tuple_(*(stmt.excluded[c] for c in SERIES_COLUMNS))
+            ),
+        )
+        series_changed = len(db.execute(stmt.returning(Series.id)).all())
+
+    keys = dict(
+        db.execute(
+            select(Series.series_id, Series.id).where(
+                Series.dataset == dataset, Series.series_id.in_(metadata)
+            )
+        ).all()
+    )
+    fact_rows = [
+        {"series_key": keys.get(row["series_id"], -1), **{c: row[c] for c in fact_columns}}
+        for row in rows
+    ]
+    return fact_rows, series_changed
+
+
+def refresh_summaries(db, dataset: str, counts: UpsertCounts):
+    """Bring the catalog rows and rollup buckets up to date with the rows an
+    upsert changed. Call in the same transaction as the upsert.
+    """
+    if not counts.series:
+        return
+    update_catalog(db, dataset, counts.series)
+    keys = {key for key, _ in counts.series}
+    start = min(change.first_period for change in counts.series.values())
+    end = max(change.last_period for change in counts.series.values())
+    refresh_rollups(db, dataset, keys, start, end)
+
+
+def _on_conflict_update(stmt, model, constraint: str, update_columns: list[str]):
+    compare = [c for c in update_columns if c not in TOUCH_COLUMNS]
+    target = model.__table__.c
+    stmt = stmt.on_conflict_do_update(
+        constraint=constraint,
+        set_={c: stmt.excluded[c] for c in update_columns},
+        where=tuple_(*(target[c] for c in compare)).is_distinct_from(
+            tuple_(*(stmt.excluded[c] for c in compare))
+        ),
+    )
+    # xmax is 0 only for freshly inserted rows; rows skipped by WHERE return nothing
+    return stmt.returning(
+        target.series_key, target.frequency, target.period, target.fetched_at, literal_column("xmax = 0")
+    )
+
+
+def _counts(submitted: int, returned: list) -> UpsertCounts:
+    """Counts and per-series changes from the rows an upsert returned."""
+    series: dict[tuple[int, str], SeriesChange] = {}
+    for series_key, frequency, period, fetched_at, inserted in returned:
+        change = SeriesChange(int(inserted), period, period, fetched_at)
+        key = (series_key, frequency)
+        series[key] = series[key] + change if key in series else change
+    inserted = sum(change.inserted for change in series.values())
+    updated = len(returned) - inserted
+    return UpsertCounts(inserted, updated, submitted - inserted - updated, series)
+
+
+def insert_upsert(db, model, rows: list[dict], constraint: str, update_columns: list[str], batch_size: int) -> UpsertCounts:
+    """Upsert ``rows`` with batched multi-row INSERT statements.
+
+    Runs inside the session's current transaction; the caller commits.
+    """
+    counts = UpsertCounts()
+    for i in range(0, len(rows), batch_size):
+        batch = rows[i : i + batch_size]
+        stmt = _on_conflict_update(insert(model).values(batch), model, constraint, update_columns)
+        counts += _counts(len(batch), db.execute(stmt).all())
+    return counts
+
+
+def _copy_value(value) -> str:
+    """Encode one value in COPY text format."""
+    if value is None:
+        return r"\N"
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _copy_rows(dbapi_connection, stage: str, columns: list[str], rows: list[dict]):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(row[c]) for c in columns))
+        buffer.write("\n")
+    sql = f"COPY {stage} ({', '.join(columns)}) FROM STDIN"
+
+    cursor = dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def copy_upsert(
+    db, model, rows: list[dict], constraint: str, key_columns: list[str], update_columns: list[str]
+) -> UpsertCounts:
+    """Load ``rows`` into ``model``'s table through a COPY staging table.
+
+    Runs inside the session's current transaction; the caller commits.
+    Duplicate keys within ``rows`` keep the last occurrence.
+    """
+    if not rows:
+        return UpsertCounts()
+
+    target = model.__tablename__
+    stage = f"_stage_{target}"
+    columns = list(rows[0].keys())
+
+    db.execute(text(
+        f"CREATE TEMP TABLE IF NOT EXISTS {stage} ON COMMIT DELETE ROWS AS "
+        f"SELECT {', '.join(columns)} FROM {target} WITH NO DATA"
+    ))
+    # Clear anything left by an earlier load in this transaction
+    db.execute(text(f"TRUNCATE {stage}"))
+    _copy_rows(db.connection().connection.dbapi_connection, stage, columns, rows)
+
+    stage_table = table(stage, *(column(c) for c in columns), column("ctid"))
+    deduped = (
+        select(*(stage_table.c[c] for c in columns))
+        .distinct(*(stage_table.c[c] for c in key_columns))
+        .order_by(*(stage_table.c[c] for c in key_columns), stage_table.c.ctid.desc())
+    )
+    stmt = _on_conflict_update(insert(model).from_select(columns, deduped), model, constraint, update_columns)
+    submitted = len({tuple(row[c] for c in key_columns) for row in rows})
+    return _counts(submitted, db.execute(stmt).all())
+
+
+def diff_rows(db, model, rows: list[dict], key_columns: list[str], update_columns: list[str], batch_size: int) -> UpsertCounts:
+    """Count how ``rows`` would change ``model``'s table, without writing."""
+    compare = [c for c in update_columns if c not in TOUCH_COLUMNS]
+    target = model.__table__.c
+    counts = UpsertCounts()
+
+    for i in range(0, len(rows), batch_size):
+        batch = rows[i : i + batch_size]
+        columns = [*key_columns, *compare]
+        incoming = values(*(column(c, target[c].type) for c in columns), name="incoming").data(
+            [tuple(row[c] for c in columns) for row in batch]
+        )
+        # Cast to the column types so rounding matches what an upsert would store
+        exists = target[key_columns[0]].is_not(None)
+        differs = tuple_(*(target[c] for c in compare)).is_distinct_from(
+            tuple_(*(cast(incoming.c[c], target[c].type) for c in compare))
+        )
+        stmt = select(
+            func.count().filter(~exists),
+            func.count().filter(and_(exists, differs)),
+        ).select_from(
+            incoming.outerjoin(
+                model.__table__,
+                and_(*(target[c] == incoming.c[c] for c in key_columns)),
+            )
+        )
+        inserted, updated = db.execute(stmt).one()
+        counts += UpsertCounts(inserted, updated, len(batch) - inserted - updated)
+    return counts
@@ -0,0 +1,72 @@
+"""
+Streaming sync pipeline: fetch → transform → upsert, one page at a time.
+
+Pages are transformed as they arrive and handed to the writer through a
+bounded queue. The writer runs in a worker thread, so the next pages are
+fetched while the current one is written, and at most ``queue_size`` pages of
+rows are held in memory at once.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+
+from backend.scripts.loaders import UpsertCounts
+
+QUEUE_SIZE = 4
+
+
+@dataclass
+class PipelineStats:
+    pages: int = 0
+    records: int = 0
+    counts: UpsertCounts = field(default_factory=UpsertCounts)
+    bytes: int = 0  # response bytes downloaded; set by the sync, not the pipeline
+
+    def __add__(self, other: "PipelineStats") -> "PipelineStats":
+        return PipelineStats(
+            self.pages + other.pages,
+            self.records + other.records,
+            self.counts + other.counts,
+            self.bytes + other.bytes,
+        )
+
+
+async def run_pipeline(
+    pages: AsyncIterator[tuple[int, list[dict]]],
+    transform: Callable[[list[dict]], list[dict]],
+    write: Callable[[int, list[dict]], UpsertCounts],
+    queue_size: int = QUEUE_SIZE,
+) -> PipelineStats:
+    """Drain ``pages`` through ``transform`` into ``write``.
+
+    ``write`` is called from a worker thread with each page's offset and
+    rows, one page at a time and in page order, and returns its inserted /
+    updated / unchanged counts.
+    """
+    stats = PipelineStats()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    async def produce():
+        try:
+            async for offset, records in pages:
+                stats.pages += 1
+                stats.records += len(records)
+                rows = transform(records)
+                if rows:
+                    await queue.put((offset, rows))
+        finally:
+            await queue.put(None)
+
+    async def consume():
+        while (page := await queue.get()) is not None:
+            stats.counts += await asyncio.to_thread(write, *page)
+
+    producer = asyncio.create_task(produce())
+    try:
+        await consume()
+    except BaseException:
+        producer.cancel()
+        raise
+    await producer  # re-raises a fetch error after the writer has drained
+    return stats
@@ -0,0 +1,112 @@
+"""
+Stage timings for ``--profile`` sync runs.
+
+A sync spends its time waiting on the rate limiter and on EIA responses,
+decoding their JSON, mapping records to rows (``build_rows``, which calls
+``parse_period`` once per record it keeps) and writing the rows. The fetch
+stages are timed by the ``TransferMeter`` every sync already hands to the
+client; ``SyncProfile`` wraps the transform and write callables given to the
+pipeline and prints the breakdown when the run ends.
+
+Fetches overlap each other and the writer, so the stage times can add up to
+more than the run took.
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from backend.scripts.eia_client import TransferMeter
+
+
+@dataclass
+class StageTime:
+    seconds: float = 0.0
+    calls: int = 0
+
+
+def _per_call(stage: StageTime) -> str:
+    if not stage.calls:
+        return "-"
+    seconds = stage.seconds / stage.calls
+    return f"{seconds * 1e3:.1f} ms" if seconds >= 1e-3 else f"{seconds * 1e6:.1f} µs"
+
+
+class SyncProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: dict[str, StageTime] = {}
+        self._nested: set[str] = set()
+        # The writer runs in a worker thread, the transform on the event loop
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float, calls: int = 1):
+        with self._lock:
+            timing = self.stages.setdefault(stage, StageTime())
+            timing.seconds += seconds
+            timing.calls += calls
+
+    def timed(self, stage: str, fn: Callable) -> Callable:
+        """``fn``, adding the time of each call to ``stage``."""
+
+        def timed_fn(*args):
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self.add(stage, time.perf_counter() - started)
+
+        return timed_fn
+
+    def transform(self, build_rows: Callable[[list[dict], Callable], list[dict]], parse_period: Callable):
+        """A page transform timing ``build_rows`` and, within it, ``parse_period``.
+
+        ``build_rows(raw, parse)`` must parse periods with the ``parse`` it is
+        given, so exactly the calls the real transform makes are timed.
+        ``build_rows`` includes them and the cost of timing each one.
+        """
+        timed_build = self.timed("build_rows", build_rows)
+        self._nested.add("parse_period")
+
+        def profiled(raw: list[dict]) -> list[dict]:
+            parsing = StageTime()
+
+            def timed_parse(*args):
+                started = time.perf_counter()
+                try:
+                    return parse_period(*args)
+                finally:
+                    parsing.seconds += time.perf_counter() - started
+                    parsing.calls += 1
+
+            rows = timed_build(raw, timed_parse)
+            self.add("parse_period", parsing.seconds, parsing.calls)
+            return rows
+
+        return profiled
+
+    def report(self, meter: TransferMeter | None = None) -> str:
+        elapsed = time.perf_counter() - self.started
+        stages = []
+        if meter is not None and meter.requests:
+            stages += [
+                ("rate limiter", StageTime(meter.limiter_seconds, meter.requests)),
+                ("HTTP fetch", StageTime(meter.fetch_seconds, meter.requests)),
+                ("JSON parsing", StageTime(meter.parse_seconds, meter.requests)),
+            ]
+        stages += list(self.stages.items())
+
+        lines = [
+            f"Profile ({elapsed:.2f}s elapsed):",
+            f"  {'stage':<20} {'seconds':>9} {'calls':>9} {'per call':>10} {'share':>6}",
+        ]
+        for name, timing in stages:
+            label = f"  {name}" if name in self._nested else name
+            share = timing.seconds / elapsed * 100 if elapsed else 0.0
+            lines.append(
+                f"  {label:<20} {timing.seconds:>9.3f} {timing.calls:>9} {_per_call(timing):>10} {share:>5.0f}%"
+            )
+        if meter is not None and meter.requests:
+            lines.append("  Fetches overlap each other and the writer, so shares can add up to more than 100%.")
+        return "\n".join(lines)
@@ -0,0 +1,110 @@
+"""
+Bookkeeping shared by the sync scripts and the scheduler.
+
+Each sync job holds a PostgreSQL advisory lock while it runs, so a scheduled
+run, a cron job and a manual run of the same sync never overlap, even across
+processes. Every run is recorded in ``sync_runs`` with its outcome and counts.
+"""
+
+import asyncio
+import traceback
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+
+from sqlalchemy import select, text, update
+
+from backend.database import SessionLocal, engine
+from backend.models import SyncRun
+from backend.scripts.pipeline import PipelineStats
+
+# One advisory lock per job; MIGRATION_LOCK_ID is 7_316_001
+SYNC_LOCK_IDS = {"prices": 7_316_101, "production": 7_316_102}
+
+
+class JobLocked(Exception):
+    """Another process is running the same job."""
+
+
+class _AdvisoryLock:
+    """A session-level advisory lock held on its own pooled connection."""
+
+    def __init__(self, lock_id: int):
+        self.lock_id = lock_id
+        self.conn = None
+
+    def acquire(self) -> bool:
+        self.conn = engine.connect()
+        acquired = self.conn.scalar(text("SELECT pg_try_advisory_lock(:id)"), {"id": self.lock_id})
+        self.conn.commit()
+        if not acquired:
+            self.conn.close()
+            self.conn = None
+        return acquired
+
+    def release(self):
+        if self.conn is None:
+            return
+        try:
+            self.conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": self.lock_id})
+            self.conn.commit()
+        finally:
+            self.conn.close()
+            self.conn = None
+
+
+def _start(job: str, trigger: str, status: str = "running") -> int:
+    with SessionLocal() as db:
+        run = SyncRun(job=job, trigger=trigger, status=status, started_at=datetime.now(UTC))
+        if status != "running":
+            run.finished_at = run.started_at
+        db.add(run)
+        db.commit()
+        return run.id
+
+
+def _finish(run_id: int, status: str, stats: PipelineStats | None = None, error: str | None = None):
+    values = {"status": status, "finished_at": datetime.now(UTC), "error": error}
+    if stats is not None:
+        values.update(
+            pages=stats.pages,
+            records=stats.records,
+            bytes=stats.bytes,
+            inserted=stats.counts.inserted,
+            updated=stats.counts.updated,
+            unchanged=stats.counts.unchanged,
+        )
+    with SessionLocal() as db:
+        db.execute(update(SyncRun).where(SyncRun.id == run_id).values(**values))
+        db.commit()
+
+
+async def run_job(job: str, trigger: str, sync: Callable[[], Awaitable[PipelineStats]]) -> PipelineStats:
+    """Run ``sync`` under ``job``'s lock and record it in ``sync_runs``.
+
+    Raises ``JobLocked`` (after recording a skipped run) when another process
+    holds the lock. A failure is recorded with its traceback and re-raised.
+    """
+    lock = _AdvisoryLock(SYNC_LOCK_IDS[job])
+    if not await asyncio.to_thread(lock.acquire):
+        await asyncio.to_thread(_start, job, trigger, "skipped")
+        raise JobLocked(f"{job} sync is already running in another process")
+
+    try:
+        run_id = await asyncio.to_thread(_start, job, trigger)
+        try:
+            stats = await sync()
+        except asyncio.CancelledError:
+            await asyncio.to_thread(_finish, run_id, "failed", None, "cancelled")
+            raise
+        except Exception:
+            await asyncio.to_thread(_finish, run_id, "failed", None, traceback.format_exc())
+            raise
+        await asyncio.to_thread(_finish, run_id, "succeeded", stats)
+        return stats
+    finally:
+        await asyncio.to_thread(lock.release)
+
+
+def recent_runs(limit: int = 20) -> list[SyncRun]:
+    with SessionLocal() as db:
+        return list(db.scalars(select(SyncRun).order_by(SyncRun.started_at.desc(), SyncRun.id.desc()).limit(limit)))
@@ -0,0 +1,224 @@
+"""
+Sync scheduler — runs the price and production syncs on their own schedules
+in one long-running process.
+
+Both syncs share one HTTP client, one EIA request budget and the database
+connection pool, and run concurrently. Each run takes its job's advisory lock
+(see ``runs``), so it never overlaps a cron or manual run of the same sync,
+and is recorded in ``sync_runs``. A failed run is retried with exponential
+backoff instead of waiting for the next scheduled run.
+
+Usage:
+    python -m backend.scripts.scheduler                                   # default schedules
+    python -m backend.scripts.scheduler --prices-every 30m --production-every 1d
+    python -m backend.scripts.scheduler --once                            # run each job once, then exit
+    python -m backend.scripts.scheduler --history                         # recent runs
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import signal
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import httpx
+from dotenv import load_dotenv
+
+# Load .env from the backend directory
+load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
+
+# Add project root to path so imports work when run as script
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from backend.migrations import migrate
+from backend.scripts import sync_prices, sync_production
+from backend.scripts.archive import default_archive
+from backend.scripts.eia_client import DEFAULT_CONCURRENCY, DEFAULT_RATE_LIMIT, TokenBucket, make_client
+from backend.scripts.loaders import LOADERS
+from backend.scripts.pipeline import PipelineStats
+from backend.scripts.runs import JobLocked, recent_runs, run_job
+
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_interval(value: str) -> float:
+    """Seconds in an interval such as ``90``, ``30m``, ``6h`` or ``1d``."""
+    value = value.strip().lower()
+    try:
+        if value and value[-1] in UNITS:
+            seconds = float(value[:-1]) * UNITS[value[-1]]
+        else:
+            seconds = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid interval: {value!r}")
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError(f"interval must be positive: {value!r}")
+    return seconds
+
+
+PRICES_EVERY = os.environ.get("SYNC_PRICES_EVERY", "1h")
+PRODUCTION_EVERY = os.environ.get("SYNC_PRODUCTION_EVERY", "1d")
+# Price frequencies synced by each prices run, in order
+PRICES_FREQUENCIES = os.environ.get("SYNC_PRICES_FREQUENCIES", "daily")
+# First retry delay after a failure in seconds; doubles per consecutive failure, capped at the interval
+RETRY_BACKOFF = float(os.environ.get("SYNC_RETRY_BACKOFF", "60"))
+
+
+@dataclass
+class Job:
+    name: str
+    interval: float
+    sync: Callable[[httpx.AsyncClient, TokenBucket], Awaitable[PipelineStats]]
+    failures: int = 0
+
+    def retry_delay(self) -> float:
+        delay = min(self.interval, RETRY_BACKOFF * 2 ** (self.failures - 1))
+        return random.uniform(0.5, 1.0) * delay
+
+
+def build_jobs(api_key: str, args) -> list[Job]:
+    frequencies = [f.strip() for f in args.prices_frequencies.split(",") if f.strip()]
+    archive = default_archive()
+
+    async def prices(client, limiter) -> PipelineStats:
+        total = PipelineStats()
+        for frequency in frequencies:
+            total += await sync_prices.run_sync(
+                api_key, sync_prices.ALL_SERIES, frequency,
+                concurrency=args.concurrency, loader=args.loader, client=client, limiter=limiter,
+                archive=archive,
+            )
+        return total
+
+    async def production(client, limiter) -> PipelineStats:
+        return await sync_production.run_sync(
+            api_key, concurrency=args.concurrency, loader=args.loader, client=client, limiter=limiter,
+            archive=archive,
+        )
+
+    return [
+        Job("prices", args.prices_every, prices),
+        Job("production", args.production_every, production),
+    ]
+
+
+async def run_schedule(job: Job, client: httpx.AsyncClient, limiter: TokenBucket, stop: asyncio.Event, once: bool) -> bool:
+    """Run ``job`` every ``job.interval`` seconds until ``stop`` is set.
+
+    Runs start ``interval`` apart, not ``interval`` after the previous one
+    ended; a run that overruns is followed immediately by the next. Returns
+    whether the last run succeeded.
+    """
+    while True:
+        started = time.monotonic()
+        print(f"[{job.name}] starting")
+        try:
+            await run_job(job.name, "scheduler", lambda: job.sync(client, limiter))
+        except JobLocked as exc:
+            print(f"[{job.name}] skipped: {exc}")
+            ok, delay = False, job.interval
+        except Exception as exc:
+            job.failures += 1
+            ok, delay = False, job.retry_delay()
+            print(f"[{job.name}] failed ({job.failures} in a row): {exc!r}; retrying in {delay:.0f}s")
+        else:
+            job.failures = 0
+            ok, delay = True, max(0.0, job.interval - (time.monotonic() - started))
+            print(f"[{job.name}] done; next run in {delay:.0f}s")
+
+        if once:
+            return ok
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=delay)
+            return ok
+        except TimeoutError:
+            pass
+
+
+async def serve(jobs: list[Job], concurrency: int, once: bool = False) -> bool:
+    """Run every job's schedule concurrently until SIGINT / SIGTERM (or, with
+    ``once``, until each has run once). A run in progress is allowed to finish."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: Ctrl+C cancels the run instead
+
+    limiter = TokenBucket(DEFAULT_RATE_LIMIT, capacity=concurrency)
+    async with make_client(concurrency * len(jobs)) as client:
+        results = await asyncio.gather(*(run_schedule(job, client, limiter, stop, once) for job in jobs))
+    return all(results)
+
+
+def print_history(limit: int):
+    for run in recent_runs(limit):
+        duration = f"{(run.finished_at - run.started_at).total_seconds():.1f}s" if run.finished_at else "-"
+        if run.inserted is not None:
+            detail = f"{run.inserted} new, {run.updated} changed, {run.unchanged} unchanged"
+        else:
+            # The last line of a traceback names the exception
+            detail = (run.error or "").strip().rsplit("\n", 1)[-1]
+        print(
+            f"{run.started_at:%Y-%m-%d %H:%M:%S}  {run.job:<11} {run.trigger:<9} "
+            f"{run.status:<9} {duration:>8}  {detail}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the EIA syncs on a schedule")
+    parser.add_argument(
+        "--prices-every",
+        type=parse_interval,
+        default=parse_interval(PRICES_EVERY),
+        help=f"Interval between price syncs, e.g. 30m, 6h (default: {PRICES_EVERY})",
+    )
+    parser.add_argument(
+        "--production-every",
+        type=parse_interval,
+        default=parse_interval(PRODUCTION_EVERY),
+        help=f"Interval between production syncs (default: {PRODUCTION_EVERY})",
+    )
+    parser.add_argument(
+        "--prices-frequencies",
+        default=PRICES_FREQUENCIES,
+        help=f"Comma-separated price frequencies synced per run (default: {PRICES_FREQUENCIES})",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Pages fetched in parallel per sync (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument("--loader", choices=LOADERS, default="insert", help="Write path (default: insert)")
+    parser.add_argument("--once", action="store_true", help="Run each job once, concurrently, and exit")
+    parser.add_argument("--history", type=int, nargs="?", const=20, help="Print the most recent runs and exit")
+    args = parser.parse_args()
+
+    # Create or upgrade the schema
+    migrate()
+
+    if args.history is not None:
+        print_history(args.history)
+        return
+
+    api_key = os.environ.get("EIA_API_KEY")
+    if not api_key:
+        print("ERROR: EIA_API_KEY not set in environment or backend/.env")
+        sys.exit(1)
+
+    jobs = build_jobs(api_key, args)
+    for job in jobs:
+        print(f"Scheduling {job.name} every {job.interval:.0f}s")
+    ok = asyncio.run(serve(jobs, args.concurrency, once=args.once))
+    if args.once and not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
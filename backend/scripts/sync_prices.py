@@ -8,18 +8,22 @@ Usage:
     python -m backend.scripts.sync_prices                 # incremental: only new records
     python -m backend.scripts.sync_prices --series RNGWHHD,RNGC1 --frequency monthly
     python -m backend.scripts.sync_prices --start 2020-01-01 --end 2025-12-31
+    python -m backend.scripts.sync_prices --full --concurrency 8
+    python -m backend.scripts.sync_prices --full --loader copy     # bulk backfill via COPY
+    python -m backend.scripts.sync_prices --dry-run              # report changes without writing
+    python -m backend.scripts.sync_prices --replay               # reload from the page archive, offline
+    python -m backend.scripts.sync_prices --full --profile       # time spent per stage
 """
 
 import argparse
+import asyncio
 import os
 import sys
-import time
+from collections.abc import AsyncIterator
 from datetime import UTC, date, datetime
 
 import httpx
 from dotenv import load_dotenv
-from sqlalchemy import text
-from sqlalchemy.dialects.postgresql import insert
 
 # Load .env from the backend directory
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
@@ -27,127 +31,92 @@ load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
 # Add project root to path so imports work when run as script
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
-from backend.database import SessionLocal, engine
-from backend.models import Base, NaturalGasPrice
-
-EIA_BASE_URL = "https://api.eia.gov/v2/natural-gas/pri/fut/data/"
+from backend.cache import bump_generation
+from backend.database import SessionLocal
+from backend.migrations import migrate, pending_migrations
+from backend.models import NaturalGasPrice
+from backend.scripts.archive import PageArchive, default_archive, replay_plan
+from backend.scripts.eia_client import (
+    DEFAULT_CONCURRENCY,
+    EIA_API_URL,
+    TokenBucket,
+    TransferMeter,
+    iter_pages,
+    query_key,
+)
+from backend.scripts.loaders import (
+    LOADERS,
+    UpsertCounts,
+    attach_series_keys,
+    copy_upsert,
+    diff_rows,
+    insert_upsert,
+    refresh_summaries,
+)
+from backend.scripts.pipeline import PipelineStats, run_pipeline
+from backend.scripts.profiling import SyncProfile
+from backend.scripts.runs import JobLocked, run_job
+from backend.scripts.sync_state import Checkpoint, watermarks
+
+EIA_BASE_URL = f"{EIA_API_URL}/natural-gas/pri/fut/data/"
 
 ALL_SERIES = ["RNGWHHD", "RNGC1", "RNGC2", "RNGC3", "RNGC4"]
 
 PAGE_SIZE = 5000
 BATCH_SIZE = 1000
-RATE_LIMIT_SLEEP = 0.5
-
-
-def migrate_schema():
-    """Add new columns and update constraints if not already migrated."""
-    with engine.begin() as conn:
-        # Check if frequency column exists
-        result = conn.execute(text("""
-            SELECT column_name FROM information_schema.columns
-            WHERE table_name = 'natural_gas_prices' AND column_name = 'frequency'
-        """))
-        if result.fetchone():
-            print("Schema already migrated, skipping.")
-            return
-
-        print("Migrating schema...")
-
-        # Add new columns
-        conn.execute(text("""
-            ALTER TABLE natural_gas_prices
-            ADD COLUMN frequency VARCHAR(10) NOT NULL DEFAULT 'monthly',
-            ADD COLUMN series_description VARCHAR(200),
-            ADD COLUMN duoarea VARCHAR(10),
-            ADD COLUMN area_name VARCHAR(100),
-            ADD COLUMN product VARCHAR(10),
-            ADD COLUMN product_name VARCHAR(100),
-            ADD COLUMN process VARCHAR(10),
-            ADD COLUMN process_name VARCHAR(100)
-        """))
-
-        # Make price nullable
-        conn.execute(text("""
-            ALTER TABLE natural_gas_prices ALTER COLUMN price DROP NOT NULL
-        """))
-
-        # Drop old constraint, create new one
-        conn.execute(text("""
-            ALTER TABLE natural_gas_prices DROP CONSTRAINT IF EXISTS uq_series_period
-        """))
-        conn.execute(text("""
-            ALTER TABLE natural_gas_prices
-            ADD CONSTRAINT uq_series_period_freq UNIQUE (series_id, period, frequency)
-        """))
-
-        print("Schema migration complete.")
-
-
-def get_last_sync_date(db, series_list: list[str], frequency: str) -> str | None:
-    """Get the most recent period in the DB for the given series and frequency."""
-    row = (
-        db.query(NaturalGasPrice.period)
-        .filter(
-            NaturalGasPrice.series_id.in_(series_list),
-            NaturalGasPrice.frequency == frequency,
-        )
-        .order_by(NaturalGasPrice.period.desc())
-        .first()
-    )
-    if row:
-        return row[0].isoformat()
-    return None
+RATE_LIMIT = 2.0  # EIA requests per second across all concurrent fetches
 
+CONFLICT_CONSTRAINT = "pk_natural_gas_prices"
+KEY_COLUMNS = ["series_key", "frequency", "period"]
+FACT_COLUMNS = ["frequency", "period", "price", "fetched_at"]
+UPDATE_COLUMNS = ["price", "fetched_at"]
 
-def fetch_all_pages(
+
+def query_params(
     api_key: str,
     series_list: list[str],
     frequency: str,
     start: str | None = None,
     end: str | None = None,
-) -> list[dict]:
-    """Fetch all records from EIA API with pagination."""
-    all_data = []
-    offset = 0
-
-    while True:
-        # Build params as list of tuples to support repeated facets[series][]
-        params = [
-            ("api_key", api_key),
-            ("frequency", frequency),
-            ("data[0]", "value"),
-            ("sort[0][column]", "period"),
-            ("sort[0][direction]", "asc"),
-            ("offset", str(offset)),
-            ("length", str(PAGE_SIZE)),
-        ]
-
-        for s in series_list:
-            params.append(("facets[series][]", s))
-
-        if start:
-            params.append(("start", start))
-        if end:
-            params.append(("end", end))
-
-        print(f"  Fetching offset={offset} ...")
-        resp = httpx.get(EIA_BASE_URL, params=params, timeout=30)
-        resp.raise_for_status()
-
-        body = resp.json()["response"]
-        data = body.get("data", [])
-        total = int(body.get("total", 0))
-
-        all_data.extend(data)
-        print(f"  Got {len(data)} records (total available: {total})")
-
-        offset += PAGE_SIZE
-        if offset >= total or len(data) == 0:
-            break
-
-        time.sleep(RATE_LIMIT_SLEEP)
-
-    return all_data
+) -> list[tuple[str, str]]:
+    """EIA query parameters, without the page offset and length."""
+    # Build params as list of tuples to support repeated facets[series][]
+    params = [
+        ("api_key", api_key),
+        ("frequency", frequency),
+        ("data[0]", "value"),
+        ("sort[0][column]", "period"),
+        ("sort[0][direction]", "asc"),
+    ]
+
+    for s in series_list:
+        params.append(("facets[series][]", s))
+
+    if start:
+        params.append(("start", start))
+    if end:
+        params.append(("end", end))
+    return params
+
+
+def fetch_pages(
+    api_key: str,
+    series_list: list[str],
+    frequency: str,
+    start: str | None = None,
+    end: str | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    client: httpx.AsyncClient | None = None,
+    limiter: TokenBucket | None = None,
+    start_offset: int = 0,
+    archive: PageArchive | None = None,
+    meter: TransferMeter | None = None,
+) -> AsyncIterator[tuple[int, list[dict]]]:
+    """Stream pages of records from the EIA API, fetching ahead concurrently,
+    and keep a copy of each in ``archive``."""
+    params = query_params(api_key, series_list, frequency, start, end)
+    pages = iter_pages(EIA_BASE_URL, params, PAGE_SIZE, concurrency, RATE_LIMIT, client, limiter, start_offset, meter)
+    return archive.record(pages, EIA_BASE_URL, params) if archive else pages
 
 
 def parse_period(period_str: str, frequency: str) -> date:
@@ -159,8 +128,9 @@ def parse_period(period_str: str, frequency: str) -> date:
         return date.fromisoformat(period_str + "-01")
 
 
-def build_rows(raw: list[dict], frequency: str) -> list[dict]:
-    """Map API records to DB rows."""
+def build_rows(raw: list[dict], frequency: str, parse=parse_period) -> list[dict]:
+    """Map API records to DB rows; ``parse`` stands in for ``parse_period``
+    when profiling."""
     now = datetime.now(UTC)
     rows = []
 
@@ -171,7 +141,7 @@ def build_rows(raw: list[dict], frequency: str) -> list[dict]:
 
         rows.append({
             "series_id": item["series"],
-            "period": parse_period(item["period"], frequency),
+            "period": parse(item["period"], frequency),
             "price": price,
             "units": item.get("units", "$/MMBtu"),
             "source": "EIA",
@@ -189,86 +159,256 @@ def build_rows(raw: list[dict], frequency: str) -> list[dict]:
     return rows
 
 
-def upsert_batch(db, rows: list[dict]):
-    """Insert rows in batches with upsert on conflict."""
-    total_upserted = 0
-
-    for i in range(0, len(rows), BATCH_SIZE):
-        batch = rows[i : i + BATCH_SIZE]
-        stmt = insert(NaturalGasPrice).values(batch)
-        stmt = stmt.on_conflict_do_update(
-            constraint="uq_series_period_freq",
-            set_={
-                "price": stmt.excluded.price,
-                "units": stmt.excluded.units,
-                "fetched_at": stmt.excluded.fetched_at,
-                "series_description": stmt.excluded.series_description,
-                "duoarea": stmt.excluded.duoarea,
-                "area_name": stmt.excluded.area_name,
-                "product": stmt.excluded.product,
-                "product_name": stmt.excluded.product_name,
-                "process": stmt.excluded.process,
-                "process_name": stmt.excluded.process_name,
-            },
-        )
-        db.execute(stmt)
-        total_upserted += len(batch)
-        print(f"  Upserted batch: {total_upserted}/{len(rows)}")
-
+def upsert_batch(db, rows: list[dict], checkpoint: Checkpoint | None = None, offset: int = 0) -> UpsertCounts:
+    """Upsert rows in batches, rewriting only rows whose values changed.
+
+    With ``checkpoint``, the sync progress past page ``offset`` is committed
+    with the rows.
+    """
+    fact_rows, series_changed = attach_series_keys(db, "prices", rows, FACT_COLUMNS)
+    counts = insert_upsert(db, NaturalGasPrice, fact_rows, CONFLICT_CONSTRAINT, UPDATE_COLUMNS, BATCH_SIZE)
+    print(f"  Upserted batch: {counts.inserted} inserted, {counts.updated} updated, {counts.unchanged} unchanged")
+    if counts.changed or series_changed:
+        refresh_summaries(db, "prices", counts)
+        bump_generation(db, "prices")
+    if checkpoint is not None:
+        checkpoint.record(db, rows, offset)
     db.commit()
-    return total_upserted
+    return counts
+
+
+def copy_batch(db, rows: list[dict], checkpoint: Checkpoint | None = None, offset: int = 0) -> UpsertCounts:
+    """Load rows through COPY into a staging table, then merge the changed ones."""
+    fact_rows, series_changed = attach_series_keys(db, "prices", rows, FACT_COLUMNS)
+    counts = copy_upsert(db, NaturalGasPrice, fact_rows, CONFLICT_CONSTRAINT, KEY_COLUMNS, UPDATE_COLUMNS)
+    print(f"  Copied batch: {counts.inserted} inserted, {counts.updated} updated, {counts.unchanged} unchanged")
+    if counts.changed or series_changed:
+        refresh_summaries(db, "prices", counts)
+        bump_generation(db, "prices")
+    if checkpoint is not None:
+        checkpoint.record(db, rows, offset)
+    db.commit()
+    return counts
 
 
-def sync_prices(
+def diff_batch(db, rows: list[dict], checkpoint: Checkpoint | None = None, offset: int = 0) -> UpsertCounts:
+    """Compute what an upsert of rows would change, without writing anything,
+    including the sync progress."""
+    rows, _ = attach_series_keys(db, "prices", rows, FACT_COLUMNS, dry_run=True)
+    counts = diff_rows(db, NaturalGasPrice, rows, KEY_COLUMNS, UPDATE_COLUMNS, BATCH_SIZE)
+    db.rollback()
+    print(f"  Would insert {counts.inserted}, update {counts.updated}, leave {counts.unchanged} unchanged")
+    return counts
+
+
+def plan_queries(series_list: list[str], frequency: str, start: str | None, full: bool) -> list[tuple[list[str], str | None]]:
+    """Split a run into ``(series, start)`` queries.
+
+    Incremental runs group the series by their high-water mark, so each
+    series is fetched from its own last period; series without one are
+    fetched in full.
+    """
+    if full or start is not None:
+        return [(series_list, start)]
+
+    db = SessionLocal()
+    try:
+        marks = watermarks(db, "prices", frequency)
+    finally:
+        db.close()
+
+    groups: dict[str | None, list[str]] = {}
+    for sid in series_list:
+        mark = marks.get(sid)
+        groups.setdefault(mark.isoformat() if mark else None, []).append(sid)
+    for group_start, group in groups.items():
+        if group_start:
+            print(f"Incremental sync: fetching [{', '.join(group)}] from {group_start} onward")
+        else:
+            print(f"No existing data for [{', '.join(group)}], doing full fetch")
+    return list((group, group_start) for group_start, group in groups.items())
+
+
+async def run_sync(
+    api_key: str,
     series_list: list[str],
     frequency: str = "daily",
     start: str | None = None,
     end: str | None = None,
     full: bool = False,
-):
-    api_key = os.environ.get("EIA_API_KEY")
-    if not api_key:
-        print("ERROR: EIA_API_KEY not set in environment or backend/.env")
-        sys.exit(1)
-
-    # Ensure table exists
-    Base.metadata.create_all(bind=engine)
-
-    # Run migration for existing tables
-    migrate_schema()
+    concurrency: int = DEFAULT_CONCURRENCY,
+    loader: str = "insert",
+    dry_run: bool = False,
+    client: httpx.AsyncClient | None = None,
+    limiter: TokenBucket | None = None,
+    archive: PageArchive | None = None,
+    profile: SyncProfile | None = None,
+) -> PipelineStats:
+    """Fetch and load one sync. The schema must be current.
+
+    ``client`` and ``limiter`` let the scheduler share one connection pool and
+    request budget between syncs; by default each sync has its own. A query
+    interrupted by an earlier run resumes at its first uncommitted page.
+    Fetched pages are kept in ``archive`` for ``run_replay``. With
+    ``profile``, the time spent in each stage is printed at the end.
+    """
+    queries = await asyncio.to_thread(plan_queries, series_list, frequency, start, full)
+
+    # Each page is built and upserted as it arrives rather than collected first
+    if dry_run:
+        write = diff_batch
+    else:
+        write = copy_batch if loader == "copy" else upsert_batch
+    transform = lambda raw: build_rows(raw, frequency)
+    if profile is not None:
+        transform = profile.transform(lambda raw, parse: build_rows(raw, frequency, parse), parse_period)
+        write = profile.timed(write.__name__, write)
+
+    stats = PipelineStats()
+    meter = TransferMeter()
+    for group, group_start in queries:
+        print(f"Syncing series=[{', '.join(group)}] frequency={frequency}")
+        key = query_key(EIA_BASE_URL, query_params(api_key, group, frequency, group_start, end))
+        checkpoint = None if dry_run else Checkpoint("prices", frequency, group, key, PAGE_SIZE)
 
-    # Determine start date for incremental sync
-    if not full and start is None:
         db = SessionLocal()
         try:
-            last_date = get_last_sync_date(db, series_list, frequency)
-            if last_date:
-                start = last_date
-                print(f"Incremental sync: fetching records from {start} onward")
-            else:
-                print("No existing data found, doing full fetch")
+            offset = await asyncio.to_thread(checkpoint.resume_offset, db) if checkpoint else 0
+            if offset:
+                print(f"Resuming an interrupted sync at offset {offset}")
+            pages = fetch_pages(
+                api_key, group, frequency, group_start, end, concurrency, client, limiter, offset, archive, meter
+            )
+            stats += await run_pipeline(
+                pages,
+                transform,
+                lambda page_offset, rows: write(db, rows, checkpoint, page_offset),
+            )
+            if checkpoint is not None:
+                await asyncio.to_thread(checkpoint.complete, db)
         finally:
             db.close()
 
-    series_str = ", ".join(series_list)
-    print(f"Syncing series=[{series_str}] frequency={frequency}")
+    stats.bytes = meter.bytes
+    report(stats, dry_run)
+    if profile is not None:
+        print(profile.report(meter))
+    return stats
 
-    raw = fetch_all_pages(api_key, series_list, frequency, start, end)
-    print(f"Total records fetched: {len(raw)}")
 
-    if not raw:
+async def run_replay(
+    archive: PageArchive,
+    frequency: str = "daily",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    loader: str = "insert",
+    dry_run: bool = False,
+    profile: SyncProfile | None = None,
+) -> PipelineStats:
+    """Reload every archived price page of ``frequency``, without the API.
+
+    Pages are read and parsed ``concurrency`` at a time ahead of the loader,
+    and written through the same path as a sync, so the result is what the
+    original syncs would load with the current ``build_rows``.
+    """
+    manifests = [m for m in archive.manifests(EIA_BASE_URL) if m.param("frequency") == frequency]
+    plan = replay_plan(manifests)
+    if not plan:
+        print(f"No archived {frequency} price pages in {archive.root}")
+
+    if dry_run:
+        write = diff_batch
+    else:
+        write = copy_batch if loader == "copy" else upsert_batch
+    transform = lambda raw: build_rows(raw, frequency)
+    if profile is not None:
+        transform = profile.transform(lambda raw, parse: build_rows(raw, frequency, parse), parse_period)
+        write = profile.timed(write.__name__, write)
+    # No resume point: a replay is cheap to rerun, it only advances the watermarks
+    checkpoint = None if dry_run else Checkpoint("prices", frequency, [], "replay", PAGE_SIZE)
+
+    stats = PipelineStats()
+    db = SessionLocal()
+    try:
+        for manifest, pages in plan:
+            series = ", ".join(manifest.params.get("facets[series][]", []))
+            print(f"Replaying {len(pages)} pages of [{series}] fetched up to {manifest.updated_at}")
+            stats += await run_pipeline(
+                archive.replay(pages, concurrency),
+                transform,
+                lambda page_offset, rows: write(db, rows, checkpoint, page_offset),
+            )
+    finally:
+        db.close()
+
+    report(stats, dry_run)
+    if profile is not None:
+        print(profile.report())
+    return stats
+
+
+def report(stats: PipelineStats, dry_run: bool):
+    if not stats.records:
         print("No records to insert.")
         return
+    counts = stats.counts
+    print(
+        f"{'Dry run' if dry_run else 'Done'}! Fetched {stats.records} records in {stats.pages} pages: "
+        f"{counts.inserted} new, {counts.updated} changed, {counts.unchanged} unchanged rows in natural_gas_prices"
+    )
 
-    rows = build_rows(raw, frequency)
-    print(f"Built {len(rows)} rows for upsert")
 
-    db = SessionLocal()
+def sync_prices(
+    series_list: list[str],
+    frequency: str = "daily",
+    start: str | None = None,
+    end: str | None = None,
+    full: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    loader: str = "insert",
+    dry_run: bool = False,
+    replay: bool = False,
+    archive: bool = True,
+    profile: bool = False,
+):
+    # A dry run writes nothing: no pages to the archive, no schema changes
+    page_archive = default_archive() if (archive and not dry_run) or replay else None
+    if replay and page_archive is None:
+        print("ERROR: --replay needs an archive; EIA_ARCHIVE_DIR is empty")
+        sys.exit(1)
+    api_key = os.environ.get("EIA_API_KEY")
+    if not api_key and not replay:
+        print("ERROR: EIA_API_KEY not set in environment or backend/.env")
+        sys.exit(1)
+
+    if dry_run:
+        pending = pending_migrations()
+        if pending:
+            print(
+                f"ERROR: the schema is {len(pending)} migration(s) behind; "
+                "run `python -m backend.migrations` before a dry run"
+            )
+            sys.exit(1)
+    else:
+        # Create or upgrade the schema
+        migrate()
+
+    def sync():
+        stage_profile = SyncProfile() if profile else None
+        if replay:
+            return run_replay(page_archive, frequency, concurrency, loader, dry_run, stage_profile)
+        return run_sync(
+            api_key, series_list, frequency, start, end, full, concurrency, loader, dry_run,
+            archive=page_archive, profile=stage_profile,
+        )
+
+    if dry_run:
+        asyncio.run(sync())
+        return
     try:
-        count = upsert_batch(db, rows)
-        print(f"Done! Upserted {count} rows into natural_gas_prices")
-    finally:
-        db.close()
+        asyncio.run(run_job("prices", "replay" if replay else "cli", sync))
+    except JobLocked as exc:
+        print(f"ERROR: {exc}")
+        sys.exit(1)
 
 
 def main():
@@ -290,6 +430,39 @@ def main():
         action="store_true",
         help="Force full re-fetch (ignore last sync date)",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Pages fetched (or, with --replay, read) in parallel after the first (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--loader",
+        choices=LOADERS,
+        default="insert",
+        help="Write path: batched INSERT ... ON CONFLICT, or COPY into a staging table (default: insert)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Fetch and diff against the DB, reporting what would change without writing "
+        "(nothing is archived and the schema must already be current)",
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Reload every archived page of --frequency instead of calling the API (no API key needed)",
+    )
+    parser.add_argument(
+        "--no-archive",
+        action="store_true",
+        help="Do not keep fetched pages in the archive (EIA_ARCHIVE_DIR)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print the time spent fetching, parsing JSON, building rows, parsing periods and writing",
+    )
     args = parser.parse_args()
 
     if args.series == "all":
@@ -303,6 +476,12 @@ def main():
         start=args.start,
         end=args.end,
         full=args.full,
+        concurrency=args.concurrency,
+        loader=args.loader,
+        dry_run=args.dry_run,
+        replay=args.replay,
+        archive=not args.no_archive,
+        profile=args.profile,
     )
 
 
@@ -7,17 +7,22 @@ Usage:
     python -m backend.scripts.sync_production --full          # first time: pull all ~16K records
     python -m backend.scripts.sync_production                 # incremental: only new records
     python -m backend.scripts.sync_production --start 2020-01 --end 2025-12
+    python -m backend.scripts.sync_production --full --concurrency 8
+    python -m backend.scripts.sync_production --full --loader copy     # bulk backfill via COPY
+    python -m backend.scripts.sync_production --dry-run              # report changes without writing
+    python -m backend.scripts.sync_production --replay               # reload from the page archive, offline
+    python -m backend.scripts.sync_production --full --profile       # time spent per stage
 """
 
 import argparse
+import asyncio
 import os
 import sys
-import time
+from collections.abc import AsyncIterator
 from datetime import UTC, date, datetime
 
 import httpx
 from dotenv import load_dotenv
-from sqlalchemy.dialects.postgresql import insert
 
 # Load .env from the backend directory
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
@@ -25,71 +30,88 @@ load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
 # Add project root to path so imports work when run as script
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
-from backend.database import SessionLocal, engine
-from backend.models import Base, NaturalGasProduction
-
-EIA_BASE_URL = "https://api.eia.gov/v2/natural-gas/prod/whv/data/"
+from backend.cache import bump_generation
+from backend.database import SessionLocal
+from backend.migrations import migrate, pending_migrations
+from backend.models import NaturalGasProduction
+from backend.scripts.archive import PageArchive, default_archive, replay_plan
+from backend.scripts.eia_client import (
+    DEFAULT_CONCURRENCY,
+    EIA_API_URL,
+    TokenBucket,
+    TransferMeter,
+    iter_pages,
+    query_key,
+)
+from backend.scripts.loaders import (
+    LOADERS,
+    UpsertCounts,
+    attach_series_keys,
+    copy_upsert,
+    diff_rows,
+    insert_upsert,
+    refresh_summaries,
+)
+from backend.scripts.pipeline import PipelineStats, run_pipeline
+from backend.scripts.profiling import SyncProfile
+from backend.scripts.runs import JobLocked, run_job
+from backend.scripts.sync_state import ALL, Checkpoint, watermarks
+
+EIA_BASE_URL = f"{EIA_API_URL}/natural-gas/prod/whv/data/"
 
 PAGE_SIZE = 5000
 BATCH_SIZE = 1000
-RATE_LIMIT_SLEEP = 0.5
-
+RATE_LIMIT = 2.0  # EIA requests per second across all concurrent fetches
 
-def get_last_sync_date(db) -> str | None:
-    """Get the most recent period in the DB."""
-    row = (
-        db.query(NaturalGasProduction.period)
-        .order_by(NaturalGasProduction.period.desc())
-        .first()
-    )
-    if row:
-        return row[0].strftime("%Y-%m")
-    return None
+CONFLICT_CONSTRAINT = "pk_natural_gas_production"
+KEY_COLUMNS = ["series_key", "frequency", "period"]
+FACT_COLUMNS = ["frequency", "period", "value", "fetched_at"]
+UPDATE_COLUMNS = ["value", "fetched_at"]
 
 
-def fetch_all_pages(
+def query_params(
     api_key: str,
     start: str | None = None,
     end: str | None = None,
-) -> list[dict]:
-    """Fetch all records from EIA API with pagination."""
-    all_data = []
-    offset = 0
-
-    while True:
-        params = [
-            ("api_key", api_key),
-            ("frequency", "monthly"),
-            ("data[0]", "value"),
-            ("sort[0][column]", "period"),
-            ("sort[0][direction]", "asc"),
-            ("offset", str(offset)),
-            ("length", str(PAGE_SIZE)),
-        ]
-
-        if start:
-            params.append(("start", start))
-        if end:
-            params.append(("end", end))
-
-        print(f"  Fetching offset={offset} ...")
-        resp = httpx.get(EIA_BASE_URL, params=params, timeout=30)
-        resp.raise_for_status()
-
-        body = resp.json()["response"]
-        data = body.get("data", [])
-        total = int(body.get("total", 0))
-
-        all_data.extend(data)
-        print(f"  Got {len(data)} records (total available: {total})")
-
-        offset += PAGE_SIZE
-        if offset >= total or len(data) == 0:
-            break
-
-        time.sleep(RATE_LIMIT_SLEEP)
-
-    return all_data
+    series_list: list[str] | None = None,
+) -> list[tuple[str, str]]:
+    """EIA query parameters, without the page offset and length. Without
+    ``series_list`` the query covers every state."""
+    params = [
+        ("api_key", api_key),
+        ("frequency", "monthly"),
+        ("data[0]", "value"),
+        ("sort[0][column]", "period"),
+        ("sort[0][direction]", "asc"),
+    ]
+
+    for s in series_list or []:
+        params.append(("facets[series][]", s))
+
+    if start:
+        params.append(("start", start))
+    if end:
+        params.append(("end", end))
+    return params
+
+
+def fetch_pages(
+    api_key: str,
+    start: str | None = None,
+    end: str | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    client: httpx.AsyncClient | None = None,
+    limiter: TokenBucket | None = None,
+    start_offset: int = 0,
+    archive: PageArchive | None = None,
+    meter: TransferMeter | None = None,
+    series_list: list[str] | None = None,
+) -> AsyncIterator[tuple[int, list[dict]]]:
+    """Stream pages of records from the EIA API, fetching ahead concurrently,
+    and keep a copy of each in ``archive``."""
+    params = query_params(api_key, start, end, series_list)
+    pages = iter_pages(EIA_BASE_URL, params, PAGE_SIZE, concurrency, RATE_LIMIT, client, limiter, start_offset, meter)
+    return archive.record(pages, EIA_BASE_URL, params) if archive else pages
 
 
 def parse_period(period_str: str) -> date:
@@ -97,8 +119,11 @@ def parse_period(period_str: str) -> date:
     return date.fromisoformat(period_str + "-01")
 
 
-def build_rows(raw: list[dict]) -> list[dict]:
-    """Map API records to DB rows, filtering to VGM (marketed production) only."""
+def build_rows(raw: list[dict], parse=parse_period) -> list[dict]:
+    """Map one page of API records to DB rows, filtering to VGM (marketed
+    production) only. Duplicate (series, period) keys within the page keep the
+    last record, since one upsert statement cannot touch a row twice.
+    ``parse`` stands in for ``parse_period`` when profiling."""
     now = datetime.now(UTC)
     rows = {}
 
@@ -114,7 +139,7 @@ def build_rows(raw: list[dict]) -> list[dict]:
         key = (item["series"], item["period"])
         rows[key] = {
             "series_id": item["series"],
-            "period": parse_period(item["period"]),
+            "period": parse(item["period"]),
             "value": val,
             "units": item.get("units", "MMCF"),
             "source": "EIA",
@@ -132,80 +157,246 @@ def build_rows(raw: list[dict]) -> list[dict]:
     return list(rows.values())
 
 
-def upsert_batch(db, rows: list[dict]):
-    """Insert rows in batches with upsert on conflict."""
-    total_upserted = 0
-
-    for i in range(0, len(rows), BATCH_SIZE):
-        batch = rows[i : i + BATCH_SIZE]
-        stmt = insert(NaturalGasProduction).values(batch)
-        stmt = stmt.on_conflict_do_update(
-            constraint="uq_production_series_period",
-            set_={
-                "value": stmt.excluded.value,
-                "units": stmt.excluded.units,
-                "fetched_at": stmt.excluded.fetched_at,
-                "series_description": stmt.excluded.series_description,
-                "duoarea": stmt.excluded.duoarea,
-                "area_name": stmt.excluded.area_name,
-                "product": stmt.excluded.product,
-                "product_name": stmt.excluded.product_name,
-                "process": stmt.excluded.process,
-                "process_name": stmt.excluded.process_name,
-            },
-        )
-        db.execute(stmt)
-        total_upserted += len(batch)
-        print(f"  Upserted batch: {total_upserted}/{len(rows)}")
-
+def upsert_batch(db, rows: list[dict], checkpoint: Checkpoint | None = None, offset: int = 0) -> UpsertCounts:
+    """Upsert rows in batches, rewriting only rows whose values changed.
+
+    With ``checkpoint``, the sync progress past page ``offset`` is committed
+    with the rows.
+    """
+    fact_rows, series_changed = attach_series_keys(db, "production", rows, FACT_COLUMNS)
+    counts = insert_upsert(db, NaturalGasProduction, fact_rows, CONFLICT_CONSTRAINT, UPDATE_COLUMNS, BATCH_SIZE)
+    print(f"  Upserted batch: {counts.inserted} inserted, {counts.updated} updated, {counts.unchanged} unchanged")
+    if counts.changed or series_changed:
+        refresh_summaries(db, "production", counts)
+        bump_generation(db, "production")
+    if checkpoint is not None:
+        checkpoint.record(db, rows, offset)
     db.commit()
-    return total_upserted
+    return counts
+
+
+def copy_batch(db, rows: list[dict], checkpoint: Checkpoint | None = None, offset: int = 0) -> UpsertCounts:
+    """Load rows through COPY into a staging table, then merge the changed ones."""
+    fact_rows, series_changed = attach_series_keys(db, "production", rows, FACT_COLUMNS)
+    counts = copy_upsert(db, NaturalGasProduction, fact_rows, CONFLICT_CONSTRAINT, KEY_COLUMNS, UPDATE_COLUMNS)
+    print(f"  Copied batch: {counts.inserted} inserted, {counts.updated} updated, {counts.unchanged} unchanged")
+    if counts.changed or series_changed:
+        refresh_summaries(db, "production", counts)
+        bump_generation(db, "production")
+    if checkpoint is not None:
+        checkpoint.record(db, rows, offset)
+    db.commit()
+    return counts
 
 
-def sync_production(
+def diff_batch(db, rows: list[dict], checkpoint: Checkpoint | None = None, offset: int = 0) -> UpsertCounts:
+    """Compute what an upsert of rows would change, without writing anything,
+    including the sync progress."""
+    rows, _ = attach_series_keys(db, "production", rows, FACT_COLUMNS, dry_run=True)
+    counts = diff_rows(db, NaturalGasProduction, rows, KEY_COLUMNS, UPDATE_COLUMNS, BATCH_SIZE)
+    db.rollback()
+    print(f"  Would insert {counts.inserted}, update {counts.updated}, leave {counts.unchanged} unchanged")
+    return counts
+
+
+def plan_queries(start: str | None, full: bool) -> list[tuple[list[str], str | None]]:
+    """Split a run into ``(series, start)`` queries; no series means every state.
+
+    An incremental run fetches every state from the high-water mark most of
+    them share, which also picks up states never synced before. States whose
+    mark lags behind it are grouped by mark and fetched from there with a
+    series facet, as in ``sync_prices.plan_queries``, so one late state does
+    not pin the whole query to its month.
+    """
+    if full or start is not None:
+        return [([], start)]
+
+    db = SessionLocal()
+    try:
+        marks = watermarks(db, "production", "monthly")
+    finally:
+        db.close()
+    if not marks:
+        print("No existing data found, doing full fetch")
+        return [([], None)]
+
+    groups: dict[date, list[str]] = {}
+    for sid, mark in sorted(marks.items()):
+        groups.setdefault(mark, []).append(sid)
+    common = max(groups, key=lambda mark: (len(groups[mark]), mark))
+    queries = [([], common.strftime("%Y-%m"))]
+    print(f"Incremental sync: fetching all states from {common:%Y-%m} onward")
+    for mark, group in sorted(groups.items()):
+        if mark < common:
+            print(f"Incremental sync: fetching lagging [{', '.join(group)}] from {mark:%Y-%m} onward")
+            queries.append((group, mark.strftime("%Y-%m")))
+    return queries
+
+
+async def run_sync(
+    api_key: str,
     start: str | None = None,
     end: str | None = None,
     full: bool = False,
-):
-    api_key = os.environ.get("EIA_API_KEY")
-    if not api_key:
-        print("ERROR: EIA_API_KEY not set in environment or backend/.env")
-        sys.exit(1)
-
-    # Ensure table exists
-    Base.metadata.create_all(bind=engine)
+    concurrency: int = DEFAULT_CONCURRENCY,
+    loader: str = "insert",
+    dry_run: bool = False,
+    client: httpx.AsyncClient | None = None,
+    limiter: TokenBucket | None = None,
+    archive: PageArchive | None = None,
+    profile: SyncProfile | None = None,
+) -> PipelineStats:
+    """Fetch and load one sync. The schema must be current.
+
+    ``client`` and ``limiter`` are shared with other syncs, an interrupted
+    query is resumed, pages are archived and ``profile`` times each stage, as
+    in ``sync_prices.run_sync``.
+    """
+    queries = await asyncio.to_thread(plan_queries, start, full)
+
+    # Each page is built and upserted as it arrives rather than collected first
+    if dry_run:
+        write = diff_batch
+    else:
+        write = copy_batch if loader == "copy" else upsert_batch
+    transform = build_rows
+    if profile is not None:
+        transform = profile.transform(build_rows, parse_period)
+        write = profile.timed(write.__name__, write)
+
+    stats = PipelineStats()
+    meter = TransferMeter()
+    for group, group_start in queries:
+        print(f"Syncing natural gas production data ({', '.join(group) if group else 'all states'})")
+        key = query_key(EIA_BASE_URL, query_params(api_key, group_start, end, group))
+        checkpoint = None if dry_run else Checkpoint("production", "monthly", group or [ALL], key, PAGE_SIZE)
 
-    # Determine start date for incremental sync
-    if not full and start is None:
         db = SessionLocal()
         try:
-            last_date = get_last_sync_date(db)
-            if last_date:
-                start = last_date
-                print(f"Incremental sync: fetching records from {start} onward")
-            else:
-                print("No existing data found, doing full fetch")
+            offset = await asyncio.to_thread(checkpoint.resume_offset, db) if checkpoint else 0
+            if offset:
+                print(f"Resuming an interrupted sync at offset {offset}")
+            pages = fetch_pages(
+                api_key, group_start, end, concurrency, client, limiter, offset, archive, meter, group
+            )
+            stats += await run_pipeline(
+                pages, transform, lambda page_offset, rows: write(db, rows, checkpoint, page_offset)
+            )
+            if checkpoint is not None:
+                await asyncio.to_thread(checkpoint.complete, db)
         finally:
             db.close()
 
-    print("Syncing natural gas production data (all states)")
+    stats.bytes = meter.bytes
+    report(stats, dry_run)
+    if profile is not None:
+        print(profile.report(meter))
+    return stats
+
+
+async def run_replay(
+    archive: PageArchive,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    loader: str = "insert",
+    dry_run: bool = False,
+    profile: SyncProfile | None = None,
+) -> PipelineStats:
+    """Reload every archived production page without the API, as
+    ``sync_prices.run_replay``."""
+    plan = replay_plan(archive.manifests(EIA_BASE_URL))
+    if not plan:
+        print(f"No archived production pages in {archive.root}")
+
+    if dry_run:
+        write = diff_batch
+    else:
+        write = copy_batch if loader == "copy" else upsert_batch
+    transform = build_rows
+    if profile is not None:
+        transform = profile.transform(build_rows, parse_period)
+        write = profile.timed(write.__name__, write)
+    checkpoint = None if dry_run else Checkpoint("production", "monthly", [], "replay", PAGE_SIZE)
+
+    stats = PipelineStats()
+    db = SessionLocal()
+    try:
+        for manifest, pages in plan:
+            start = manifest.param("start") or "the first period"
+            print(f"Replaying {len(pages)} pages from {start}, fetched up to {manifest.updated_at}")
+            stats += await run_pipeline(
+                archive.replay(pages, concurrency),
+                transform,
+                lambda page_offset, rows: write(db, rows, checkpoint, page_offset),
+            )
+    finally:
+        db.close()
 
-    raw = fetch_all_pages(api_key, start, end)
-    print(f"Total records fetched: {len(raw)}")
+    report(stats, dry_run)
+    if profile is not None:
+        print(profile.report())
+    return stats
 
-    if not raw:
+
+def report(stats: PipelineStats, dry_run: bool):
+    if not stats.records:
         print("No records to insert.")
         return
+    counts = stats.counts
+    print(
+        f"{'Dry run' if dry_run else 'Done'}! Fetched {stats.records} records in {stats.pages} pages: "
+        f"{counts.inserted} new, {counts.updated} changed, {counts.unchanged} unchanged rows in natural_gas_production"
+    )
 
-    rows = build_rows(raw)
-    print(f"Built {len(rows)} rows for upsert")
 
-    db = SessionLocal()
+def sync_production(
+    start: str | None = None,
+    end: str | None = None,
+    full: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    loader: str = "insert",
+    dry_run: bool = False,
+    replay: bool = False,
+    archive: bool = True,
+    profile: bool = False,
+):
+    # A dry run writes nothing: no pages to the archive, no schema changes
+    page_archive = default_archive() if (archive and not dry_run) or replay else None
+    if replay and page_archive is None:
+        print("ERROR: --replay needs an archive; EIA_ARCHIVE_DIR is empty")
+        sys.exit(1)
+    api_key = os.environ.get("EIA_API_KEY")
+    if not api_key and not replay:
+        print("ERROR: EIA_API_KEY not set in environment or backend/.env")
+        sys.exit(1)
+
+    if dry_run:
+        pending = pending_migrations()
+        if pending:
+            print(
+                f"ERROR: the schema is {len(pending)} migration(s) behind; "
+                "run `python -m backend.migrations` before a dry run"
+            )
+            sys.exit(1)
+    else:
+        # Create or upgrade the schema
+        migrate()
+
+    def sync():
+        stage_profile = SyncProfile() if profile else None
+        if replay:
+            return run_replay(page_archive, concurrency, loader, dry_run, stage_profile)
+        return run_sync(
+            api_key, start, end, full, concurrency, loader, dry_run, archive=page_archive, profile=stage_profile
+        )
+
+    if dry_run:
+        asyncio.run(sync())
+        return
     try:
-        count = upsert_batch(db, rows)
-        print(f"Done! Upserted {count} rows into natural_gas_production")
-    finally:
-        db.close()
+        asyncio.run(run_job("production", "replay" if replay else "cli", sync))
+    except JobLocked as exc:
+        print(f"ERROR: {exc}")
+        sys.exit(1)
 
 
 def main():
@@ -217,12 +408,51 @@ def main():
         action="store_true",
         help="Force full re-fetch (ignore last sync date)",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Pages fetched (or, with --replay, read) in parallel after the first (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--loader",
+        choices=LOADERS,
+        default="insert",
+        help="Write path: batched INSERT ... ON CONFLICT, or COPY into a staging table (default: insert)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Fetch and diff against the DB, reporting what would change without writing "
+        "(nothing is archived and the schema must already be current)",
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Reload every archived page instead of calling the API (no API key needed)",
+    )
+    parser.add_argument(
+        "--no-archive",
+        action="store_true",
+        help="Do not keep fetched pages in the archive (EIA_ARCHIVE_DIR)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print the time spent fetching, parsing JSON, building rows, parsing periods and writing",
+    )
     args = parser.parse_args()
 
     sync_production(
         start=args.start,
         end=args.end,
         full=args.full,
+        concurrency=args.concurrency,
+        loader=args.loader,
+        dry_run=args.dry_run,
+        replay=args.replay,
+        archive=not args.no_archive,
+        profile=args.profile,
     )
 
 
@@ -0,0 +1,122 @@
+"""
+Per-series sync progress in ``sync_state``.
+
+Each (dataset, series, frequency) row carries:
+
+- ``high_water``: the newest period loaded for the series. Incremental runs
+  start every series from its own mark, so a lagging series is neither
+  skipped nor the reason to re-fetch the others.
+- ``resume_key`` / ``resume_offset``: a fingerprint of the query that is
+  loading the series (``eia_client.query_key``) and the offset of its next
+  page. Written in the same transaction as each page, so a rerun of an
+  interrupted query starts at the first page that was not committed.
+  Cleared when the query completes.
+
+A query over every series of a dataset (production) keeps its resume point
+on the ``"*"`` row.
+"""
+
+from datetime import date
+
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.models import SyncState
+
+ALL = "*"
+
+
+def watermarks(db, dataset: str, frequency: str) -> dict[str, date]:
+    """High-water mark of every series with one."""
+    rows = db.execute(
+        select(SyncState.series_id, SyncState.high_water).where(
+            SyncState.dataset == dataset,
+            SyncState.frequency == frequency,
+            SyncState.series_id != ALL,
+            SyncState.high_water.is_not(None),
+        )
+    )
+    return dict(rows.all())
+
+
+class Checkpoint:
+    """Resume point of one paged query covering ``scope`` (series ids or ``[ALL]``).
+
+    With an empty scope, ``record`` only advances the high-water marks.
+    """
+
+    def __init__(self, dataset: str, frequency: str, scope: list[str], key: str, page_size: int):
+        self.dataset = dataset
+        self.frequency = frequency
+        self.scope = scope
+        self.key = key
+        self.page_size = page_size
+
+    def _scope_filter(self):
+        return and_(
+            SyncState.dataset == self.dataset,
+            SyncState.frequency == self.frequency,
+            SyncState.series_id.in_(self.scope),
+        )
+
+    def resume_offset(self, db) -> int:
+        """Where an interrupted run of this query stopped; 0 when there is none.
+
+        Only resumes when every series in scope was left by this same query.
+        """
+        rows = db.execute(
+            select(SyncState.resume_key, SyncState.resume_offset).where(self._scope_filter())
+        ).all()
+        if len(rows) != len(self.scope) or any(key != self.key or offset is None for key, offset in rows):
+            return 0
+        return min(offset for _, offset in rows)
+
+    def record(self, db, rows: list[dict], offset: int):
+        """Advance the marks of the series in ``rows`` and move the resume
+        point past page ``offset``. Call inside the page's transaction."""
+        marks: dict[str, date] = {}
+        for row in rows:
+            sid = row["series_id"]
+            if sid not in marks or row["period"] > marks[sid]:
+                marks[sid] = row["period"]
+
+        entries = {sid: {"high_water": period} for sid, period in marks.items()}
+        for sid in self.scope:
+            entries.setdefault(sid, {"high_water": None})
+            entries[sid].update(resume_key=self.key, resume_offset=offset + self.page_size)
+
+        stmt = insert(SyncState).values(
+            [
+                {
+                    "dataset": self.dataset,
+                    "series_id": sid,
+                    "frequency": self.frequency,
+                    "resume_key": None,
+                    "resume_offset": None,
+                    **values,
+                    "updated_at": func.now(),
+                }
+                for sid, values in entries.items()
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="pk_sync_state",
+            set_={
+                # Marks only move forward; a backfill of old periods leaves them
+                "high_water": func.greatest(SyncState.high_water, stmt.excluded.high_water),
+                # Series outside the scope keep their own query's resume point
+                "resume_key": func.coalesce(stmt.excluded.resume_key, SyncState.resume_key),
+                "resume_offset": func.coalesce(stmt.excluded.resume_offset, SyncState.resume_offset),
+                "updated_at": func.now(),
+            },
+        )
+        db.execute(stmt)
+
+    def complete(self, db):
+        """Forget the resume point once the whole query has been loaded."""
+        db.execute(
+            update(SyncState)
+            .where(self._scope_filter(), SyncState.resume_key == self.key)
+            .values(resume_key=None, resume_offset=None, updated_at=func.now())
+        )
+        db.commit()
@@ -0,0 +1,114 @@
+"""
+Fixtures for the query-plan tests.
+
+The tests run against the PostgreSQL database named by ``TEST_DATABASE_URL``
+and are skipped when it is unset. Everything is created in a throwaway
+``explain_tests`` schema, which is dropped afterwards, so the database can be
+a development one.
+"""
+
+import os
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+SCHEMA = "explain_tests"
+
+if TEST_DATABASE_URL:
+    # backend.database builds its engines from DATABASE_URL at import
+    os.environ.setdefault("DATABASE_URL", TEST_DATABASE_URL)
+else:
+    # Engines connect lazily, so the checks that need no database can still
+    # import modules that build them
+    os.environ.setdefault("DATABASE_URL", "postgresql+psycopg2://localhost/unused")
+
+PRICE_SERIES = ["RNGWHHD", "RNGC1", "RNGC2", "RNGC3", "RNGC4"]
+PRODUCTION_STATES = 50
+
+
+def _load_synthetic_data(conn):
+    """~25 years of daily and monthly prices and 50 years of monthly production per state."""
+    from sqlalchemy import text
+
+    conn.execute(
+        text("""
+            INSERT INTO series (dataset, series_id, area_name, units, source)
+            SELECT 'prices', s, 'NA', '$/MMBTU', 'EIA' FROM unnest(CAST(:series AS text[])) AS s
+        """),
+        {"series": PRICE_SERIES},
+    )
+    conn.execute(
+        text("""
+            INSERT INTO series (dataset, series_id, duoarea, area_name, units, source)
+            SELECT 'production', 'N9050' || lpad(n::text, 2, '0') || '2',
+                   'S' || n, 'State ' || lpad(n::text, 2, '0'), 'MMCF', 'EIA'
+            FROM generate_series(1, :states) AS n
+        """),
+        {"states": PRODUCTION_STATES},
+    )
+    conn.execute(text("""
+        INSERT INTO natural_gas_prices (series_key, frequency, period, price, fetched_at)
+        SELECT s.id, f.frequency, d::date, round((2 + random() * 8)::numeric, 4), now()
+        FROM series s
+        CROSS JOIN (VALUES ('daily', interval '1 day'), ('monthly', interval '1 month')) AS f (frequency, step)
+        CROSS JOIN LATERAL generate_series(date '2000-01-01', date '2024-12-31', f.step) AS d
+        WHERE s.dataset = 'prices'
+    """))
+    conn.execute(text("""
+        INSERT INTO natural_gas_production (series_key, frequency, period, value, fetched_at)
+        SELECT s.id, 'monthly', d::date, round((random() * 1e6)::numeric, 2), now()
+        FROM series s
+        CROSS JOIN generate_series(date '1975-01-01', date '2024-12-01', interval '1 month') AS d
+        WHERE s.dataset = 'production'
+    """))
+
+
+@pytest.fixture(scope="session")
+def engine():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL not set")
+
+    from sqlalchemy import create_engine, text
+
+    from backend.catalog import refresh_catalog
+    from backend.migrations import migrate
+    from backend.rollups import refresh_rollups
+
+    admin = create_engine(TEST_DATABASE_URL, isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    test_engine = create_engine(TEST_DATABASE_URL, connect_args={"options": f"-c search_path={SCHEMA}"})
+    try:
+        migrate(test_engine)
+        with test_engine.begin() as conn:
+            _load_synthetic_data(conn)
+            refresh_catalog(conn, "prices")
+            refresh_catalog(conn, "production")
+            refresh_rollups(conn, "prices")
+            refresh_rollups(conn, "production")
+        # Fresh statistics and a set visibility map, as autovacuum would leave them
+        with test_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM ANALYZE series, natural_gas_prices, natural_gas_production"))
+        yield test_engine
+    finally:
+        test_engine.dispose()
+        with admin.connect() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        admin.dispose()
+
+
+@pytest.fixture(scope="session")
+def explain(engine):
+    """Run ``EXPLAIN (ANALYZE, FORMAT JSON)`` on a SQLAlchemy statement and return its plan."""
+
+    def run(stmt) -> dict:
+        compiled = stmt.compile(dialect=engine.dialect, compile_kwargs={"render_postcompile": True})
+        with engine.connect() as conn:
+            [result] = conn.exec_driver_sql(
+                f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {compiled}", compiled.params
+            ).scalar()
+        return result
+
+    return run
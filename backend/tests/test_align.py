@@ -0,0 +1,68 @@
+"""
+Checks of ``_align`` in ``backend.routers.prices``, which pivots the batch
+query's rows onto one date axis and applies ``fill``. No database is needed.
+"""
+
+from datetime import date
+
+import pytest
+
+from backend.routers.prices import _align
+
+PERIODS = [date(2025, m, 1) for m in range(1, 5)]
+FULL = {"A": [1.0, 2.0, 3.0, 4.0], "B": [10.0, 20.0, 30.0, 40.0]}
+
+
+def _rows(gap: int) -> list[tuple]:
+    """Rows as the batch query returns them, with B missing ``PERIODS[gap]``."""
+    return [
+        (sid, period, values[i], "$/MMBtu")
+        for i, period in enumerate(PERIODS)
+        for sid, values in FULL.items()
+        if not (sid == "B" and i == gap)
+    ]
+
+
+@pytest.mark.parametrize(
+    "gap, fill, expected",
+    [
+        (0, "none", [None, 20.0, 30.0, 40.0]),
+        (1, "none", [10.0, None, 30.0, 40.0]),
+        (3, "none", [10.0, 20.0, 30.0, None]),
+        (0, "ffill", [None, 20.0, 30.0, 40.0]),  # nothing earlier to carry
+        (1, "ffill", [10.0, 10.0, 30.0, 40.0]),
+        (3, "ffill", [10.0, 20.0, 30.0, 30.0]),
+        (0, "zero", [0, 20.0, 30.0, 40.0]),
+        (1, "zero", [10.0, 0, 30.0, 40.0]),
+        (3, "zero", [10.0, 20.0, 30.0, 0]),
+    ],
+)
+def test_fill_keeps_every_period(gap, fill, expected):
+    periods, series, _ = _align(_rows(gap), ["A", "B"], fill)
+    assert periods == PERIODS
+    assert series == {"A": FULL["A"], "B": expected}
+
+
+@pytest.mark.parametrize("gap", [0, 1, 3])
+def test_drop_removes_the_gap_from_every_series(gap):
+    periods, series, _ = _align(_rows(gap), ["A", "B"], "drop")
+    keep = [i for i in range(len(PERIODS)) if i != gap]
+    assert periods == [PERIODS[i] for i in keep]
+    assert series == {sid: [values[i] for i in keep] for sid, values in FULL.items()}
+
+
+def test_null_price_is_a_gap():
+    rows = [
+        (sid, period, None if (sid, period) == ("B", PERIODS[1]) else price, units)
+        for sid, period, price, units in _rows(-1)
+    ]
+    _, series, _ = _align(rows, ["A", "B"], "ffill")
+    assert series["B"] == [10.0, 10.0, 30.0, 40.0]
+
+
+def test_units_default_for_series_without_rows():
+    rows = [(sid, period, price, "$/Mcf") for sid, period, price, _ in _rows(-1)]
+    periods, series, units = _align(rows, ["B", "C"], "none")
+    assert periods == PERIODS
+    assert series == {"B": FULL["B"], "C": [None] * 4}
+    assert units == {"B": "$/Mcf", "C": "$/MMBtu"}
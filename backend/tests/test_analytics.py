@@ -0,0 +1,90 @@
+"""
+Checks of the vectorized statistics in ``backend.analytics`` against
+straightforward per-element computations. No database is needed.
+"""
+
+import math
+import statistics
+
+import numpy as np
+import pytest
+
+from backend import analytics
+
+NAN = float("nan")
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(7)
+    matrix = 3 + np.cumsum(rng.normal(0, 0.1, size=(200, 3)), axis=0)
+    matrix[50, 0] = NAN
+    matrix[120:125, 1] = NAN
+    matrix[10, 2] = -0.5  # negative hub price: no log return into or out of it
+    return matrix
+
+
+def _close(actual, expected):
+    if math.isnan(expected):
+        return math.isnan(actual)
+    return actual == pytest.approx(expected, rel=1e-9, abs=1e-12)
+
+
+def test_log_returns(prices):
+    returns = analytics.log_returns(prices)
+    for t in range(prices.shape[0]):
+        for j in range(prices.shape[1]):
+            prev, cur = (prices[t - 1, j], prices[t, j]) if t else (NAN, NAN)
+            expected = math.log(cur / prev) if prev > 0 and cur > 0 else NAN
+            assert _close(returns[t, j], expected)
+
+
+@pytest.mark.parametrize("window", [2, 5, 20])
+def test_rolling_mean_and_std(prices, window):
+    mean = analytics.rolling_mean(prices, window)
+    std = analytics.rolling_std(prices, window)
+    for t in range(prices.shape[0]):
+        for j in range(prices.shape[1]):
+            values = prices[max(0, t - window + 1) : t + 1, j]
+            full = len(values) == window and not np.isnan(values).any()
+            assert _close(mean[t, j], statistics.fmean(values) if full else NAN)
+            if full:
+                assert std[t, j] == pytest.approx(statistics.stdev(values), rel=1e-6)
+            else:
+                assert math.isnan(std[t, j])
+
+
+def test_zscores_of_constant_window_are_nan():
+    flat = np.full((10, 1), 2.0)
+    assert np.isnan(analytics.zscores(flat, 5)).all()
+
+
+def test_annualized_volatility(prices):
+    returns = analytics.log_returns(prices)
+    volatility = analytics.annualized_volatility(returns, 252)
+    for j in range(prices.shape[1]):
+        column = [r for r in returns[:, j] if not math.isnan(r)]
+        assert volatility[j] == pytest.approx(statistics.stdev(column) * math.sqrt(252))
+
+
+def test_drawdowns():
+    drawdown = analytics.drawdowns(np.array([[2.0], [4.0], [NAN], [3.0], [5.0], [1.0]]))
+    expected = [0.0, 0.0, NAN, -0.25, 0.0, -0.8]
+    assert all(_close(a, e) for a, e in zip(drawdown[:, 0], expected))
+
+
+def test_correlation_uses_shared_periods(prices):
+    returns = analytics.log_returns(prices)
+    corr = analytics.correlation_matrix(returns)
+    for i in range(3):
+        for j in range(3):
+            both = ~np.isnan(returns[:, i]) & ~np.isnan(returns[:, j])
+            expected = np.corrcoef(returns[both, i], returns[both, j])[0, 1]
+            assert corr[i, j] == pytest.approx(expected, abs=1e-9)
+
+
+def test_correlation_without_shared_periods_is_nan():
+    returns = np.array([[1.0, NAN], [2.0, NAN], [NAN, 1.0], [NAN, 3.0]])
+    corr = analytics.correlation_matrix(returns)
+    assert np.isnan(corr[0, 1]) and np.isnan(corr[1, 0])
+    assert corr[0, 0] == pytest.approx(1.0)
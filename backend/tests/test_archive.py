@@ -0,0 +1,77 @@
+"""
+Round trips through the raw page archive in ``backend.scripts.archive``.
+No database or network is needed.
+"""
+
+import asyncio
+
+from backend.scripts.archive import PageArchive, replay_plan
+
+URL = "https://api.eia.gov/v2/natural-gas/pri/fut/data/"
+PARAMS = [("api_key", "secret"), ("frequency", "daily"), ("facets[series][]", "RNGWHHD")]
+
+
+async def _pages(pages):
+    for offset, records in pages:
+        yield offset, records
+
+
+def _record(archive, pages, params=PARAMS):
+    async def drain():
+        return [page async for page in archive.record(_pages(pages), URL, params)]
+
+    return asyncio.run(drain())
+
+
+def _replay(archive, pages, concurrency=2):
+    async def drain():
+        return [page async for page in archive.replay(pages, concurrency)]
+
+    return asyncio.run(drain())
+
+
+def _page(start, n):
+    return [{"series": "RNGWHHD", "period": f"2024-01-{d:02d}", "value": str(d)} for d in range(start, start + n)]
+
+
+def test_recorded_pages_replay_in_offset_order(tmp_path):
+    archive = PageArchive(tmp_path)
+    pages = [(0, _page(1, 3)), (3, _page(4, 3)), (6, _page(7, 2))]
+    assert _record(archive, pages) == pages
+
+    [manifest] = archive.manifests(URL)
+    assert manifest.param("frequency") == "daily"
+    assert "api_key" not in manifest.params
+    assert _replay(archive, manifest.pages, concurrency=2) == pages
+
+
+def test_identical_pages_are_stored_once(tmp_path):
+    archive = PageArchive(tmp_path)
+    _record(archive, [(0, _page(1, 3))])
+    _record(archive, [(0, _page(1, 3))], [*PARAMS, ("start", "2024-01-01")])
+
+    assert len(list((tmp_path / "objects").rglob("*.json.gz"))) == 1
+    assert len(archive.manifests(URL)) == 2
+
+
+def test_rerun_from_the_start_replaces_pages_and_resume_adds_to_them(tmp_path):
+    archive = PageArchive(tmp_path)
+    _record(archive, [(0, _page(1, 3)), (3, _page(4, 3))])
+    _record(archive, [(3, _page(5, 3))])
+    [manifest] = archive.manifests(URL)
+    assert sorted(manifest.pages) == [0, 3]
+    assert _replay(archive, manifest.pages)[1] == (3, _page(5, 3))
+
+    _record(archive, [(0, _page(2, 3))])
+    [manifest] = archive.manifests(URL)
+    assert sorted(manifest.pages) == [0]
+
+
+def test_replay_plan_loads_a_shared_page_at_its_newest_position(tmp_path):
+    archive = PageArchive(tmp_path)
+    _record(archive, [(0, _page(1, 3)), (3, _page(4, 3))])
+    _record(archive, [(0, _page(4, 3))], [*PARAMS, ("start", "2024-01-04")])
+
+    old, new = archive.manifests(URL)
+    plan = replay_plan([old, new])
+    assert [(m.key, sorted(pages)) for m, pages in plan] == [(old.key, [0]), (new.key, [0])]
@@ -0,0 +1,131 @@
+"""
+Checks of the in-process ``ResponseCache`` and the generation polling in
+``backend.cache``. No database is needed.
+"""
+
+import asyncio
+
+import pytest
+
+from backend import cache
+from backend.cache import CachedResponse, ResponseCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+def _response(size: int = 10) -> CachedResponse:
+    return CachedResponse(b"x" * size, "application/json", '"etag"', None)
+
+
+def test_hit_and_miss_counters():
+    store = ResponseCache(max_entries=10, max_bytes=1000, ttl=60)
+    assert store.get("a", 1) is None
+    store.put("a", 1, _response())
+    assert store.get("a", 1) == _response()
+    stats = store.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"], stats["bytes"]) == (1, 1, 1, 10)
+
+
+def test_evicts_least_recently_used_at_entry_limit():
+    store = ResponseCache(max_entries=2, max_bytes=1000, ttl=60)
+    store.put("a", 1, _response())
+    store.put("b", 1, _response())
+    store.get("a", 1)  # "b" is now the least recently used
+    store.put("c", 1, _response())
+
+    assert store.get("b", 1) is None
+    assert store.get("a", 1) is not None and store.get("c", 1) is not None
+    assert store.stats()["evictions"] == 1
+
+
+def test_evicts_until_under_byte_limit():
+    store = ResponseCache(max_entries=10, max_bytes=100, ttl=60)
+    for key in "abc":
+        store.put(key, 1, _response(40))
+    store.put("d", 1, _response(90))
+
+    stats = store.stats()
+    assert stats["entries"] == 1 and stats["bytes"] == 90 and stats["evictions"] == 3
+    assert store.get("d", 1) is not None
+
+
+def test_oversized_and_disabled_caches_store_nothing():
+    store = ResponseCache(max_entries=10, max_bytes=100, ttl=60)
+    store.put("a", 1, _response(101))
+    assert store.stats()["entries"] == 0
+
+    disabled = ResponseCache(max_entries=0, max_bytes=100, ttl=60)
+    disabled.put("a", 1, _response())
+    assert disabled.stats()["entries"] == 0
+
+
+def test_replacing_an_entry_keeps_the_byte_count():
+    store = ResponseCache(max_entries=10, max_bytes=1000, ttl=60)
+    store.put("a", 1, _response(10))
+    store.put("a", 1, _response(30))
+    assert store.stats()["bytes"] == 30
+
+
+def test_entries_expire_after_ttl(clock):
+    store = ResponseCache(max_entries=10, max_bytes=1000, ttl=60)
+    store.put("a", 1, _response())
+    clock.now += 59
+    assert store.get("a", 1) is not None
+    clock.now += 2
+    assert store.get("a", 1) is None
+    stats = store.stats()
+    assert (stats["expirations"], stats["entries"], stats["bytes"]) == (1, 0, 0)
+
+
+def test_newer_generation_invalidates():
+    store = ResponseCache(max_entries=10, max_bytes=1000, ttl=60)
+    store.put("a", 1, _response())
+    assert store.get("a", 2) is None
+    assert store.get("a", 1) is None  # dropped, not kept for older readers
+    stats = store.stats()
+    assert (stats["invalidations"], stats["misses"], stats["entries"]) == (1, 2, 0)
+
+
+class _Generations:
+    """Stands in for the async session: answers the generation query."""
+
+    def __init__(self, generation: int):
+        self.generation = generation
+        self.queries = 0
+
+    async def execute(self, stmt):
+        self.queries += 1
+        generation = self.generation
+
+        class Result:
+            def scalar(self):
+                return generation
+
+        return Result()
+
+
+def test_generation_is_polled_at_most_once_per_interval(clock, monkeypatch):
+    monkeypatch.setattr(cache, "GENERATION_POLL_INTERVAL", 1.0)
+    monkeypatch.setattr(cache, "_generations", {})
+    db = _Generations(3)
+
+    assert asyncio.run(cache.current_generation(db, "prices")) == 3
+    db.generation = 4
+    clock.now += 0.5
+    assert asyncio.run(cache.current_generation(db, "prices")) == 3
+    clock.now += 0.6
+    assert asyncio.run(cache.current_generation(db, "prices")) == 4
+    assert db.queries == 2
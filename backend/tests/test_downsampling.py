@@ -0,0 +1,76 @@
+"""
+Checks of the downsampling in ``backend.downsampling``; LTTB is compared
+with a straightforward per-bucket loop. No database is needed.
+"""
+
+import numpy as np
+import pytest
+
+from backend.downsampling import downsample_indices, lttb_indices, minmax_indices
+
+ALGORITHMS = [lttb_indices, minmax_indices]
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(11)
+    x = np.arange(1000, dtype=np.float64)
+    y = 3 + np.cumsum(rng.normal(0, 0.1, size=1000))
+    return x, y
+
+
+def _naive_lttb(x, y, n_out):
+    n = len(x)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    buckets = [range(edges[b], edges[b + 1]) for b in range(n_out - 2)]
+    keep, prev = [0], 0
+    for b, bucket in enumerate(buckets):
+        if b + 1 < len(buckets):
+            after = buckets[b + 1]
+            mean_x = sum(x[i] for i in after) / len(after)
+            mean_y = sum(y[i] for i in after) / len(after)
+        else:
+            mean_x, mean_y = x[-1], y[-1]
+        areas = [
+            abs((x[prev] - mean_x) * (y[i] - y[prev]) - (x[prev] - x[i]) * (mean_y - y[prev])) for i in bucket
+        ]
+        prev = bucket[int(np.argmax(areas))]
+        keep.append(prev)
+    return keep + [n - 1]
+
+
+@pytest.mark.parametrize("n_out", [3, 10, 97, 500])
+def test_lttb_matches_naive(series, n_out):
+    x, y = series
+    assert lttb_indices(x, y, n_out).tolist() == _naive_lttb(x, y, n_out)
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+@pytest.mark.parametrize("n_out", [2, 3, 4, 5, 10, 101, 999])
+def test_endpoints_kept_and_size_bounded(series, algorithm, n_out):
+    x, y = series
+    keep = algorithm(x, y, n_out)
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert len(keep) <= n_out
+    assert np.all(np.diff(keep) > 0)
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_single_spike_survives(algorithm):
+    x = np.arange(500, dtype=np.float64)
+    y = np.zeros(500)
+    y[237] = 50.0
+    assert 237 in algorithm(x, y, 20)
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+@pytest.mark.parametrize("n_out", [50, 51, 1000])
+def test_enough_points_returns_every_point(algorithm, n_out):
+    x = np.arange(50, dtype=np.float64)
+    y = np.sin(x)
+    assert algorithm(x, y, n_out).tolist() == list(range(50))
+
+
+def test_unknown_algorithm():
+    with pytest.raises(ValueError):
+        downsample_indices([0, 1, 2], [0, 1, 2], 2, "median")
@@ -0,0 +1,145 @@
+"""
+Checks of the paged fetcher in ``backend.scripts.eia_client``: page order,
+retries and the in-flight bound, against an ``httpx.MockTransport``. No
+network or database is needed.
+"""
+
+import asyncio
+import random
+import time
+
+import httpx
+import pytest
+
+from backend.scripts import eia_client
+from backend.scripts.eia_client import MAX_RETRIES, TokenBucket, TransferMeter, fetch_page, iter_pages
+
+URL = "http://eia.test/v2/natural-gas/pri/fut/data/"
+TOTAL = 47
+PAGE_SIZE = 5
+
+
+class _Api:
+    """Serves ``TOTAL`` records in pages, failing the first ``failures``
+    requests of each offset with ``status``, and tracks requests in flight."""
+
+    def __init__(self, failures: int = 0, status: int = 503, delay: float = 0.0):
+        self.failures = failures
+        self.status = status
+        self.delay = delay
+        self.attempts: dict[int, int] = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        offset = int(request.url.params["offset"])
+        length = int(request.url.params["length"])
+        self.attempts[offset] = self.attempts.get(offset, 0) + 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Random latency, so later pages often finish before earlier ones
+            await asyncio.sleep(random.uniform(0, self.delay))
+        finally:
+            self.in_flight -= 1
+        if self.attempts[offset] <= self.failures:
+            return httpx.Response(self.status, headers={"Retry-After": "0"})
+        data = [{"period": str(i)} for i in range(offset, min(offset + length, TOTAL))]
+        return httpx.Response(200, json={"response": {"total": TOTAL, "data": data}})
+
+
+def _pages(api: _Api, concurrency: int = 4, start_offset: int = 0, meter=None) -> list[tuple[int, list]]:
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(api)) as client:
+            return [
+                page
+                async for page in iter_pages(
+                    URL, [("frequency", "daily")], PAGE_SIZE, concurrency,
+                    rate_limit=1000, client=client, start_offset=start_offset, meter=meter,
+                )
+            ]
+
+    return asyncio.run(run())
+
+
+def _fetch_one(api: _Api):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(api)) as client:
+            params = [("offset", "0"), ("length", str(PAGE_SIZE))]
+            return await fetch_page(client, URL, params, TokenBucket(1000, 10))
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("start_offset", [0, 15])
+def test_pages_come_back_in_offset_order(start_offset):
+    random.seed(7)
+    pages = _pages(_Api(delay=0.01), start_offset=start_offset)
+    assert [offset for offset, _ in pages] == list(range(start_offset, TOTAL, PAGE_SIZE))
+    records = [int(r["period"]) for _, data in pages for r in data]
+    assert records == list(range(start_offset, TOTAL))
+
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+def test_in_flight_requests_are_bounded_by_concurrency(concurrency):
+    api = _Api(delay=0.01)
+    _pages(api, concurrency=concurrency)
+    assert api.max_in_flight == concurrency
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_retryable_status_is_retried(status):
+    api = _Api(failures=2, status=status)
+    meter = TransferMeter()
+    pages = _pages(api, meter=meter)
+    assert len(pages) == len(range(0, TOTAL, PAGE_SIZE))
+    assert set(api.attempts.values()) == {3}
+    assert meter.requests == 3 * len(pages)  # retries are metered too
+
+
+def test_gives_up_after_max_retries():
+    api = _Api(failures=MAX_RETRIES + 1, status=503)
+    with pytest.raises(httpx.HTTPStatusError) as exc:
+        _fetch_one(api)
+    assert exc.value.response.status_code == 503
+    assert api.attempts == {0: MAX_RETRIES + 1}
+
+
+def test_last_retry_succeeds():
+    api = _Api(failures=MAX_RETRIES, status=429)
+    assert len(_fetch_one(api)["data"]) == PAGE_SIZE
+    assert api.attempts == {0: MAX_RETRIES + 1}
+
+
+def test_client_errors_are_not_retried():
+    api = _Api(failures=1, status=403)
+    with pytest.raises(httpx.HTTPStatusError):
+        _fetch_one(api)
+    assert api.attempts == {0: 1}
+
+
+def test_transport_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(eia_client, "BACKOFF_BASE", 0.0)
+    api = _Api()
+    failures = 2
+
+    async def flaky(request):
+        nonlocal failures
+        if failures:
+            failures -= 1
+            raise httpx.ConnectError("refused", request=request)
+        return await api(request)
+
+    assert len(_fetch_one(flaky)["data"]) == PAGE_SIZE
+
+
+def test_token_bucket_limits_rate_after_burst():
+    async def run():
+        bucket = TokenBucket(rate=50, capacity=2)
+        started = time.monotonic()
+        for _ in range(12):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    # Two tokens are available at once; the other ten arrive at 50 per second
+    assert 0.19 <= asyncio.run(run()) < 1.0
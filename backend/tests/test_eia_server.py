@@ -0,0 +1,64 @@
+"""
+Checks of the benchmark EIA stand-in in ``backend.benchmarks.eia_server``:
+the periods it serves per frequency, in the formats the syncs parse. No
+database is needed.
+"""
+
+import threading
+from datetime import date
+
+import httpx
+import pytest
+
+from backend.benchmarks.eia_server import PRICES_PATH, PRODUCTION_PATH, StandInServer
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = StandInServer(("127.0.0.1", 0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+
+
+def _get(server, path: str, frequency: str, **params) -> httpx.Response:
+    url = server.url.removesuffix("/v2") + path
+    return httpx.get(url, params={"api_key": "x", "frequency": frequency, "length": 5000, **params})
+
+
+def _data(server, path: str, frequency: str, series: str) -> list[dict]:
+    resp = _get(server, path, frequency, **{"facets[series][]": series})
+    assert resp.status_code == 200
+    assert resp.json()["response"]["frequency"] == frequency
+    return resp.json()["response"]["data"]
+
+
+def test_price_periods_per_frequency(server):
+    series = server.price_series[1]
+    daily = _data(server, PRICES_PATH, "daily", series)
+    weekly = _data(server, PRICES_PATH, "weekly", series)
+    monthly = _data(server, PRICES_PATH, "monthly", series)
+    annual = _data(server, PRICES_PATH, "annual", series)
+
+    assert all(date.fromisoformat(r["period"]).weekday() < 5 for r in daily)
+    assert all(date.fromisoformat(r["period"]).weekday() == 4 for r in weekly)
+    assert all(len(r["period"]) == 7 for r in monthly)
+    assert [r["period"] for r in annual] == sorted({r["period"][:4] for r in daily})
+
+    january = [float(r["value"]) for r in daily if r["period"].startswith(monthly[0]["period"])]
+    assert float(monthly[0]["value"]) == pytest.approx(sum(january) / len(january), abs=1e-3)
+
+
+def test_production_annual_totals(server):
+    series = server.production_series[0]
+    monthly = _data(server, PRODUCTION_PATH, "monthly", series)
+    annual = _data(server, PRODUCTION_PATH, "annual", series)
+    first_year = sum(float(r["value"]) for r in monthly if r["period"].startswith(annual[0]["period"]))
+    assert float(annual[0]["value"]) == pytest.approx(first_year, abs=1e-2)
+
+
+@pytest.mark.parametrize("path, frequency", [(PRICES_PATH, "hourly"), (PRODUCTION_PATH, "daily")])
+def test_unsupported_frequency_is_400(server, path, frequency):
+    resp = _get(server, path, frequency)
+    assert resp.status_code == 400 and frequency in resp.json()["error"]
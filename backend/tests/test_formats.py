@@ -0,0 +1,97 @@
+"""
+Checks of the series encodings and format negotiation in ``backend.formats``.
+No database is needed.
+"""
+
+import json
+import sys
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from backend.formats import MEDIA_TYPES, encode_series, response_format
+
+META = {"series_id": "RNGWHHD", "units": "$/MMBtu", "next_cursor": None}
+PERIODS = [date(2025, 1, 1), date(2025, 2, 1), date(2025, 3, 1)]
+VALUES = [3.5, None, 4.25]
+EXTRA = {"high": [3.9, None, 4.5]}
+
+
+def _decode(fmt: str, body: bytes) -> dict:
+    """Back to the columnar shape, whatever ``fmt`` encoded."""
+    if fmt == "columnar":
+        return json.loads(body)
+    if fmt == "msgpack":
+        msgpack = pytest.importorskip("msgpack")
+        return msgpack.unpackb(body)
+    pa = pytest.importorskip("pyarrow")
+    table = pa.ipc.open_stream(body).read_all()
+    meta = {k.decode(): v.decode() for k, v in table.schema.metadata.items()}
+    columns = table.to_pydict()
+    return {
+        **meta,
+        "count": table.num_rows,
+        "dates": [d.strftime("%Y-%m") for d in columns.pop("date")],
+        "values": columns.pop("value"),
+        **columns,
+    }
+
+
+@pytest.mark.parametrize("fmt", ["columnar", "msgpack", "arrow"])
+def test_round_trip(fmt):
+    resp = encode_series(fmt, META, PERIODS, VALUES, "%Y-%m", EXTRA)
+    assert resp.media_type == MEDIA_TYPES[fmt]
+
+    decoded = _decode(fmt, resp.body)
+    assert decoded["series_id"] == "RNGWHHD" and decoded["units"] == "$/MMBtu"
+    assert decoded["count"] == 3
+    assert decoded["dates"] == ["2025-01", "2025-02", "2025-03"]
+    assert decoded["values"] == VALUES  # missing values stay null
+    assert decoded["high"] == EXTRA["high"]
+
+
+def test_arrow_keeps_dates_and_drops_null_metadata():
+    pa = pytest.importorskip("pyarrow")
+    resp = encode_series("arrow", META, PERIODS, VALUES, "%Y-%m-%d")
+    table = pa.ipc.open_stream(resp.body).read_all()
+    assert table.schema.field("date").type == pa.date32()
+    assert table.column("date").to_pylist() == PERIODS
+    assert b"next_cursor" not in table.schema.metadata
+
+
+@pytest.mark.parametrize("fmt, package", [("msgpack", "msgpack"), ("arrow", "pyarrow")])
+def test_missing_encoder_is_406(monkeypatch, fmt, package):
+    monkeypatch.setitem(sys.modules, package, None)  # makes the import raise ImportError
+    with pytest.raises(HTTPException) as exc:
+        encode_series(fmt, META, PERIODS, VALUES, "%Y-%m")
+    assert exc.value.status_code == 406 and package in exc.value.detail
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        encode_series("xml", META, PERIODS, VALUES, "%Y-%m")
+
+
+def _request(accept: str | None) -> Request:
+    headers = [] if accept is None else [(b"accept", accept.encode())]
+    return Request({"type": "http", "headers": headers})
+
+
+@pytest.mark.parametrize(
+    "format, accept, expected",
+    [
+        (None, None, "json"),
+        (None, "application/json", "json"),
+        (None, "application/msgpack", "msgpack"),
+        (None, "application/x-msgpack", "msgpack"),
+        (None, "Application/Vnd.Apache.Arrow.Stream; q=0.9", "arrow"),
+        (None, "text/html, application/vnd.apache.arrow.stream", "arrow"),
+        (None, "*/*", "json"),
+        ("columnar", "application/msgpack", "columnar"),  # ?format= wins over Accept
+        ("json", "application/vnd.apache.arrow.stream", "json"),
+    ],
+)
+def test_response_format(format, accept, expected):
+    assert response_format(_request(accept), format) == expected
@@ -0,0 +1,140 @@
+"""
+Checks of conditional GET handling in ``backend.http_cache`` and encoding
+negotiation in ``backend.compression``. No database is needed.
+"""
+
+import asyncio
+from datetime import UTC, datetime
+
+import httpx
+import pytest
+
+from backend import compression
+from backend.compression import CompressionMiddleware, choose_encoding
+from backend.http_cache import is_not_modified, validator_headers
+
+ETAG = '"0123456789abcdef"'
+MODIFIED = datetime(2025, 3, 4, 5, 6, 7, 890000, tzinfo=UTC)
+HTTP_DATE = "Tue, 04 Mar 2025 05:06:07 GMT"
+
+
+@pytest.mark.parametrize(
+    "if_none_match, expected",
+    [
+        (ETAG, True),
+        ('"other"', False),
+        (f'"other", {ETAG}', True),
+        (f"W/{ETAG}", True),
+        ("*", True),
+        (' * ', True),
+        ('"0123456789abcdef-gzip"', True),
+        ('"0123456789abcdef-br"', True),
+        ('W/"0123456789abcdef-gzip"', True),
+        ('"0123456789abcdef-deflate"', False),
+    ],
+)
+def test_if_none_match(if_none_match, expected):
+    assert is_not_modified({"if-none-match": if_none_match}, ETAG, MODIFIED) is expected
+
+
+def test_if_none_match_overrides_if_modified_since():
+    headers = {"if-none-match": '"other"', "if-modified-since": HTTP_DATE}
+    assert not is_not_modified(headers, ETAG, MODIFIED)
+
+
+@pytest.mark.parametrize(
+    "since, expected",
+    [
+        (HTTP_DATE, True),  # sub-second part of last_modified is ignored
+        ("Tue, 04 Mar 2025 05:06:06 GMT", False),
+        ("Wed, 05 Mar 2025 00:00:00 GMT", True),
+        ("not a date", False),
+        ("Tue, 04 Mar 2025 05:06:07", False),  # no zone: not an HTTP date
+    ],
+)
+def test_if_modified_since(since, expected):
+    assert is_not_modified({"if-modified-since": since}, ETAG, MODIFIED) is expected
+
+
+def test_without_last_modified_only_etags_match():
+    assert not is_not_modified({"if-modified-since": HTTP_DATE}, ETAG, None)
+    assert not is_not_modified({}, ETAG, MODIFIED)
+
+
+def test_validator_headers_use_http_dates():
+    headers = validator_headers(ETAG, MODIFIED)
+    assert headers["ETag"] == ETAG and headers["Last-Modified"] == HTTP_DATE
+    assert "Vary" not in headers
+    assert validator_headers(ETAG, None, vary="Accept")["Vary"] == "Accept"
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, brotli, expected",
+    [
+        ("gzip, deflate, br", True, "br"),
+        ("gzip, deflate, br", False, "gzip"),
+        ("br;q=0.5, gzip", True, "gzip"),
+        ("gzip;q=0", True, None),
+        ("identity", True, None),
+        ("*", False, "gzip"),
+        ("*;q=0.1, gzip;q=0", False, None),
+        ("", True, None),
+    ],
+)
+def test_choose_encoding(monkeypatch, accept_encoding, brotli, expected):
+    if not brotli:
+        monkeypatch.setattr(compression, "brotli", None)
+    elif compression.brotli is None:
+        pytest.skip("brotli is not installed")
+    assert choose_encoding(accept_encoding) == expected
+
+
+def _get(body: bytes, accept_encoding: str, status: int = 200) -> httpx.Response:
+    async def app(scope, receive, send):
+        headers = [(b"content-type", b"application/json"), (b"etag", ETAG.encode())]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def request():
+        transport = httpx.ASGITransport(app=CompressionMiddleware(app, minimum_size=100))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/", headers={"Accept-Encoding": accept_encoding})
+
+    return asyncio.run(request())
+
+
+def test_small_bodies_are_not_compressed(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    resp = _get(b"x" * 99, "gzip")
+    assert "content-encoding" not in resp.headers and resp.content == b"x" * 99
+    # Still the gzip-negotiated representation, validated like a compressed one
+    assert resp.headers["etag"] == '"0123456789abcdef-gzip"'
+    assert "Accept-Encoding" in resp.headers["vary"]
+
+
+def test_identity_requests_keep_the_bare_etag():
+    resp = _get(b"x" * 1000, "identity")
+    assert "content-encoding" not in resp.headers and "vary" not in resp.headers
+    assert resp.headers["etag"] == ETAG
+
+
+def test_large_bodies_get_encoded_etag(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    resp = _get(b"x" * 1000, "gzip")
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.content == b"x" * 1000  # decoded by httpx
+    assert resp.headers["etag"] == '"0123456789abcdef-gzip"'
+    assert "Accept-Encoding" in resp.headers["vary"]
+    # The suffixed tag sent back still matches the resource's own ETag
+    assert is_not_modified({"if-none-match": resp.headers["etag"]}, ETAG, None)
+
+
+@pytest.mark.parametrize("accept_encoding, etag", [("gzip", '"0123456789abcdef-gzip"'), ("identity", ETAG)])
+def test_not_modified_repeats_the_validator_of_the_200(monkeypatch, accept_encoding, etag):
+    monkeypatch.setattr(compression, "brotli", None)
+    ok = _get(b"x" * 1000, accept_encoding)
+    resp = _get(b"", accept_encoding, status=304)
+    assert resp.status_code == 304 and "content-encoding" not in resp.headers
+    assert resp.headers["etag"] == ok.headers["etag"] == etag
+    assert resp.headers.get("vary") == ok.headers.get("vary")
+
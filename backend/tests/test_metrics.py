@@ -0,0 +1,81 @@
+"""
+Checks of the Prometheus text rendering and engine instrumentation in
+``backend.metrics``. Engines are in-memory SQLite, so no PostgreSQL is needed.
+"""
+
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from backend import metrics
+from backend.metrics import Counter, Histogram, Registry, sync_run_families
+
+
+def _samples(text: str) -> dict[str, str]:
+    lines = [line for line in text.splitlines() if line and not line.startswith("#")]
+    return dict(line.rsplit(" ", 1) for line in lines)
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.register(Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe("/a", value=value)
+
+    samples = _samples(registry.render())
+    assert samples['latency_seconds_bucket{route="/a",le="0.1"}'] == "2"
+    assert samples['latency_seconds_bucket{route="/a",le="1"}'] == "3"
+    assert samples['latency_seconds_bucket{route="/a",le="+Inf"}'] == "4"
+    assert samples['latency_seconds_count{route="/a"}'] == "4"
+    assert float(samples['latency_seconds_sum{route="/a"}']) == 3.65
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    requests = registry.register(Counter("requests_total", "Requests.", ("route",)))
+    requests.inc('a"b\\c')
+    assert 'requests_total{route="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_every_family_has_one_header():
+    registry = Registry()
+    registry.register(Counter("a_total", "A."))
+    registry.collectors.append(lambda: ["# HELP b B.", "# TYPE b gauge", "b 1"])
+    lines = registry.render().splitlines()
+    assert [line for line in lines if line.startswith("# TYPE")] == ["# TYPE a_total counter", "# TYPE b gauge"]
+
+
+def test_sync_run_families_skip_missing_counts():
+    started = datetime(2025, 1, 1, tzinfo=UTC)
+    run = SimpleNamespace(
+        job="prices", status="failed", started_at=started, finished_at=started + timedelta(seconds=4),
+        pages=None, records=None, bytes=None,
+    )
+    samples = _samples("\n".join(sync_run_families([run], {})))
+    assert samples['sync_last_run_success{job="prices"}'] == "0"
+    assert samples['sync_last_run_duration_seconds{job="prices"}'] == "4"
+    assert not any(name.startswith(("sync_last_run_bytes", "sync_last_run_rows_per_second")) for name in samples)
+
+
+def test_pool_checkouts_are_timed_across_dispose(monkeypatch):
+    monkeypatch.setattr(metrics, "_engines", {})
+    engine = create_engine("sqlite://", poolclass=QueuePool)
+    metrics.instrument_engine(engine, "sqlite-test")
+
+    def checkouts() -> int:
+        return int(_samples(metrics.registry.render())['db_pool_wait_seconds_count{engine="sqlite-test"}'])
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert checkouts() == 1
+    pools = _samples("\n".join(metrics._collect_pools()))
+    assert pools['db_pool_checked_out{engine="sqlite-test"}'] == "0"
+
+    engine.dispose()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert checkouts() == 2
+    statements = _samples(metrics.registry.render())
+    assert statements['db_statement_duration_seconds_count{engine="sqlite-test",statement="SELECT"}'] == "2"
@@ -0,0 +1,56 @@
+"""
+Checks of the keyset cursors and page boundaries in ``backend.pagination``.
+No database is needed.
+"""
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from backend.pagination import decode_cursor, encode_cursor, page
+
+
+def _rows(n: int) -> list:
+    return [SimpleNamespace(period=date(2025, 1, 1 + i)) for i in range(n)]
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(date(2024, 2, 29))
+    assert "=" not in cursor  # unpadded, safe in a query string
+    assert decode_cursor(cursor) == date(2024, 2, 29)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        "bm90IGpzb24",  # "not json"
+        encode_cursor(date(2024, 1, 1))[:-3],
+        "eyJiZWZvcmUiOiIyMDI0LTAxLTAxIn0",  # {"before": ...}
+        "eyJhZnRlciI6IjIwMjQtMTMtMDEifQ",  # {"after": "2024-13-01"}
+        "eyJhZnRlciI6MX0",  # {"after": 1}
+    ],
+)
+def test_malformed_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+def test_forward_page_with_more_rows_has_cursor():
+    rows, next_cursor = page(_rows(4), forward=True, limit=3)
+    assert [r.period.day for r in rows] == [1, 2, 3]
+    assert decode_cursor(next_cursor) == date(2025, 1, 3)
+
+
+@pytest.mark.parametrize("n", [0, 2, 3])
+def test_final_page_has_no_cursor(n):
+    rows, next_cursor = page(_rows(n), forward=True, limit=3)
+    assert len(rows) == n and next_cursor is None
+
+
+def test_newest_rows_are_returned_oldest_first():
+    rows, next_cursor = page(list(reversed(_rows(3))), forward=False, limit=3)
+    assert [r.period.day for r in rows] == [1, 2, 3] and next_cursor is None
@@ -0,0 +1,80 @@
+"""
+Checks of the opt-in request profiler in ``backend.profiling`` and the sync
+stage timings in ``backend.scripts.profiling``. Statements are captured from
+an in-memory SQLite engine, so no PostgreSQL is needed.
+"""
+
+import asyncio
+
+import httpx
+from sqlalchemy import create_engine, text
+
+from backend.profiling import ProfileStore, ProfilingMiddleware, RequestProfile, capture_statements
+from backend.scripts.eia_client import TransferMeter
+from backend.scripts.profiling import SyncProfile
+
+
+def _app(engine):
+    async def app(scope, receive, send):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT :n"), {"n": 1})
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    return app
+
+
+def _get(app, url: str, **kwargs) -> httpx.Response:
+    async def request():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get(url, **kwargs)
+
+    return asyncio.run(request())
+
+
+def test_only_requests_asking_are_profiled():
+    engine = create_engine("sqlite://")
+    capture_statements(engine, "sync")
+    store = ProfileStore(10)
+    app = ProfilingMiddleware(_app(engine), store, directory="")
+
+    assert "x-profile-id" not in _get(app, "/a").headers
+    profiled = _get(app, "/a?profile=1")
+    by_header = _get(app, "/b", headers={"X-Profile": "1"})
+
+    assert [p.path for p in store.list()] == ["/b", "/a"]
+    profile = store.get(profiled.headers["x-profile-id"])
+    assert profile.status == 200 and profile.query == "profile=1"
+    assert [s["statement"] for s in profile.statements] == ["SELECT ?"]
+    assert profile.statements[0]["parameters"] == "(1,)"
+    assert profile.functions and profile.functions[0]["cumulative_ms"] >= profile.functions[-1]["cumulative_ms"]
+    assert 'db;dur=' in by_header.headers["server-timing"]
+
+
+def test_store_keeps_the_newest_profiles():
+    store = ProfileStore(2)
+    for n in range(3):
+        store.put(RequestProfile(str(n), "GET", "/", "", None))
+    assert [p.id for p in store.list()] == ["2", "1"]
+    assert store.get("0") is None
+
+
+def test_sync_profile_times_the_parse_period_calls_build_rows_makes():
+    def build_rows(raw, parse):
+        # Like the production transform: filtered records are never parsed
+        return [{"period": parse(r["period"])} for r in raw if r["process"] == "VGM"]
+
+    profile = SyncProfile()
+    transform = profile.transform(build_rows, lambda period: period)
+    write = profile.timed("upsert_batch", lambda rows: len(rows))
+    page = [{"period": "2025-01", "process": "VGM"}] * 3 + [{"period": "2025-01", "process": "FWA"}]
+    for _ in range(2):
+        assert write(transform(page)) == 3
+
+    assert profile.stages["build_rows"].calls == 2
+    assert profile.stages["parse_period"].calls == 6
+    assert profile.stages["upsert_batch"].calls == 2
+    lines = profile.report(TransferMeter(requests=2, fetch_seconds=0.5)).splitlines()
+    stages = [line.split()[0] for line in lines[2:-1]]
+    assert stages == ["rate", "HTTP", "JSON", "build_rows", "parse_period", "upsert_batch"]
+    assert next(line for line in lines if "parse_period" in line).startswith("    parse_period")
@@ -1,8 +1,11 @@
 import type {
+  PriceCurveApiResponse,
   PriceDataPoint,
+  PriceMatrixApiResponse,
   PricesApiResponse,
   ProductionApiResponse,
   ProductionDataPoint,
+  ProductionRankingsApiResponse,
   StateInfo,
 } from "../types";
 
@@ -33,45 +36,77 @@ export async function fetchPrices(
   return response.json();
 }
 
-export async function fetchLatestPrice(
-  seriesId: string,
-  frequency: string = "daily"
-): Promise<{ series_id: string; date: string; price: number }> {
-  const response = await fetch(
-    `/api/prices?series_id=${seriesId}&frequency=${frequency}&limit=1`
-  );
+// Spot and every futures contract as of one date, in a single request
+export async function fetchPriceCurve(
+  frequency: string = "daily",
+  asOf?: string
+): Promise<PriceCurveApiResponse> {
+  const params = new URLSearchParams({ frequency });
+  if (asOf) params.set("as_of", asOf);
+  const response = await fetch(`/api/prices/curve?${params}`);
 
   if (!response.ok) {
     throw new Error(`API error: ${response.status} ${response.statusText}`);
   }
 
-  const json: PricesApiResponse = await response.json();
-  const point = json.data[0];
-  return { series_id: seriesId, date: point.date, price: point.price };
+  return response.json();
 }
 
 export async function fetchMultipleSeries(
   seriesIds: string[],
   frequency: string = "monthly",
   limit: number = 60
-): Promise<Map<string, PriceDataPoint[]>> {
-  const results = await Promise.all(
-    seriesIds.map((id) => fetchPrices(id, frequency, limit))
+): Promise<PriceMatrixApiResponse> {
+  if (seriesIds.length === 0) {
+    return { frequency, fill: "none", count: 0, units: {}, dates: [], series: {} };
+  }
+
+  const response = await fetch(
+    `/api/prices/batch?series_id=${seriesIds.join(",")}&frequency=${frequency}&limit=${limit}`
   );
 
-  const map = new Map<string, PriceDataPoint[]>();
-  results.forEach((res) => {
-    map.set(res.series_id, res.data);
-  });
-  return map;
+  if (!response.ok) {
+    throw new Error(`API error: ${response.status} ${response.statusText}`);
+  }
+
+  return response.json();
 }
 
 // --- Production API ---
 
+// Walks the whole history forward, one keyset page at a time
+async function fetchProductionHistory(
+  seriesId: string
+): Promise<ProductionApiResponse> {
+  const data: ProductionDataPoint[] = [];
+  let first: ProductionApiResponse | null = null;
+  let cursor: string | null = null;
+  do {
+    const params = new URLSearchParams({
+      series_id: seriesId,
+      limit: "10000",
+      start: "1900-01-01",
+    });
+    if (cursor) params.set("cursor", cursor);
+    const response = await fetch(`/api/production?${params}`);
+    if (!response.ok) {
+      throw new Error(`API error: ${response.status} ${response.statusText}`);
+    }
+    const page: ProductionApiResponse = await response.json();
+    first ??= page;
+    data.push(...page.data);
+    cursor = page.next_cursor ?? null;
+  } while (cursor);
+  return { ...first!, count: data.length, data, next_cursor: null };
+}
+
 export async function fetchProduction(
   seriesId: string,
   limit: number = 120
 ): Promise<ProductionApiResponse> {
+  if (!Number.isFinite(limit)) {
+    return fetchProductionHistory(seriesId);
+  }
   const response = await fetch(
     `/api/production?series_id=${seriesId}&limit=${limit}`
   );
@@ -90,6 +125,14 @@ export async function fetchProductionStates(): Promise<StateInfo[]> {
   return json.states;
 }
 
+export async function fetchProductionRankings(): Promise<ProductionRankingsApiResponse> {
+  const response = await fetch("/api/production/rankings");
+  if (!response.ok) {
+    throw new Error(`API error: ${response.status} ${response.statusText}`);
+  }
+  return response.json();
+}
+
 export async function fetchMultipleProduction(
   seriesIds: string[],
   limit: number = 120
@@ -8,6 +8,7 @@ import ComparisonChart from "./ComparisonChart";
 import FuturesCurve from "./FuturesCurve";
 import ProductionControls from "./ProductionControls";
 import ProductionChart from "./ProductionChart";
+import ProductionRankings from "./ProductionRankings";
 import "./Dashboard.css";
 
 function getLimitForRange(range: string, frequency: string): number {
@@ -35,7 +36,7 @@ function getMonthlyLimit(range: string): number {
     case "10Y":
       return 120;
     case "All":
-      return 10000;
+      return Number.POSITIVE_INFINITY; // paged through with the API cursor
     default:
       return 60;
   }
@@ -63,7 +64,7 @@ export default function Dashboard() {
   const priceLimit = getLimitForRange(dateRange, frequency);
   const prodLimit = getMonthlyLimit(prodDateRange);
 
-  const { mergedData, latestPrices, loading, error } = usePriceData(
+  const { mergedData, latestPrices, curve, loading, error } = usePriceData(
     activeTab === "prices" ? selectedSeries : [],
     frequency,
     priceLimit
@@ -72,6 +73,7 @@ export default function Dashboard() {
   const {
     mergedData: prodData,
     availableStates,
+    rankings,
     loading: prodLoading,
     error: prodError,
   } = useProductionData(
@@ -145,7 +147,7 @@ export default function Dashboard() {
                 data={mergedData}
                 selectedSeries={selectedSeries}
               />
-              <FuturesCurve latestPrices={latestPrices} />
+              <FuturesCurve curve={curve} />
             </>
           )}
         </>
@@ -168,11 +170,17 @@ export default function Dashboard() {
           )}
 
           {!prodLoading && !prodError && (
-            <ProductionChart
-              data={prodData}
-              selectedSeries={selectedProdSeries}
-              availableStates={availableStates}
-            />
+            <>
+              <ProductionChart
+                data={prodData}
+                selectedSeries={selectedProdSeries}
+                availableStates={availableStates}
+              />
+              <ProductionRankings
+                rankings={rankings}
+                onAddState={handleAddState}
+              />
+            </>
           )}
         </>
       )}
@@ -9,30 +9,44 @@ import {
   ReferenceLine,
   Cell,
 } from "recharts";
-import type { LatestPrice, FuturesCurvePoint } from "../types";
+import type { FuturesCurvePoint, PriceCurveApiResponse } from "../types";
 import { SERIES_CONFIG } from "../types";
 
 interface FuturesCurveProps {
-  latestPrices: LatestPrice[];
+  curve: PriceCurveApiResponse | null;
 }
 
 const FUTURES_CONFIG = SERIES_CONFIG.filter((s) => s.id.startsWith("RNGC"));
 
-export default function FuturesCurve({ latestPrices }: FuturesCurveProps) {
-  const spotPrice = latestPrices.find((lp) => lp.series_id === "RNGWHHD");
+export default function FuturesCurve({ curve }: FuturesCurveProps) {
+  const points = curve?.points ?? [];
+  const spot = points.find((p) => p.tenor === 0);
+  const spotPrice = spot?.price ?? null;
 
   const data: FuturesCurvePoint[] = FUTURES_CONFIG.map((config) => {
-    const lp = latestPrices.find((p) => p.series_id === config.id);
+    const point = points.find((p) => p.series_id === config.id);
     return {
       contract: config.label,
       series_id: config.id,
-      price: lp?.price ?? 0,
+      price: point?.price ?? 0,
+      spread_to_spot: point?.spread_to_spot ?? null,
     };
   });
 
+  const spread = curve?.front_back_spread;
+
   return (
     <div className="chart-panel">
-      <h2 className="panel-title">Futures Curve</h2>
+      <h2 className="panel-title">
+        Futures Curve
+        {curve?.structure && spread != null && (
+          <span className="panel-subtitle">
+            {" "}
+            {curve.structure} ({spread >= 0 ? "+" : ""}
+            {spread.toFixed(3)} front to back)
+          </span>
+        )}
+      </h2>
       <ResponsiveContainer width="100%" height={320}>
         <BarChart
           data={data}
@@ -61,13 +75,13 @@ export default function FuturesCurve({ latestPrices }: FuturesCurveProps) {
               borderRadius: "6px",
             }}
           />
-          {spotPrice && (
+          {spotPrice !== null && (
             <ReferenceLine
-              y={spotPrice.price}
+              y={spotPrice}
               stroke="#2563eb"
               strokeDasharray="5 5"
               label={{
-                value: `Spot $${spotPrice.price.toFixed(2)}`,
+                value: `Spot $${spotPrice.toFixed(2)}`,
                 fill: "#2563eb",
                 fontSize: 12,
                 position: "right",
@@ -0,0 +1,65 @@
+import type { ProductionRankingsApiResponse } from "../types";
+
+interface ProductionRankingsProps {
+  rankings: ProductionRankingsApiResponse | null;
+  onAddState: (seriesId: string) => void;
+}
+
+function formatChange(change: number | null): string {
+  if (change === null) return "—";
+  const pct = change * 100;
+  return `${pct >= 0 ? "+" : ""}${pct.toFixed(1)}%`;
+}
+
+function changeClass(change: number | null): string {
+  if (change === null || change === 0) return "";
+  return change > 0 ? "change-up" : "change-down";
+}
+
+export default function ProductionRankings({
+  rankings,
+  onAddState,
+}: ProductionRankingsProps) {
+  if (!rankings || rankings.states.length === 0) return null;
+
+  return (
+    <div className="chart-panel">
+      <h2 className="panel-title">
+        State Rankings
+        {rankings.period && (
+          <span className="panel-subtitle"> {rankings.period}</span>
+        )}
+      </h2>
+      <table className="rankings-table">
+        <thead>
+          <tr>
+            <th>#</th>
+            <th>State</th>
+            <th>Production</th>
+            <th>Share of U.S.</th>
+            <th>MoM</th>
+            <th>YoY</th>
+            <th>Trailing 12M</th>
+          </tr>
+        </thead>
+        <tbody>
+          {rankings.states.map((s) => (
+            <tr key={s.series_id} onClick={() => onAddState(s.series_id)}>
+              <td>{s.rank}</td>
+              <td>{s.area_name ?? s.series_id}</td>
+              <td>{s.value?.toLocaleString() ?? "—"}</td>
+              <td>{s.share !== null ? `${(s.share * 100).toFixed(1)}%` : "—"}</td>
+              <td className={changeClass(s.mom_change)}>
+                {formatChange(s.mom_change)}
+              </td>
+              <td className={changeClass(s.yoy_change)}>
+                {formatChange(s.yoy_change)}
+              </td>
+              <td>{s.trailing_12?.toLocaleString() ?? "—"}</td>
+            </tr>
+          ))}
+        </tbody>
+      </table>
+    </div>
+  );
+}
@@ -1,9 +1,6 @@
 import { useEffect, useState } from "react";
-import { fetchMultipleSeries, fetchLatestPrice } from "../api/eia";
-import type { LatestPrice, MergedDataPoint } from "../types";
-import { SERIES_CONFIG } from "../types";
-
-const FUTURES_IDS = ["RNGC1", "RNGC2", "RNGC3", "RNGC4"];
+import { fetchMultipleSeries, fetchPriceCurve } from "../api/eia";
+import type { LatestPrice, MergedDataPoint, PriceCurveApiResponse } from "../types";
 
 export function usePriceData(
   selectedSeries: string[],
@@ -12,6 +9,7 @@ export function usePriceData(
 ) {
   const [mergedData, setMergedData] = useState<MergedDataPoint[]>([]);
   const [latestPrices, setLatestPrices] = useState<LatestPrice[]>([]);
+  const [curve, setCurve] = useState<PriceCurveApiResponse | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -23,31 +21,34 @@ export function usePriceData(
       setError(null);
 
       try {
-        // Fetch time-series for selected series + latest prices for all series + futures
-        const [seriesMap, ...latestResults] = await Promise.all([
+        // Time-series for the selected series + the latest curve, which
+        // carries the latest price of spot and every futures contract
+        const [matrix, latestCurve] = await Promise.all([
           fetchMultipleSeries(selectedSeries, frequency, limit),
-          ...SERIES_CONFIG.map((s) => fetchLatestPrice(s.id, "daily")),
+          fetchPriceCurve("daily"),
         ]);
 
         if (cancelled) return;
 
-        // Merge time-series data into unified rows keyed by date
-        const dateMap = new Map<string, MergedDataPoint>();
-        for (const [seriesId, points] of seriesMap) {
-          for (const point of points) {
-            if (!dateMap.has(point.date)) {
-              dateMap.set(point.date, { date: point.date });
-            }
-            dateMap.get(point.date)![seriesId] = point.price;
+        // The batch endpoint already aligns every series on one date axis
+        const merged: MergedDataPoint[] = matrix.dates.map((date, i) => {
+          const row: MergedDataPoint = { date };
+          for (const [seriesId, values] of Object.entries(matrix.series)) {
+            const value = values[i];
+            if (value !== null) row[seriesId] = value;
           }
-        }
-
-        const merged = Array.from(dateMap.values()).sort(
-          (a, b) => a.date.localeCompare(b.date)
-        );
+          return row;
+        });
 
         setMergedData(merged);
-        setLatestPrices(latestResults as LatestPrice[]);
+        setCurve(latestCurve);
+        setLatestPrices(
+          latestCurve.points.flatMap((p) =>
+            p.price !== null && p.date !== null
+              ? [{ series_id: p.series_id, date: p.date, price: p.price }]
+              : []
+          )
+        );
       } catch (err) {
         if (!cancelled) {
           setError(err instanceof Error ? err.message : "Failed to fetch data");
@@ -61,5 +62,5 @@ export function usePriceData(
     return () => { cancelled = true; };
   }, [selectedSeries.join(","), frequency, limit]);
 
-  return { mergedData, latestPrices, loading, error };
+  return { mergedData, latestPrices, curve, loading, error };
 }
@@ -1,10 +1,20 @@
 import { useEffect, useState } from "react";
-import { fetchMultipleProduction, fetchProductionStates } from "../api/eia";
-import type { MergedProductionPoint, StateInfo } from "../types";
+import {
+  fetchMultipleProduction,
+  fetchProductionRankings,
+  fetchProductionStates,
+} from "../api/eia";
+import type {
+  MergedProductionPoint,
+  ProductionRankingsApiResponse,
+  StateInfo,
+} from "../types";
 
 export function useProductionData(selectedSeries: string[], limit: number) {
   const [mergedData, setMergedData] = useState<MergedProductionPoint[]>([]);
   const [availableStates, setAvailableStates] = useState<StateInfo[]>([]);
+  const [rankings, setRankings] =
+    useState<ProductionRankingsApiResponse | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -16,9 +26,10 @@ export function useProductionData(selectedSeries: string[], limit: number) {
       setError(null);
 
       try {
-        const [seriesMap, states] = await Promise.all([
+        const [seriesMap, states, stateRankings] = await Promise.all([
           fetchMultipleProduction(selectedSeries, limit),
           fetchProductionStates(),
+          fetchProductionRankings(),
         ]);
 
         if (cancelled) return;
@@ -39,6 +50,7 @@ export function useProductionData(selectedSeries: string[], limit: number) {
 
         setMergedData(merged);
         setAvailableStates(states);
+        setRankings(stateRankings);
       } catch (err) {
         if (!cancelled) {
           setError(
@@ -56,5 +68,5 @@ export function useProductionData(selectedSeries: string[], limit: number) {
     };
   }, [selectedSeries.join(","), limit]);
 
-  return { mergedData, availableStates, loading, error };
+  return { mergedData, availableStates, rankings, loading, error };
 }
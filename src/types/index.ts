@@ -8,6 +8,16 @@ export interface PricesApiResponse {
   units: string;
   count: number;
   data: PriceDataPoint[];
+  next_cursor?: string | null;
+}
+
+export interface PriceMatrixApiResponse {
+  frequency: string;
+  fill: string;
+  count: number;
+  units: Record<string, string>;
+  dates: string[];
+  series: Record<string, (number | null)[]>;
 }
 
 export interface LatestPrice {
@@ -25,6 +35,26 @@ export interface FuturesCurvePoint {
   contract: string;
   series_id: string;
   price: number;
+  spread_to_spot: number | null;
+}
+
+export interface CurvePoint {
+  series_id: string;
+  tenor: number;
+  date: string | null;
+  price: number | null;
+  spread_to_spot: number | null;
+  spread_to_previous: number | null;
+}
+
+export interface PriceCurveApiResponse {
+  frequency: string;
+  as_of: string | null;
+  date: string | null;
+  units: string;
+  structure: "contango" | "backwardation" | "flat" | null;
+  front_back_spread: number | null;
+  points: CurvePoint[];
 }
 
 export interface SeriesInfo {
@@ -54,12 +84,37 @@ export interface ProductionApiResponse {
   units: string;
   count: number;
   data: ProductionDataPoint[];
+  next_cursor?: string | null;
 }
 
 export interface StateInfo {
   series_id: string;
   duoarea: string;
   area_name: string;
+  units?: string | null;
+  first_period?: string | null;
+  last_period?: string | null;
+  count?: number;
+  latest_value?: number | null;
+}
+
+export interface StateRanking {
+  series_id: string;
+  duoarea: string | null;
+  area_name: string | null;
+  units: string | null;
+  rank: number;
+  value: number | null;
+  share: number | null;
+  mom_change: number | null;
+  yoy_change: number | null;
+  trailing_12: number | null;
+}
+
+export interface ProductionRankingsApiResponse {
+  period: string | null;
+  total: StateRanking | null;
+  states: StateRanking[];
 }
 
 export interface MergedProductionPoint {